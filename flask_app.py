@@ -4,13 +4,15 @@ Flask Backend with Socket.IO for Real-Time Aircraft Tracking
 No more page refreshes - pure WebSocket updates!
 """
 
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request, stream_with_context
 from flask_socketio import SocketIO, emit
 import sqlite3
 import json
+import base64
 import time
-import math
 import threading
+import numpy as np
+from collections import Counter, deque
 from datetime import datetime
 import sys
 import os
@@ -19,7 +21,18 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from modules.route_management import RouteEconomics
-from modules.aircraft_marketplace import AircraftMarketplace, AircraftCategory, FinancingType
+from modules.route_pnl import RoutePnLView
+from modules.flight_engine import FlightEngine
+from modules.route_paths import RoutePathCache
+from modules.assignment_registry import AssignmentRegistry
+from modules.flight_stream import pack_frame, build_frame_index
+from modules.broadcast_scheduler import BroadcastScheduler
+from modules.flight_debug import FlightDebugChannel
+from modules.flight_tiles import viewport_tiles, bucket_by_tile, lod_priority
+from modules.aircraft_marketplace import (
+    AircraftMarketplace, AircraftCategory, AircraftCondition, FinancingType, MARKET_SORT_COLUMNS
+)
+from modules.market_maker import MarketMaker, DAILY_LISTINGS
 from modules.ai_competition import AICompetitionManager
 from core.config_manager import ConfigManager
 
@@ -49,11 +62,18 @@ def initialize_database_if_needed():
 db_path = initialize_database_if_needed()
 route_economics = RouteEconomics(db_path)
 aircraft_marketplace = AircraftMarketplace(db_path)
+# Expires, marks down and adds listings once per simulated day (see run_market_maker)
+market_maker = MarketMaker(
+    aircraft_marketplace,
+    daily_listings=float(config_manager.get_preference('market_daily_listings', DAILY_LISTINGS))
+)
 
 # Time speed multiplier (global setting)
 time_speed = 1.0
-# Reference time for consistent calculations
-reference_time = time.time()  # Fixed reference point
+# Simulation clock anchor: (real time, simulation time) at the last speed change.
+# Re-anchoring on speed changes keeps the clock monotonic, which the event core needs.
+reference_time = time.time()
+sim_clock_anchor = (reference_time, reference_time)
 
 # Load airports from database
 def load_airports():
@@ -83,6 +103,55 @@ def load_airports():
 
 # Load airports from database
 AIRPORTS = load_airports()
+# Curve geometry per directed route, shared by the engine and the route line API
+route_paths = RoutePathCache(AIRPORTS)
+# Flight times come from the great circle distance matrix built over the same airports table
+flight_engine = FlightEngine(AIRPORTS, route_paths, route_economics.distances)
+assignment_registry = AssignmentRegistry(db_path)
+# Simplified aircraft used for the fleet financial overview
+ECONOMICS_AIRCRAFT_SPEC = {
+    'passenger_capacity': 180,
+    'cruise_speed': 470,
+    'fuel_burn_per_hour': 800,
+    'crew_required': 2,
+    'base_price': 110
+}
+# Per-assignment P&L, recomputed only when an assignment's route, frequency or fares change
+route_pnl = RoutePnLView(route_economics, ECONOMICS_AIRCRAFT_SPEC)
+flight_debug = FlightDebugChannel(
+    level=config_manager.get_preference('flight_debug_level', 'off'),
+    sample_rate=float(config_manager.get_preference('flight_debug_sample_rate', 1.0))
+)
+
+# Takeoffs, landings etc. from the flight event core, for /api/flight_events
+flight_event_log = deque(maxlen=500)
+arrivals_by_route = Counter()
+
+def record_flight_event(event):
+    flight_event_log.append(event)
+    if event['type'] == 'landing':
+        arrivals_by_route[f"{event['dep_airport']}-{event['arr_airport']}"] += 1
+
+for flight_event in ('takeoff', 'landing'):
+    flight_engine.events.on(flight_event, record_flight_event)
+
+# aircraft_update stream modes: 'full' resends every flight each tick,
+# 'delta' sends a keyframe once and then only changed fields per aircraft,
+# 'plans' sends flight plans on change and lets the client compute positions,
+# 'viewport' sends full flights only for the map tiles the client can see,
+# 'binary' sends fixed-width packed position records (see flight_stream.FRAME_DTYPE).
+# Each client is served at its own rate by the broadcast scheduler.
+STREAM_MODES = ('full', 'delta', 'plans', 'viewport', 'binary')
+# Largest profit surface /api/route_analysis/sweep evaluates, and numbers per streamed chunk
+MAX_SWEEP_POINTS = 250000
+SWEEP_CHUNK = 4096
+# /api/marketplace page size: default and largest allowed
+MARKETPLACE_PAGE_SIZE = 20
+MAX_MARKETPLACE_PAGE_SIZE = 100
+# Real seconds between market maker checks for a new simulated day
+MARKET_MAKER_INTERVAL = 1.0
+# Serializes engine loads against simulate/build_flights across threads
+simulation_lock = threading.Lock()
 
 def load_aircraft():
     """Load aircraft from database"""
@@ -118,250 +187,75 @@ def load_routes():
         print(f"Error loading routes: {e}")
         return []
 
-def calculate_curved_position(lat1, lon1, lat2, lon2, progress):
-    """Calculate position along curved 2D route path - matches frontend curve calculation"""
-    
-    # Calculate distance and direction
-    delta_lat = lat2 - lat1
-    delta_lon = lon2 - lon1
-    distance = math.sqrt(delta_lat * delta_lat + delta_lon * delta_lon)
-    
-    # For very short routes, use straight line
-    if distance < 5:
-        lat = lat1 + (lat2 - lat1) * progress
-        lon = lon1 + (lon2 - lon1) * progress
-        return lat, lon
-    
-    # Calculate curve parameters for 2D map (same as frontend)
-    mid_lat = (lat1 + lat2) / 2
-    mid_lon = (lon1 + lon2) / 2
-    
-    # Curve offset based on distance - smaller for 2D map
-    curve_offset = min(distance * 0.15, 15)  # Max 15 degree offset
-    
-    # Calculate perpendicular direction for curve
-    perp_lat = -delta_lon * (curve_offset / distance)
-    perp_lon = delta_lat * (curve_offset / distance)
-    
-    # Control point for curve
-    control_lat = mid_lat + perp_lat
-    control_lon = mid_lon + perp_lon
-    
-    # Quadratic Bezier curve formula
-    t = progress
-    lat = (1 - t) * (1 - t) * lat1 + 2 * (1 - t) * t * control_lat + t * t * lat2
-    lon = (1 - t) * (1 - t) * lon1 + 2 * (1 - t) * t * control_lon + t * t * lon2
-    
-    return lat, lon
-
 def load_assignments():
-    """Load current route assignments"""
-    try:
-        with sqlite3.connect(db_path) as conn:
-            query = """
-                SELECT ra.aircraft_id, ra.route_id, ra.frequency_weekly, 
-                       ra.fare_economy, ra.fare_business, ra.active,
-                       r.departure_airport, r.arrival_airport, r.distance_nm
-                FROM route_assignments ra
-                JOIN routes r ON ra.route_id = r.id
-                WHERE ra.active = 1
-            """
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute(query)
-            return [dict(row) for row in cursor.fetchall()]
-    except Exception as e:
-        print(f"Error loading assignments: {e}")
-        return []
+    """Load current route assignments (served from the in-memory registry)"""
+    return list(assignment_registry.get_assignments())
 
-def generate_active_flights(assignments, time_multiplier=1.0):
+def generate_active_flights(assignments, time_multiplier=1.0, version=None):
     """Generate real-time moving flights - ONE AIRCRAFT = ONE FLIGHT AT A TIME"""
-    # Use global reference time for consistent calculations
-    global reference_time
-    real_time = time.time()
-    # Calculate accelerated time based on our reference point
-    elapsed_real_time = real_time - reference_time
-    accelerated_elapsed_time = elapsed_real_time * time_multiplier
-    current_time = reference_time + accelerated_elapsed_time
-    active_flights = []
+    return simulate_tick(assignments, time_multiplier, version)[1]
+
+def simulate_tick(assignments, time_multiplier=1.0, version=None, build=True):
+    """One simulation step: (engine state arrays, flight dicts or None when not ``build``)"""
+    current_time = simulation_time(time_multiplier)
     
-    for assignment in assignments:
-        dep_airport = AIRPORTS.get(assignment['departure_airport'])
-        arr_airport = AIRPORTS.get(assignment['arrival_airport'])
-        
-        if not dep_airport or not arr_airport:
-            continue
-            
-        dep_lat, dep_lon = dep_airport['lat'], dep_airport['lon']
-        arr_lat, arr_lon = arr_airport['lat'], arr_airport['lon']
-        
-        # Calculate flight time based on distance (ULTRA fast game pace)
-        distance = math.sqrt((arr_lat - dep_lat)**2 + (arr_lon - dep_lon)**2)
-        flight_time_hours = max(0.005, distance * 0.02)  # ULTRA fast - flights in seconds!
-        
-        # Rest time between flights (visible parking period)
-        rest_time_hours = 0.01  # About 36 seconds rest between flights for visible parking
-        total_cycle_time = flight_time_hours + rest_time_hours
-        
-        # Calculate round-trip cycles (continuous operation)
-        frequency = assignment['frequency_weekly']
-        # One complete round trip = outbound flight + rest + return flight + rest
-        round_trip_duration_hours = (flight_time_hours + rest_time_hours) * 2
-        
-        # Current position in the round-trip cycle
-        current_cycle_time = (current_time / 3600) % round_trip_duration_hours  # Convert to hours
-        
-        # Debug info (reduced frequency to avoid spam)
-        if assignment == assignments[0] and int(current_time) % 10 == 0:  # Every 10 seconds only
-            print(f"🔍 Debug - Aircraft {assignment['aircraft_id']}: cycle_time={current_cycle_time:.3f}h, flight_time={flight_time_hours:.3f}h, round_trip={round_trip_duration_hours:.3f}h, speed={time_multiplier}x")
-        
-        # Determine current phase of round trip
-        first_leg_end = flight_time_hours  # End of outbound flight
-        first_rest_end = first_leg_end + rest_time_hours  # End of first rest
-        second_leg_end = first_rest_end + flight_time_hours  # End of return flight
-        # second_rest_end = second_leg_end + rest_time_hours  # End of second rest (cycle repeats)
-        
-        if current_cycle_time < first_leg_end:
-            # OUTBOUND FLIGHT: dep_airport → arr_airport
-            raw_progress = current_cycle_time / flight_time_hours
-            
-            # 🛬 SLOW DOWN LANDING: When close to ground (>90%), reduce progress speed by 50%
-            if raw_progress >= 0.90:
-                # Create slower landing phase - map 0.90-1.0 to 0.90-1.0 but with 50% speed
-                landing_phase = (raw_progress - 0.90) / 0.10  # 0.0 to 1.0 during landing
-                slowed_landing = landing_phase * 0.5  # Slow down by 50%
-                progress = 0.90 + (slowed_landing * 0.10)  # Map back to 0.90-1.0 range
-                if progress > 1.0:  # Cap at 100%
-                    progress = 1.0
-                print(f"🛬 SLOW LANDING: Aircraft {assignment['aircraft_id']} - raw: {raw_progress:.3f} → slowed: {progress:.3f}")
-            else:
-                progress = raw_progress
-                
-            # Use curved path calculation for 2D map
-            flight_lat, flight_lon = calculate_curved_position(dep_lat, dep_lon, arr_lat, arr_lon, progress)
-            
-            lat_diff = arr_lat - dep_lat
-            lon_diff = arr_lon - dep_lon
-            route_direction = f"{assignment['departure_airport']} → {assignment['arrival_airport']}"
-            current_dep = assignment['departure_airport']
-            current_arr = assignment['arrival_airport']
-            is_return_flight = False
-            
-        elif current_cycle_time < first_rest_end:
-            # 🅿️ RESTING AT ARRIVAL AIRPORT - aircraft parked on ground
-            flight_lat = arr_lat  # Parked at arrival airport
-            flight_lon = arr_lon
-            
-            lat_diff = 0  # No movement while parked
-            lon_diff = 0
-            route_direction = f"PARKED at {assignment['arrival_airport']}"
-            current_dep = assignment['arrival_airport']  # Currently at arrival airport
-            current_arr = assignment['departure_airport']  # Next destination is departure airport  
-            is_return_flight = False
-            progress = 0  # 0% progress while resting
-            
-        elif current_cycle_time < second_leg_end:
-            # RETURN FLIGHT: arr_airport → dep_airport  
-            flight_progress_time = current_cycle_time - first_rest_end
-            raw_progress = flight_progress_time / flight_time_hours
-            
-            # 🛬 SLOW DOWN LANDING: When close to ground (>90%), reduce progress speed by 50%
-            if raw_progress >= 0.90:
-                # Create slower landing phase - map 0.90-1.0 to 0.90-1.0 but with 50% speed
-                landing_phase = (raw_progress - 0.90) / 0.10  # 0.0 to 1.0 during landing
-                slowed_landing = landing_phase * 0.5  # Slow down by 50%
-                progress = 0.90 + (slowed_landing * 0.10)  # Map back to 0.90-1.0 range
-                if progress > 1.0:  # Cap at 100%
-                    progress = 1.0
-                print(f"🛬 SLOW LANDING: Aircraft {assignment['aircraft_id']} - raw: {raw_progress:.3f} → slowed: {progress:.3f}")
-            else:
-                progress = raw_progress
-                
-            # Use curved path calculation for 2D map (return flight: arr -> dep)
-            flight_lat, flight_lon = calculate_curved_position(arr_lat, arr_lon, dep_lat, dep_lon, progress)
-            
-            lat_diff = dep_lat - arr_lat
-            lon_diff = dep_lon - arr_lon
-            route_direction = f"{assignment['arrival_airport']} → {assignment['departure_airport']}"
-            current_dep = assignment['arrival_airport']
-            current_arr = assignment['departure_airport']
-            is_return_flight = True
-            
-        else:
-            # 🅿️ RESTING AT DEPARTURE AIRPORT - aircraft parked on ground
-            flight_lat = dep_lat  # Parked at departure airport
-            flight_lon = dep_lon
-            
-            lat_diff = 0  # No movement while parked
-            lon_diff = 0
-            route_direction = f"PARKED at {assignment['departure_airport']}"
-            current_dep = assignment['departure_airport']  # Currently at departure airport
-            current_arr = assignment['arrival_airport']   # Next destination is arrival airport
-            is_return_flight = False
-            progress = 0  # 0% progress while resting
-            
-        # Calculate heading for the current flight
-        heading = math.degrees(math.atan2(lon_diff, lat_diff))
-        if heading < 0:
-            heading += 360
-        
-        # Calculate realistic altitude based on flight phase
-        cruise_altitude = 35000  # Cruise altitude in feet
-        
-        if progress == 0:
-            # 🅿️ PARKED PHASE: Aircraft is resting at airport on ground
-            altitude = 0  # On the ground at airport
-            status = 'parked'
-            color = '#FFC107'  # Yellow/gold for parked aircraft
-        elif progress <= 0.05:
-            # TAKEOFF PHASE: Climb from 0 to cruise altitude
-            takeoff_progress = progress / 0.05  # 0 to 1 during takeoff
-            altitude = int(takeoff_progress * cruise_altitude)
-            status = 'departing'
-            color = 'green'
-        elif progress >= 0.90:
-            # LANDING PHASE: Descend from cruise altitude to 0 (extended phase for better viewing)
-            landing_progress = (1.0 - progress) / 0.10  # 1 to 0 during extended landing phase
-            altitude = int(landing_progress * cruise_altitude)
-            status = 'arriving'
-            color = 'orange'
-        else:
-            # CRUISE PHASE: Maintain cruise altitude
-            altitude = cruise_altitude
-            status = 'en_route'
-            color = 'red'
-        
-        flight_name = f"Flight {assignment['aircraft_id']}"
-        
-        active_flights.append({
-            'id': f"{assignment['aircraft_id']}",
-            'name': flight_name,
-            'lat': flight_lat,
-            'lon': flight_lon,
-            'heading': heading,
-            'aircraft_id': assignment['aircraft_id'],
-            'route': route_direction,
-            'progress': progress * 100,
-            'dep_airport': current_dep,
-            'arr_airport': current_arr,
-            'status': status,
-            'color': color,
-            'speed': f"{time_multiplier}x",
-            'altitude': altitude,  # Realistic altitude based on flight phase
-            'altitude_meters': altitude * 0.3048,  # Convert feet to meters for 3D globe
-            'ground_speed': 450 + (progress * 50),  # Simulated varying speed
-            'is_return_flight': is_return_flight,
-            'cycle_time_remaining': round_trip_duration_hours - current_cycle_time,
-            'rest_time_remaining': 0,
-            'debug_info': {
-                'current_cycle_time': current_cycle_time,
-                'flight_time_hours': flight_time_hours,
-                'round_trip_duration_hours': round_trip_duration_hours,
-                'time_multiplier': time_multiplier,
-                'phase': 'outbound' if not is_return_flight else 'return'
-            }
-        })
+    with simulation_lock:
+        flight_engine.load(assignments, version)
+        state = flight_engine.simulate(current_time)
+        active_flights = flight_engine.build_flights(state, time_multiplier) if build else None
+        # Phase/status transitions (incl. the slowed landing) go to /api/debug/flights
+        flight_debug.observe(flight_engine, state, current_time, version)
     
-    return active_flights
+    return state, active_flights
+
+def advance_simulation(assignments, version=None):
+    """Run the flight event core up to now - cheap when no event is due"""
+    with simulation_lock:
+        flight_engine.load(assignments, version)
+        return flight_engine.events.advance(simulation_time(time_speed))
+
+def simulation_time(time_multiplier=1.0):
+    """Accelerated simulation clock (seconds) - flight positions are a pure function of it"""
+    anchor_real_time, anchor_sim_time = sim_clock_anchor
+    # Calculate accelerated time since the last speed change
+    elapsed_real_time = time.time() - anchor_real_time
+    return anchor_sim_time + elapsed_real_time * time_multiplier
+
+def set_time_speed(new_speed):
+    """Change the clock rate from now on, without jumping simulation time"""
+    global time_speed, sim_clock_anchor
+    real_time = time.time()
+    anchor_real_time, anchor_sim_time = sim_clock_anchor
+    sim_clock_anchor = (real_time, anchor_sim_time + (real_time - anchor_real_time) * time_speed)
+    time_speed = new_speed
+
+def simulation_clock():
+    """Clock anchor for dead-reckoning clients: sim time now and how fast it advances"""
+    return {'sim_time': simulation_time(time_speed), 'time_speed': time_speed}
+
+def flight_plans_payload():
+    """Current flight plans plus a clock anchor, for 'plans' stream clients"""
+    version, assignments = assignment_registry.snapshot()
+    with simulation_lock:
+        flight_engine.load(assignments, version)
+        plans = flight_engine.flight_plans()
+    return {
+        'version': version,
+        'plans': plans,
+        'cycle_epoch': 0,
+        'clock': simulation_clock(),
+        'timestamp': datetime.now().isoformat()
+    }
+
+def frame_index_payload(version=None, assignments=None):
+    """Aircraft table that binary frame records index into, for 'binary' stream clients"""
+    if assignments is None:
+        version, assignments = assignment_registry.snapshot()
+    with simulation_lock:
+        flight_engine.load(assignments, version)
+        index = build_frame_index(flight_engine)
+    index['version'] = version
+    return index
 
 @app.route('/')
 def index():
@@ -380,6 +274,27 @@ def api_routes():
     routes = load_routes()
     return jsonify(routes)
 
+@app.route('/api/route_paths')
+def api_route_paths():
+    """Route line polylines keyed "DEP-ARR" - the same curves aircraft fly along.
+    
+    ``?routes=KJFK-KBOS,KBOS-KJFK`` limits the result; by default every route
+    in the database is returned in both directions.
+    """
+    if request.args.get('routes'):
+        pairs = [tuple(key.split('-', 1)) for key in request.args['routes'].split(',') if '-' in key]
+    else:
+        pairs = []
+        for route in load_routes():
+            pairs.append((route['departure_airport'], route['arrival_airport']))
+            pairs.append((route['arrival_airport'], route['departure_airport']))
+    
+    return jsonify({
+        f"{dep}-{arr}": route_paths.get(dep, arr).polyline()
+        for dep, arr in pairs
+        if dep in AIRPORTS and arr in AIRPORTS
+    })
+
 @app.route('/api/assignments')
 def api_assignments():
     """Get route assignments"""
@@ -391,26 +306,94 @@ def api_airports():
     """Get airport data"""
     return jsonify(AIRPORTS)
 
+def marketplace_filters(args):
+    """get_market_aircraft filters from /api/marketplace query parameters"""
+    filters = {}
+    if args.get('category'):
+        filters['category'] = AircraftCategory(args['category'].lower())
+    if args.get('condition'):
+        filters['condition'] = AircraftCondition(args['condition'].lower())
+    if args.get('financing'):
+        filters['financing'] = FinancingType(args['financing'].lower())
+    if args.get('location'):
+        filters['location'] = args['location'].upper()
+    for name in ('min_price', 'max_price', 'min_age', 'max_age'):
+        if args.get(name):
+            filters[name] = float(args[name])
+    return filters
+
+def encode_market_cursor(sort, order, value, aircraft_id):
+    """Opaque keyset cursor: the sort and the (value, id) of a page's last listing"""
+    return base64.urlsafe_b64encode(json.dumps([sort, order, value, aircraft_id]).encode()).decode()
+
+def decode_market_cursor(cursor, sort, order):
+    sort_key, order_key, value, aircraft_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    if (sort_key, order_key) != (sort, order):
+        raise ValueError("cursor belongs to a different sort order")
+    return float(value), str(aircraft_id)
+
+def market_listing(aircraft):
+    """A listing as /api/marketplace and marketplace_delta send it"""
+    return {
+        'id': aircraft.id,
+        'model': aircraft.spec.model,
+        'category': aircraft.spec.category.value,
+        'capacity': aircraft.spec.passenger_capacity,
+        'range': aircraft.spec.max_range,
+        'speed': aircraft.spec.cruise_speed,
+        'age': aircraft.age_years,
+        'condition': aircraft.condition.value,
+        'location': aircraft.location,
+        'price': aircraft.asking_price,
+        'lease_rate': aircraft.lease_rate_monthly,
+        'financing': [f.value for f in aircraft.financing_available]
+    }
+
 @app.route('/api/marketplace')
 def api_marketplace():
-    """Get aircraft marketplace data"""
+    """One page of marketplace listings.
+    
+    Query parameters: category, condition, financing, location, min_price,
+    max_price, min_age, max_age; sort (price or age), order (asc or desc),
+    limit and cursor (the previous page's next_cursor). Responses carry an
+    ETag, so re-requesting an unchanged page returns 304 without a body.
+    """
     try:
-        market_aircraft = aircraft_marketplace.get_market_aircraft()
-        aircraft_data = []
-        for aircraft in market_aircraft:
-            aircraft_data.append({
-                'id': aircraft.id,
-                'model': aircraft.spec.model,
-                'capacity': aircraft.spec.passenger_capacity,
-                'range': aircraft.spec.max_range,
-                'speed': aircraft.spec.cruise_speed,
-                'age': aircraft.age_years,
-                'condition': aircraft.condition.value,
-                'location': aircraft.location,
-                'price': aircraft.asking_price,
-                'lease_rate': aircraft.lease_rate_monthly
-            })
-        return jsonify(aircraft_data)
+        sort = request.args.get('sort', 'price')
+        order = request.args.get('order', 'asc')
+        if sort not in MARKET_SORT_COLUMNS or order not in ('asc', 'desc'):
+            raise ValueError(f"sort must be one of {', '.join(MARKET_SORT_COLUMNS)} and order asc or desc")
+        limit = min(max(request.args.get('limit', MARKETPLACE_PAGE_SIZE, type=int), 1), MAX_MARKETPLACE_PAGE_SIZE)
+        filters = marketplace_filters(request.args)
+        after = decode_market_cursor(request.args['cursor'], sort, order) if request.args.get('cursor') else None
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': f"Invalid marketplace query: {e}"}), 400
+    
+    try:
+        # One extra listing tells whether there is a next page
+        market_aircraft = aircraft_marketplace.get_market_aircraft(
+            filters, limit=limit + 1, sort=sort, descending=order == 'desc', after=after,
+            now=datetime.fromtimestamp(simulation_time(time_speed))
+        )
+        page = market_aircraft[:limit]
+        aircraft_data = [market_listing(aircraft) for aircraft in page]
+        
+        next_cursor = None
+        if len(market_aircraft) > limit:
+            last = page[-1]
+            next_cursor = encode_market_cursor(sort, order, getattr(last, MARKET_SORT_COLUMNS[sort]), last.id)
+        
+        response = jsonify({
+            'aircraft': aircraft_data,
+            'next_cursor': next_cursor,
+            'sort': sort,
+            'order': order,
+            'limit': limit
+        })
+        # Clients revalidate every time; an unchanged page is a bodiless 304
+        response.cache_control.no_cache = True
+        response.add_etag()
+        return response.make_conditional(request)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -465,6 +448,8 @@ def api_purchase():
         )
         
         print(f"💰 Purchase result: success={success}, message='{message}'")
+        if success:
+            socketio.emit('marketplace_delta', {'added': [], 'removed': [aircraft_id], 'repriced': []})
         
         aircraft_data = None
         if owned:
@@ -514,6 +499,8 @@ def api_sell_aircraft():
         
         # Attempt to sell aircraft
         success, message, sale_price = marketplace.sell_aircraft(aircraft_id)
+        if success:
+            assignment_registry.remove(aircraft_id)
         
         return jsonify({
             'success': success,
@@ -622,6 +609,7 @@ def api_assign_route():
         )
         
         if success:
+            assignment_registry.refresh_aircraft(aircraft_id)
             message = f"Route assigned successfully! Flying {max_frequency} times per week (with rest periods)."
         
         return jsonify({
@@ -663,6 +651,7 @@ def api_remove_assignment():
             
             if cursor.rowcount > 0:
                 conn.commit()
+                assignment_registry.remove(aircraft_id, route_id)
                 return jsonify({
                     'success': True,
                     'message': f'Route assignment removed successfully'
@@ -708,6 +697,7 @@ def api_cleanup_assignments():
             invalid_deactivated = result.rowcount
             
             conn.commit()
+            assignment_registry.invalidate()
             
             return jsonify({
                 'success': True,
@@ -809,7 +799,6 @@ def api_sync_aircraft():
 @app.route('/api/time_speed', methods=['POST'])
 def api_set_time_speed():
     """Set time speed multiplier"""
-    global time_speed
     try:
         data = request.get_json()
         new_speed = float(data.get('speed', 1.0))
@@ -818,10 +807,10 @@ def api_set_time_speed():
         if new_speed < 0.05 or new_speed > 200:
             return jsonify({'error': 'Speed must be between 0.05x and 200x'}), 400
             
-        time_speed = new_speed
+        set_time_speed(new_speed)
         
-        # Broadcast new speed to all clients
-        socketio.emit('time_speed_update', {'speed': time_speed})
+        # Broadcast new speed to all clients (the clock re-anchors dead-reckoning clients)
+        socketio.emit('time_speed_update', {'speed': time_speed, 'clock': simulation_clock()})
         
         print(f"⚡ Time speed set to {time_speed}x")
         return jsonify({'success': True, 'speed': time_speed})
@@ -833,7 +822,6 @@ def api_set_time_speed():
 def api_economics():
     """Get financial overview and economics data"""
     try:
-        assignments = load_assignments()
         aircraft = load_aircraft()
         
         # Calculate cash balance
@@ -850,76 +838,30 @@ def api_economics():
         except:
             fleet_value = 0
         
-        # Calculate monthly financial metrics
-        monthly_revenue = 0
-        monthly_costs = 0
+        # Monthly financial metrics come from the incrementally maintained P&L view
+        version, assignments = assignment_registry.snapshot()
+        route_pnl.sync(assignments, version)
+        totals = route_pnl.totals()
+        monthly_revenue = totals['monthly_revenue']
+        monthly_costs = totals['monthly_costs']
+        cost_breakdown = totals['cost_breakdown']
         route_performance = []
         
-        cost_breakdown = {
-            'fuel': 0,
-            'crew': 0,
-            'maintenance': 0,
-            'airport_fees': 0
-        }
+        # Handle potential string/integer mismatch between fleet and assignment ids
+        aircraft_by_id = {str(ac.get('id')): ac for ac in aircraft}
         
         for assignment in assignments:
             try:
-                # Validate assignment structure
-                required_fields = ['route_id', 'frequency_weekly', 'fare_economy', 'fare_business']
-                if not all(field in assignment for field in required_fields):
-                    print(f"Assignment missing required fields: {assignment}")
-                    continue
-                
-                # Simplified route profitability calculation
-                aircraft_spec = {
-                    'passenger_capacity': 180,
-                    'cruise_speed': 470,
-                    'fuel_burn_per_hour': 800,
-                    'crew_required': 2,
-                    'base_price': 110
-                }
-                
-                analysis = route_economics.calculate_route_profitability(
-                    assignment['route_id'], aircraft_spec, 
-                    assignment['frequency_weekly'], 
-                    assignment['fare_economy'], 
-                    assignment['fare_business']
-                )
-                
-                # Check if analysis returned an error
-                if 'error' in analysis:
-                    print(f"Route analysis error for {assignment['route_id']}: {analysis['error']}")
-                    continue
-                
-                # Check if analysis has the expected structure
-                if 'revenue' not in analysis or 'costs' not in analysis or 'profitability' not in analysis:
-                    print(f"Invalid analysis structure for {assignment['route_id']}: {list(analysis.keys())}")
+                analysis = route_pnl.get(assignment)
+                if analysis is None:
                     continue
                 
                 route_revenue = analysis['revenue']['monthly_revenue']
                 route_costs = analysis['costs']['monthly_total']
                 route_profit = analysis['profitability']['monthly_profit']
                 
-                monthly_revenue += route_revenue
-                monthly_costs += route_costs
-                
-                # Add to cost breakdown
-                costs = analysis['costs'].get('breakdown', {})
-                cost_breakdown['fuel'] += costs.get('fuel', 0)
-                cost_breakdown['crew'] += costs.get('crew', 0)
-                cost_breakdown['maintenance'] += costs.get('maintenance', 0)
-                cost_breakdown['airport_fees'] += costs.get('airport_fees', 0)
-                
                 # Get aircraft info for display
-                assigned_aircraft = None
-                assignment_aircraft_id = assignment.get('aircraft_id')
-                
-                for ac in aircraft:
-                    # Handle potential string/integer mismatch
-                    aircraft_id = ac.get('id')
-                    if str(aircraft_id) == str(assignment_aircraft_id):
-                        assigned_aircraft = ac
-                        break
+                assigned_aircraft = aircraft_by_id.get(str(assignment.get('aircraft_id')))
                 
                 # Extract aircraft type from available fields
                 if assigned_aircraft:
@@ -1013,44 +955,365 @@ def api_route_analysis():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def sweep_axis(value, default):
+    """Sweep values from a list, {"start", "stop", "step"} or {"start", "stop", "num"}"""
+    if value is None:
+        value = default
+    if isinstance(value, dict):
+        start, stop = float(value['start']), float(value['stop'])
+        step = float(value.get('step', 1))
+        if step <= 0:
+            raise ValueError("step must be positive")
+        count = int(value['num']) if 'num' in value else int((stop - start) / step) + 1
+        if count > MAX_SWEEP_POINTS:
+            raise ValueError(f"more than {MAX_SWEEP_POINTS} values")
+        if 'num' in value:
+            return np.linspace(start, stop, count)
+        return np.arange(start, stop + step / 2, step)
+    if not isinstance(value, list):
+        value = [value]
+    return np.array(value, dtype=np.float64)
+
+def json_number_chunks(values):
+    """Comma-joined JSON numbers (NaN as null), a chunk at a time"""
+    flat = np.round(values.reshape(-1), 2)
+    for start in range(0, flat.size, SWEEP_CHUNK):
+        chunk = flat[start:start + SWEEP_CHUNK]
+        text = ','.join('null' if v != v else repr(v) for v in chunk.tolist())
+        yield (',' if start else '') + text
+
+@app.route('/api/route_analysis/sweep', methods=['POST'])
+def api_route_analysis_sweep():
+    """What-if P&L surface for one route over aircraft, frequencies and fares.
+    
+    Body: ``route_id`` plus optional ``aircraft_specs`` (list of partial specs
+    over the default aircraft, each may carry a ``name``), ``frequencies``,
+    ``economy_fares`` and ``business_fares`` (lists or ranges, see
+    sweep_axis), ``business_ratio`` and ``month``. Without ``business_fares``
+    business follows economy at the route's market ratio. The response holds
+    the axes, the argmax with its full analysis, ``load_factor`` per economy
+    fare and ``monthly_profit`` as one flat row-major array (null where
+    undefined), streamed in chunks.
+    """
+    try:
+        data = request.get_json() or {}
+        route_id = data.get('route_id')
+        if not route_id:
+            return jsonify({'error': 'route_id is required'}), 400
+        specs = [dict(ECONOMICS_AIRCRAFT_SPEC, **spec) for spec in data.get('aircraft_specs') or [{}]]
+        for spec in specs:
+            for field in ECONOMICS_AIRCRAFT_SPEC:
+                spec[field] = float(spec[field])
+        frequencies = sweep_axis(data.get('frequencies'), [7, 14, 21])
+        economy_fares = sweep_axis(data.get('economy_fares'), {'start': 100, 'stop': 600, 'step': 10})
+        business_fares = sweep_axis(data['business_fares'], None) if data.get('business_fares') is not None else None
+        business_ratio = float(data.get('business_ratio', 0.15))
+        month = int(data['month']) if data.get('month') is not None else None
+        if month is not None and not 1 <= month <= 12:
+            return jsonify({'error': 'month must be 1-12'}), 400
+    except (TypeError, ValueError, KeyError) as e:
+        return jsonify({'error': f'Invalid sweep: {e}'}), 400
+    
+    points = len(specs) * frequencies.size * economy_fares.size * (business_fares.size if business_fares is not None else 1)
+    if points == 0 or points > MAX_SWEEP_POINTS:
+        return jsonify({'error': f'Sweep must have 1-{MAX_SWEEP_POINTS} points, got {points}'}), 400
+    
+    surface = route_economics.route_profit_surface(
+        route_id, specs, frequencies, economy_fares, business_fares, business_ratio, month)
+    if 'error' in surface:
+        return jsonify(surface), 404
+    
+    profit = surface['monthly_profit']
+    best = None
+    if not np.isnan(profit).all():
+        index = np.unravel_index(int(np.nanargmax(profit)), profit.shape)
+        fare_economy = float(economy_fares[index[2]])
+        if business_fares is not None:
+            fare_business = float(business_fares[index[3]])
+        else:
+            fare_business = float(surface['fare_business'][index[2]])
+        best = {
+            'index': [int(i) for i in index],
+            'aircraft': specs[index[0]].get('name', int(index[0])),
+            'frequency_weekly': float(frequencies[index[1]]),
+            'fare_economy': fare_economy,
+            'fare_business': fare_business,
+            'monthly_profit': float(profit[index]),
+            'monthly_revenue': float(surface['monthly_revenue'][index]),
+            'monthly_costs': float(surface['monthly_costs'][index]),
+            # Full P&L breakdown of the best configuration, as /api/route_analysis returns it
+            'analysis': route_economics.calculate_route_profitability_batch([{
+                'route_id': route_id, 'aircraft_spec': specs[index[0]],
+                'frequency_weekly': float(frequencies[index[1]]), 'fare_economy': fare_economy,
+                'fare_business': fare_business, 'business_ratio': business_ratio, 'month': month
+            }])[0]
+        }
+    
+    header = {
+        'route_id': route_id,
+        'month': month,
+        'order': ['aircraft', 'frequency_weekly', 'fare_economy'] + (['fare_business'] if business_fares is not None else []),
+        'shape': list(surface['shape']),
+        'axes': {
+            'aircraft': [spec.get('name', i) for i, spec in enumerate(specs)],
+            'frequency_weekly': frequencies.tolist(),
+            'fare_economy': economy_fares.tolist(),
+            'fare_business': business_fares.tolist() if business_fares is not None else None
+        },
+        'best': best,
+        'load_factor': [round(v, 4) for v in surface['load_factor'].tolist()]
+    }
+    
+    def generate():
+        yield json.dumps(header)[:-1] + ',"monthly_profit":['
+        yield from json_number_chunks(profit)
+        yield ']}'
+    
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
 @socketio.on('connect')
 def handle_connect():
     """Handle client connection"""
     print('Client connected')
+    # Clients start on the full stream until they ask for another mode
+    stream_scheduler.add_client(request.sid)
     # Send initial data
-    emit('time_speed_update', {'speed': time_speed})
+    emit('time_speed_update', {'speed': time_speed, 'clock': simulation_clock()})
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnection"""
+    stream_scheduler.remove_client(request.sid)
     print('Client disconnected')
 
-def broadcast_aircraft_updates():
-    """Background thread to broadcast aircraft position updates"""
-    while True:
+@socketio.on('aircraft_stream')
+def handle_aircraft_stream(data):
+    """Choose this client's aircraft protocol and negotiate its frame rate.
+    
+    ``rate`` is frames per second (capped at the scheduler tick rate); with
+    ``ack`` set the client acknowledges each frame and frames are skipped
+    while one is still unacknowledged.
+    """
+    data = data or {}
+    mode = data.get('mode', 'full')
+    if mode not in STREAM_MODES:
+        mode = 'full'
+    try:
+        rate = float(data['rate']) if data.get('rate') is not None else None
+    except (TypeError, ValueError):
+        rate = None
+    client = stream_scheduler.configure(request.sid, mode, rate=rate, ack=data.get('ack'))
+    
+    if mode == 'delta':
+        send_keyframe()
+    elif mode == 'plans':
+        payload = flight_plans_payload()
+        client.sent_version = payload['version']
+        emit('flight_plans', payload)
+    elif mode == 'binary':
+        payload = frame_index_payload()
+        client.sent_version = payload['version']
+        emit('aircraft_frame_index', payload)
+
+@socketio.on('aircraft_viewport')
+def handle_aircraft_viewport(data):
+    """Scope this client's aircraft stream to the tiles covering its map viewport"""
+    try:
+        data = data or {}
+        level, tiles = viewport_tiles(float(data['south']), float(data['west']),
+                                      float(data['north']), float(data['east']),
+                                      float(data.get('zoom', 0)))
+    except (KeyError, TypeError, ValueError):
+        emit('aircraft_viewport_tiles', {'error': 'Viewport needs south, west, north, east and zoom'})
+        return
+    
+    client = stream_scheduler.client(request.sid)
+    if client is None or client.mode != 'viewport':
+        client = stream_scheduler.configure(request.sid, 'viewport')
+    client.tile_level = level
+    client.tiles = set(tiles)
+    
+    emit('aircraft_viewport_tiles', {'level': level, 'tiles': sorted(tiles)})
+
+@socketio.on('aircraft_resync')
+def handle_aircraft_resync():
+    """Client detected a gap in the delta sequence - resend the full state"""
+    send_keyframe()
+
+def send_keyframe():
+    """Send the requesting client's current delta-stream state"""
+    client = stream_scheduler.client(request.sid)
+    if client is None or client.encoder is None:
+        return
+    frame = client.encoder.keyframe()
+    frame['timestamp'] = datetime.now().isoformat()
+    frame['time_speed'] = time_speed
+    emit('aircraft_keyframe', frame)
+
+def default_stream_interval():
+    """Frame interval for clients that did not negotiate a rate"""
+    # Balanced update frequency - fast but not overwhelming
+    if time_speed <= 10:
+        return 1.0  # 1 second for normal speeds
+    elif time_speed <= 50:
+        return 0.5  # 0.5 seconds for high speeds
+    return 0.2  # 0.2 seconds for ludicrous speeds
+
+stream_scheduler = BroadcastScheduler(socketio, default_interval=default_stream_interval)
+
+def broadcast_tick(now):
+    """One scheduler tick: simulate once, then serve every client that is due a frame"""
+    # Flight events fire on every tick, with or without clients
+    version, assignments = assignment_registry.snapshot()
+    advance_simulation(assignments, version)
+    
+    due = stream_scheduler.due_clients(now)
+    if not due:
+        return
+    
+    modes = {client.mode for client in due}
+    
+    # Positions only depend on the clock, so there is nothing to simulate for nobody
+    state = active_flights = None
+    build = bool(modes & {'full', 'delta', 'viewport'})
+    if build or 'binary' in modes:
+        state, active_flights = simulate_tick(assignments, time_speed, version, build)
+    
+    timestamp = datetime.now().isoformat()
+    shared = {}  # Per-tick payloads shared by every client of a mode
+    
+    def tile_buckets(level):
+        if 'tile_arrays' not in shared:
+            shared['tile_arrays'] = (
+                np.array([flight['lat'] for flight in active_flights], dtype=np.float64),
+                np.array([flight['lon'] for flight in active_flights], dtype=np.float64),
+                lod_priority([flight['id'] for flight in active_flights])
+            )
+        if level not in shared:
+            shared[level] = bucket_by_tile(*shared['tile_arrays'], level)
+        return shared[level]
+    
+    for client in due:
         try:
-            assignments = load_assignments()
-            active_flights = generate_active_flights(assignments, time_speed)
+            if client.mode == 'full':
+                stream_scheduler.send_frame(client, 'aircraft_update', {
+                    'flights': active_flights,
+                    'timestamp': timestamp,
+                    'time_speed': time_speed
+                })
             
-            # Broadcast to all connected clients
-            socketio.emit('aircraft_update', {
-                'flights': active_flights,
-                'timestamp': datetime.now().isoformat(),
-                'time_speed': time_speed
-            })
+            elif client.mode == 'delta':
+                frame = client.encoder.encode(active_flights)
+                frame['timestamp'] = timestamp
+                frame['time_speed'] = time_speed
+                stream_scheduler.send_frame(client, 'aircraft_delta', frame)
             
-            # Balanced update frequency - fast but not overwhelming
-            if time_speed <= 10:
-                update_interval = 1.0  # 1 second for normal speeds
-            elif time_speed <= 50:
-                update_interval = 0.5  # 0.5 seconds for high speeds  
-            else:
-                update_interval = 0.2  # 0.2 seconds for ludicrous speeds
-            time.sleep(update_interval)
+            elif client.mode == 'viewport':
+                buckets = tile_buckets(client.tile_level)
+                # The frame is the whole view: subscribed tiles left out of it are empty
+                stream_scheduler.send_frame(client, 'aircraft_tile_update', {
+                    'level': client.tile_level,
+                    'tiles': {tile: [active_flights[i] for i in buckets[tile]]
+                              for tile in sorted(client.tiles) if tile in buckets},
+                    'timestamp': timestamp,
+                    'time_speed': time_speed
+                })
+            
+            elif client.mode == 'binary':
+                # Records index into the aircraft table, so resend it whenever it changes
+                if client.sent_version != version:
+                    if 'frame_index' not in shared:
+                        shared['frame_index'] = frame_index_payload(version, assignments)
+                    stream_scheduler.emit(client, 'aircraft_frame_index', shared['frame_index'])
+                    client.sent_version = version
+                if 'frame' not in shared:
+                    shared['frame'] = pack_frame(state)
+                stream_scheduler.send_frame(client, 'aircraft_frame', {
+                    'seq': stream_scheduler.ticks,
+                    'version': version,
+                    'timestamp': timestamp,
+                    'time_speed': time_speed,
+                    'frame': shared['frame']
+                })
             
+            elif client.mode == 'plans' and client.sent_version != version:
+                # Dead-reckoning clients only hear about assignment changes
+                if 'plans' not in shared:
+                    shared['plans'] = flight_plans_payload()
+                stream_scheduler.emit(client, 'flight_plans', shared['plans'])
+                client.sent_version = shared['plans']['version']
+        except Exception as e:
+            print(f"Error streaming aircraft to client {client.sid}: {e}")
+
+def broadcast_aircraft_updates():
+    """Background thread to broadcast aircraft position updates"""
+    stream_scheduler.run(broadcast_tick)
+
+def run_market_maker():
+    """Background thread: churn the marketplace each simulated day and push the changes"""
+    while True:
+        try:
+            delta = market_maker.advance(datetime.fromtimestamp(simulation_time(time_speed)))
+            if delta:
+                delta['added'] = [market_listing(aircraft) for aircraft in delta['added']]
+                socketio.emit('marketplace_delta', delta)
+                print(f"🏪 Market day {delta['date'][:10]}: {len(delta['added'])} listed, "
+                      f"{len(delta['removed'])} expired, {len(delta['repriced'])} marked down")
         except Exception as e:
-            print(f"Error in broadcast thread: {e}")
-            time.sleep(5)
+            print(f"Error running market maker: {e}")
+        time.sleep(MARKET_MAKER_INTERVAL)
+
+@app.route('/api/debug/flights', methods=['GET', 'POST'])
+def api_debug_flights():
+    """Recent sampled flight phase transitions; POST {level, sample_rate, capacity} to configure"""
+    try:
+        if request.method == 'POST':
+            data = request.get_json() or {}
+            flight_debug.configure(data.get('level'), data.get('sample_rate'), data.get('capacity'))
+            print(f"🔍 Flight debug channel: level={flight_debug.level_name}, sample_rate={flight_debug.sample_rate}")
+        
+        limit = request.args.get('limit', 100, type=int)
+        return jsonify({
+            'level': flight_debug.level_name,
+            'sample_rate': flight_debug.sample_rate,
+            'capacity': flight_debug.transitions.maxlen,
+            'total_transitions': flight_debug.total_transitions,
+            'summary': flight_debug.summary,
+            'transitions': flight_debug.recent(request.args.get('aircraft_id'), limit)
+        })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/flight_events')
+def api_flight_events():
+    """Recent takeoffs/landings from the flight event core and arrivals per directed route"""
+    limit = request.args.get('limit', 100, type=int)
+    aircraft_id = request.args.get('aircraft_id')
+    events = list(flight_event_log)
+    if aircraft_id is not None:
+        events = [e for e in events if str(e['aircraft_id']) == aircraft_id]
+    return jsonify({
+        'sim_time': simulation_time(time_speed),
+        'events_processed': flight_engine.events.events_processed,
+        'pending_events': len(flight_engine.events),
+        'arrivals_by_route': dict(arrivals_by_route),
+        'events': events[::-1][:limit]
+    })
+
+@app.route('/api/broadcast_stats')
+def api_broadcast_stats():
+    """Broadcast scheduler counters: tick duration, lag and per-client frames sent/dropped"""
+    return jsonify(stream_scheduler.stats())
+
+@app.route('/api/profitability_cache_stats')
+def api_profitability_cache_stats():
+    """Route P&L memo counters: hits, misses, evictions and size"""
+    return jsonify(route_economics.profitability_cache.stats())
+
+@app.route('/api/market_maker_stats')
+def api_market_maker_stats():
+    """Market maker counters: simulated market date, days run, listings added/expired/marked down"""
+    return jsonify(market_maker.stats())
 
 @app.route('/api/ai_competition', methods=['GET'])
 def api_ai_competition():
@@ -1115,6 +1378,8 @@ if __name__ == '__main__':
     # Start background thread for aircraft updates
     update_thread = threading.Thread(target=broadcast_aircraft_updates, daemon=True)
     update_thread.start()
+    market_thread = threading.Thread(target=run_market_maker, daemon=True)
+    market_thread.start()
     
     print("🚀 Starting Flask app with Socket.IO...")
     print("✈️ Aircraft will update in real-time via WebSocket!")
@@ -2,12 +2,21 @@
 
 import sqlite3
 import json
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, fields
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
 from enum import Enum
 import random
 import math
+import threading
+
+import numpy as np
+
+from modules.schema_versions import applied_version, record_version
+
+# Bump these to re-run the marketplace migration / spec seeding on existing databases
+MARKETPLACE_SCHEMA_VERSION = 3
+SPEC_SEED_VERSION = 1
 
 class AircraftCondition(Enum):
     NEW = "new"
@@ -28,9 +37,9 @@ class FinancingType(Enum):
     LEASE = "lease"
     LOAN = "loan"
 
-@dataclass
+@dataclass(frozen=True)
 class AircraftSpec:
-    """Comprehensive aircraft specifications"""
+    """Comprehensive aircraft specifications (immutable - one instance is shared per model)"""
     model: str
     manufacturer: str
     category: AircraftCategory
@@ -50,6 +59,9 @@ class AircraftSpec:
 @dataclass
 class MarketAircraft:
     """Aircraft available for purchase/lease in the marketplace"""
+    __slots__ = ('id', 'spec', 'condition', 'age_years', 'total_flight_hours', 'cycles', 'asking_price',
+                 'lease_rate_monthly', 'seller_type', 'location', 'available_until', 'maintenance_due_hours',
+                 'financing_available')
     id: str
     spec: AircraftSpec
     condition: AircraftCondition
@@ -67,6 +79,9 @@ class MarketAircraft:
 @dataclass
 class OwnedAircraft:
     """Aircraft owned by the player's airline"""
+    __slots__ = ('id', 'spec', 'condition', 'age_years', 'total_flight_hours', 'cycles', 'purchase_price',
+                 'current_value', 'financing_type', 'monthly_payment', 'remaining_payments', 'location',
+                 'maintenance_due_hours', 'last_maintenance', 'utilization_hours_month', 'route_assignments')
     id: str
     spec: AircraftSpec
     condition: AircraftCondition
@@ -84,6 +99,215 @@ class OwnedAircraft:
     utilization_hours_month: float
     route_assignments: List[str]  # route IDs assigned to this aircraft
 
+AIRCRAFT_SPEC_COLUMNS = tuple(field.name for field in fields(AircraftSpec))
+
+# Listing columns; the spec lives in aircraft_specs, keyed by model. category is
+# copied from the spec so the category indexes can serve filtered queries.
+MARKET_AIRCRAFT_COLUMNS = (
+    'id', 'model', 'category', 'condition', 'age_years', 'total_flight_hours', 'cycles',
+    'asking_price', 'lease_rate_monthly', 'seller_type', 'location', 'available_until',
+    'maintenance_due_hours', 'financing_available'
+)
+
+# Specs are attached from the SpecRegistry rather than joined per row
+MARKET_AIRCRAFT_QUERY = "SELECT " + ", ".join(f"m.{column}" for column in MARKET_AIRCRAFT_COLUMNS) + " FROM market_aircraft m"
+
+# Listing sort orders: sort key -> column. Ties break on id, so every order is total
+# and a page can resume after its last (value, id) - see get_market_aircraft.
+MARKET_SORT_COLUMNS = {
+    'price': 'asking_price',
+    'age': 'age_years',
+}
+
+# (name, columns) - each equality filter column is followed by a sort column and id,
+# so filtered, sorted pages are index range scans
+MARKET_AIRCRAFT_INDEXES = (
+    ('idx_market_aircraft_category_price', 'category, asking_price, id'),
+    ('idx_market_aircraft_category_age', 'category, age_years, id'),
+    ('idx_market_aircraft_location_price', 'location, asking_price, id'),
+    ('idx_market_aircraft_location_age', 'location, age_years, id'),
+    ('idx_market_aircraft_price', 'asking_price, id'),
+    ('idx_market_aircraft_age', 'age_years, id'),
+    ('idx_market_aircraft_model', 'model'),
+    ('idx_market_aircraft_available_until', 'available_until'),  # Expiry sweeps and markdowns
+)
+
+# Listing index names carry one of these suffixes. A regeneration indexes its shadow
+# table under the set the live table isn't using, so swapping it in is just a rename.
+MARKET_INDEX_SETS = ('', '_b')
+
+# Listing generation. Conditions run best to worst: a listing younger than the
+# first age band is new, in each later band it is one of two neighbouring conditions.
+LISTING_CONDITIONS = tuple(AircraftCondition)
+CONDITION_AGE_BANDS = (2, 5, 10, 20)  # years
+CONDITION_VALUE_FACTORS = (1.0, 0.95, 0.85, 0.70, 0.50)  # share of depreciated value, per LISTING_CONDITIONS
+ANNUAL_DEPRECIATION = 0.04
+EXPECTED_ANNUAL_HOURS = 3000
+# Flight hours per cycle: short sectors cycle more often; other categories fly long-haul
+CYCLE_HOURS = {AircraftCategory.REGIONAL: 1.2, AircraftCategory.NARROW_BODY: 2.0}
+LONG_HAUL_CYCLE_HOURS = 6.0
+SELLER_TYPES = ("manufacturer", "airline", "leasing_company")
+MARKET_LOCATIONS = ("JFK", "LAX", "LHR", "CDG", "FRA", "NRT", "SIN", "DXB")
+LISTING_DAYS = (7, 90)  # Listings stay on the market this many days (inclusive)
+LISTING_BATCH_SIZE = 50_000
+
+# A regeneration is written here and renamed over market_aircraft when complete
+MARKET_SHADOW_TABLE = 'market_aircraft_next'
+
+AIRCRAFT_SPECS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS aircraft_specs (
+        model TEXT PRIMARY KEY,
+        manufacturer TEXT NOT NULL,
+        category TEXT NOT NULL,
+        passenger_capacity INTEGER NOT NULL,
+        cargo_capacity REAL NOT NULL,
+        max_range INTEGER NOT NULL,
+        cruise_speed INTEGER NOT NULL,
+        fuel_capacity REAL NOT NULL,
+        fuel_burn_per_hour REAL NOT NULL,
+        mtow REAL NOT NULL,
+        runway_length_required INTEGER NOT NULL,
+        base_price REAL NOT NULL,
+        annual_maintenance_cost REAL NOT NULL,
+        crew_required INTEGER NOT NULL,
+        introduction_year INTEGER NOT NULL
+    )
+'''
+
+# {table}: market_aircraft, or the shadow table a regeneration is written to
+MARKET_AIRCRAFT_TABLE = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        id TEXT PRIMARY KEY,
+        model TEXT NOT NULL REFERENCES aircraft_specs (model),
+        category TEXT NOT NULL,
+        condition TEXT NOT NULL,
+        age_years REAL NOT NULL,
+        total_flight_hours INTEGER NOT NULL,
+        cycles INTEGER NOT NULL,
+        asking_price REAL NOT NULL,
+        lease_rate_monthly REAL NOT NULL,
+        seller_type TEXT NOT NULL,
+        location TEXT NOT NULL,
+        available_until TEXT NOT NULL,
+        maintenance_due_hours INTEGER NOT NULL,
+        financing_available TEXT NOT NULL
+    )
+'''
+
+def listing_conditions(age_years: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Index into LISTING_CONDITIONS for each listing age"""
+    band = np.searchsorted(CONDITION_AGE_BANDS, age_years, side='right')
+    return np.where(band == 0, 0, band - 1 + rng.integers(0, 2, len(age_years)))
+
+def market_values(base_price: np.ndarray, age_years: np.ndarray, condition: np.ndarray,
+                  flight_hours: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Asking prices: depreciated base price by condition and utilization, with +/-10% market noise"""
+    expected_hours = age_years * EXPECTED_ANNUAL_HOURS
+    # High utilization is penalized, low utilization can be good
+    utilization = np.where(flight_hours > expected_hours * 1.3, 0.9,
+                           np.where(flight_hours < expected_hours * 0.7, 1.05, 1.0))
+    value = (base_price * (1 - ANNUAL_DEPRECIATION) ** age_years *
+             np.array(CONDITION_VALUE_FACTORS)[condition] * utilization)
+    return np.round(value * rng.uniform(0.9, 1.1, len(age_years)), 2)
+
+def create_marketplace_tables(cursor: sqlite3.Cursor):
+    """Marketplace tables and indexes (idempotent)"""
+    # Aircraft specifications, one row per model
+    cursor.execute(AIRCRAFT_SPECS_TABLE)
+    
+    # Market aircraft table
+    cursor.execute(MARKET_AIRCRAFT_TABLE.format(table='market_aircraft'))
+    
+    # Owned aircraft table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS owned_aircraft (
+            id TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            condition TEXT NOT NULL,
+            age_years REAL NOT NULL,
+            total_flight_hours INTEGER NOT NULL,
+            cycles INTEGER NOT NULL,
+            purchase_price REAL NOT NULL,
+            current_value REAL NOT NULL,
+            financing_type TEXT NOT NULL,
+            monthly_payment REAL NOT NULL,
+            remaining_payments INTEGER NOT NULL,
+            location TEXT NOT NULL,
+            maintenance_due_hours INTEGER NOT NULL,
+            last_maintenance TEXT NOT NULL,
+            utilization_hours_month REAL NOT NULL,
+            route_assignments TEXT NOT NULL,
+            spec_data TEXT NOT NULL
+        )
+    ''')
+    
+    # Aircraft transactions table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS aircraft_transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            aircraft_id TEXT NOT NULL,
+            transaction_type TEXT NOT NULL,
+            amount REAL NOT NULL,
+            transaction_date TEXT NOT NULL,
+            details TEXT
+        )
+    ''')
+    
+    # The old blob index could never serve a category filter
+    cursor.execute("DROP INDEX IF EXISTS idx_market_aircraft_category")
+    create_market_indexes(cursor, 'market_aircraft', market_index_set(cursor, 'market_aircraft'))
+
+def market_index_set(cursor: sqlite3.Cursor, table: str) -> str:
+    """Suffix of the listing indexes on ``table`` (the first set if it has none)"""
+    names = {row[0] for row in cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (table,))}
+    return next((suffix for suffix in MARKET_INDEX_SETS if MARKET_AIRCRAFT_INDEXES[0][0] + suffix in names),
+                MARKET_INDEX_SETS[0])
+
+def create_market_indexes(cursor: sqlite3.Cursor, table: str, suffix: str):
+    for name, columns in MARKET_AIRCRAFT_INDEXES:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name}{suffix} ON {table}({columns})")
+
+def migrate_market_aircraft(cursor: sqlite3.Cursor) -> int:
+    """Move a pre-normalization market_aircraft table (spec JSON in spec_data) to the current layout.
+    
+    Specs of models found in listings are added to aircraft_specs, then the
+    table is rebuilt without spec_data and with a category column. Returns
+    the number of listings dropped because their spec could not be read.
+    """
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(market_aircraft)")]
+    if 'spec_data' not in columns:
+        return 0
+    
+    cursor.execute(AIRCRAFT_SPECS_TABLE)
+    for model, spec_data in cursor.execute("SELECT model, spec_data FROM market_aircraft GROUP BY model").fetchall():
+        try:
+            spec = json.loads(spec_data)
+            values = tuple(spec[column] for column in AIRCRAFT_SPEC_COLUMNS)
+        except (ValueError, KeyError, TypeError):
+            continue
+        cursor.execute(f"INSERT OR IGNORE INTO aircraft_specs VALUES ({', '.join('?' * len(values))})", values)
+    
+    cursor.execute("ALTER TABLE market_aircraft RENAME TO market_aircraft_old")
+    # Indexes follow the renamed table; drop them so the new table can reuse the names
+    for (name,) in cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'market_aircraft_old' "
+            "AND sql IS NOT NULL").fetchall():
+        cursor.execute(f"DROP INDEX {name}")
+    create_marketplace_tables(cursor)
+    
+    listing_columns = [column for column in MARKET_AIRCRAFT_COLUMNS if column != 'category']
+    cursor.execute(f'''
+        INSERT INTO market_aircraft ({", ".join(MARKET_AIRCRAFT_COLUMNS)})
+        SELECT {", ".join(f"m.{column}" for column in listing_columns[:2])}, s.category,
+               {", ".join(f"m.{column}" for column in listing_columns[2:])}
+        FROM market_aircraft_old m JOIN aircraft_specs s ON s.model = m.model
+    ''')
+    migrated = cursor.rowcount
+    total = cursor.execute("SELECT COUNT(*) FROM market_aircraft_old").fetchone()[0]
+    cursor.execute("DROP TABLE market_aircraft_old")
+    return total - migrated
+
 class AircraftDatabase:
     """Manages aircraft specifications and market data"""
     
@@ -103,6 +327,67 @@ class AircraftDatabase:
     def get_specs_by_category(self, category: AircraftCategory) -> List[AircraftSpec]:
         return [spec for spec in self.aircraft_specs.values() if spec.category == category]
 
+def spec_from_dict(spec_dict: Dict) -> AircraftSpec:
+    """AircraftSpec from a dict with the category as its string value"""
+    return AircraftSpec(**dict(spec_dict, category=AircraftCategory(spec_dict['category'])))
+
+class SpecRegistry:
+    """Interned aircraft specs: one shared AircraftSpec object per distinct spec.
+    
+    Listings and owned aircraft are hydrated against this registry, so
+    100k rows of a handful of models hold a handful of spec objects
+    instead of parsing and building one per row. Specs are looked up by
+    model (from the aircraft_specs table, re-read when an unknown model
+    turns up) or by the spec_data JSON stored with owned aircraft, which
+    is parsed once per distinct string.
+    """
+    
+    def __init__(self, db_path: str, specs=()):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._interned: Dict[AircraftSpec, AircraftSpec] = {}
+        self._by_model: Dict[str, AircraftSpec] = {}
+        self._by_json: Dict[str, AircraftSpec] = {}
+        self._unknown = set()  # Models not in aircraft_specs at the last reload
+        for spec in specs:
+            self._by_model[spec.model] = self.intern(spec)
+    
+    def intern(self, spec: AircraftSpec) -> AircraftSpec:
+        """The shared instance equal to ``spec``"""
+        return self._interned.setdefault(spec, spec)
+    
+    def get(self, model: str) -> Optional[AircraftSpec]:
+        """Current spec for a model, None if aircraft_specs doesn't have it"""
+        spec = self._by_model.get(model)
+        if spec is None and model not in self._unknown:
+            self.reload()
+            spec = self._by_model.get(model)
+            if spec is None:
+                self._unknown.add(model)
+        return spec
+    
+    def from_json(self, spec_data: str) -> AircraftSpec:
+        """Spec stored as JSON (owned_aircraft.spec_data)"""
+        spec = self._by_json.get(spec_data)
+        if spec is None:
+            with self._lock:
+                spec = self._by_json[spec_data] = self.intern(spec_from_dict(json.loads(spec_data)))
+        return spec
+    
+    def reload(self):
+        """Re-read aircraft_specs"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                rows = conn.execute(f"SELECT {', '.join(AIRCRAFT_SPEC_COLUMNS)} FROM aircraft_specs").fetchall()
+        except sqlite3.Error as e:
+            print(f"Error loading aircraft specs: {e}")
+            return
+        with self._lock:
+            for row in rows:
+                spec = self.intern(spec_from_dict(dict(zip(AIRCRAFT_SPEC_COLUMNS, row))))
+                self._by_model[spec.model] = spec
+            self._unknown = set()
+
 class AircraftMarketplace:
     """Main aircraft marketplace system"""
     
@@ -110,194 +395,198 @@ class AircraftMarketplace:
         self.db_path = db_path
         self.aircraft_db = AircraftDatabase()
         self.init_database()
+        self.specs = SpecRegistry(db_path, self.aircraft_db.aircraft_specs.values())
+        self._financing_options: Dict[str, Tuple[FinancingType, ...]] = {}
         
     def init_database(self):
-        """Initialize marketplace database tables"""
+        """Create or migrate marketplace tables and seed aircraft specs once per version"""
         conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Market aircraft table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS market_aircraft (
-                id TEXT PRIMARY KEY,
-                model TEXT NOT NULL,
-                condition TEXT NOT NULL,
-                age_years REAL NOT NULL,
-                total_flight_hours INTEGER NOT NULL,
-                cycles INTEGER NOT NULL,
-                asking_price REAL NOT NULL,
-                lease_rate_monthly REAL NOT NULL,
-                seller_type TEXT NOT NULL,
-                location TEXT NOT NULL,
-                available_until TEXT NOT NULL,
-                maintenance_due_hours INTEGER NOT NULL,
-                financing_available TEXT NOT NULL,
-                spec_data TEXT NOT NULL
-            )
-        ''')
-        
-        # Owned aircraft table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS owned_aircraft (
-                id TEXT PRIMARY KEY,
-                model TEXT NOT NULL,
-                condition TEXT NOT NULL,
-                age_years REAL NOT NULL,
-                total_flight_hours INTEGER NOT NULL,
-                cycles INTEGER NOT NULL,
-                purchase_price REAL NOT NULL,
-                current_value REAL NOT NULL,
-                financing_type TEXT NOT NULL,
-                monthly_payment REAL NOT NULL,
-                remaining_payments INTEGER NOT NULL,
-                location TEXT NOT NULL,
-                maintenance_due_hours INTEGER NOT NULL,
-                last_maintenance TEXT NOT NULL,
-                utilization_hours_month REAL NOT NULL,
-                route_assignments TEXT NOT NULL,
-                spec_data TEXT NOT NULL
-            )
-        ''')
-        
-        # Aircraft transactions table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS aircraft_transactions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                aircraft_id TEXT NOT NULL,
-                transaction_type TEXT NOT NULL,
-                amount REAL NOT NULL,
-                transaction_date TEXT NOT NULL,
-                details TEXT
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        try:
+            if (applied_version(conn, 'aircraft_marketplace.schema') >= MARKETPLACE_SCHEMA_VERSION and
+                    applied_version(conn, 'aircraft_marketplace.spec_seed') >= SPEC_SEED_VERSION):
+                return
+            
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            # Specs go in first so migrated listings can take their category from them
+            cursor.execute(AIRCRAFT_SPECS_TABLE)
+            if applied_version(conn, 'aircraft_marketplace.spec_seed') < SPEC_SEED_VERSION:
+                self.seed_aircraft_specs(cursor)
+                record_version(cursor, 'aircraft_marketplace.spec_seed', SPEC_SEED_VERSION)
+            schema_version = applied_version(conn, 'aircraft_marketplace.schema')
+            if schema_version < MARKETPLACE_SCHEMA_VERSION:
+                dropped = migrate_market_aircraft(cursor)
+                if dropped:
+                    print(f"⚠️  Dropped {dropped} market listings without a readable aircraft spec")
+                if schema_version == 1:
+                    # Version 2 added id to the age indexes; rebuild them
+                    for name, _ in MARKET_AIRCRAFT_INDEXES:
+                        for suffix in MARKET_INDEX_SETS:
+                            cursor.execute(f"DROP INDEX IF EXISTS {name}{suffix}")
+                create_marketplace_tables(cursor)
+                record_version(cursor, 'aircraft_marketplace.schema', MARKETPLACE_SCHEMA_VERSION)
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def seed_aircraft_specs(self, cursor: sqlite3.Cursor):
+        """Write the AircraftDatabase specs to aircraft_specs"""
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO aircraft_specs VALUES ({', '.join('?' * len(AIRCRAFT_SPEC_COLUMNS))})",
+            [tuple(self._spec_to_dict(spec).values()) for spec in self.aircraft_db.aircraft_specs.values()]
+        )
     
-    def generate_market_aircraft(self, count: int = 50) -> List[MarketAircraft]:
+    def generate_market_aircraft(self, count: int = 50, seed: Optional[int] = None) -> List[MarketAircraft]:
         """Generate realistic market aircraft for sale/lease"""
-        market_aircraft = []
-        
-        for _ in range(count):
-            # Randomly select aircraft model
-            model = random.choice(list(self.aircraft_db.aircraft_specs.keys()))
-            spec = self.aircraft_db.get_spec(model)
-            
-            # Generate realistic aircraft characteristics
-            age_years = random.uniform(0, 25)
-            condition = self._determine_condition(age_years)
-            
-            # Flight hours based on age and utilization
-            avg_annual_hours = random.uniform(2000, 4000)
-            total_flight_hours = int(age_years * avg_annual_hours)
-            
-            # Cycles (roughly 1 cycle per 1.5 flight hours for short-haul, 1 per 8 hours for long-haul)
-            if spec.category == AircraftCategory.REGIONAL:
-                cycles = int(total_flight_hours / 1.2)
-            elif spec.category == AircraftCategory.NARROW_BODY:
-                cycles = int(total_flight_hours / 2.0)
-            else:
-                cycles = int(total_flight_hours / 6.0)
-            
-            # Calculate depreciated value
-            asking_price = self._calculate_market_value(spec, age_years, condition, total_flight_hours)
-            
-            # Lease rate (typically 0.8-1.2% of aircraft value per month)
-            lease_rate_monthly = asking_price * random.uniform(0.008, 0.012)
-            
-            # Generate other attributes
-            seller_type = random.choice(["manufacturer", "airline", "leasing_company"])
-            location = random.choice(["JFK", "LAX", "LHR", "CDG", "FRA", "NRT", "SIN", "DXB"])
-            available_until = datetime.now() + timedelta(days=random.randint(7, 90))
-            
-            # Maintenance due
-            maintenance_due_hours = random.randint(100, 2000)
-            
-            # Available financing options
-            financing_available = [FinancingType.CASH]
-            if seller_type in ["manufacturer", "leasing_company"]:
-                financing_available.extend([FinancingType.LEASE, FinancingType.LOAN])
-            
-            aircraft_id = f"{model.replace(' ', '_')}_{random.randint(1000, 9999)}"
-            
-            market_aircraft.append(MarketAircraft(
-                id=aircraft_id,
-                spec=spec,
-                condition=condition,
-                age_years=age_years,
-                total_flight_hours=total_flight_hours,
-                cycles=cycles,
-                asking_price=asking_price,
-                lease_rate_monthly=lease_rate_monthly,
-                seller_type=seller_type,
-                location=location,
-                available_until=available_until,
-                maintenance_due_hours=maintenance_due_hours,
-                financing_available=financing_available
-            ))
-        
-        return market_aircraft
-    
-    def _determine_condition(self, age_years: float) -> AircraftCondition:
-        """Determine aircraft condition based on age and random factors"""
-        if age_years < 2:
-            return AircraftCondition.NEW
-        elif age_years < 5:
-            return random.choice([AircraftCondition.NEW, AircraftCondition.EXCELLENT])
-        elif age_years < 10:
-            return random.choice([AircraftCondition.EXCELLENT, AircraftCondition.GOOD])
-        elif age_years < 20:
-            return random.choice([AircraftCondition.GOOD, AircraftCondition.FAIR])
-        else:
-            return random.choice([AircraftCondition.FAIR, AircraftCondition.POOR])
-    
-    def _calculate_market_value(self, spec: AircraftSpec, age_years: float, 
-                               condition: AircraftCondition, flight_hours: int) -> float:
-        """Calculate realistic market value based on depreciation"""
-        base_value = spec.base_price
-        
-        # Age depreciation (aircraft typically depreciate 3-5% per year)
-        age_factor = (1 - 0.04) ** age_years
-        
-        # Condition factor
-        condition_factors = {
-            AircraftCondition.NEW: 1.0,
-            AircraftCondition.EXCELLENT: 0.95,
-            AircraftCondition.GOOD: 0.85,
-            AircraftCondition.FAIR: 0.70,
-            AircraftCondition.POOR: 0.50
-        }
-        
-        # High utilization penalty
-        expected_hours = age_years * 3000
-        if flight_hours > expected_hours * 1.3:
-            utilization_factor = 0.9
-        elif flight_hours < expected_hours * 0.7:
-            utilization_factor = 1.05  # Low utilization can be good
-        else:
-            utilization_factor = 1.0
+        return [
+            self._row_to_market_aircraft(row)
+            for batch in self.generate_listing_batches(count, seed)
+            for row in self.listing_rows(batch)
+        ]
+    
+    def generate_listing_batches(self, count: int, seed=None, batch_size: int = LISTING_BATCH_SIZE,
+                                 now: Optional[datetime] = None,
+                                 first_serial: Optional[int] = None) -> Iterator[Dict[str, np.ndarray]]:
+        """Market listings as NumPy columns, ``batch_size`` at a time, from a seedable RNG.
         
-        market_value = base_value * age_factor * condition_factors[condition] * utilization_factor
+        Each batch is drawn in one vectorized pass and memory is bounded by the
+        batch, however many listings are generated. ``seed`` may also be a
+        NumPy Generator to continue its stream. Listings are dated from
+        ``now`` (default: the current time). Id serial numbers run on from
+        ``first_serial`` (default: a random start), so ids are unique within a
+        run; any that match an owned aircraft are dropped. Pass the batches
+        through listing_rows to replace_market, or see generate_market_aircraft
+        for MarketAircraft.
+        """
+        rng = np.random.default_rng(seed)
+        specs = list(self.aircraft_db.aircraft_specs.values())
+        models = np.array([spec.model for spec in specs], dtype=object)
+        id_prefixes = [spec.model.replace(' ', '_') for spec in specs]
+        categories = np.array([spec.category.value for spec in specs], dtype=object)
+        base_price = np.array([spec.base_price for spec in specs])
+        cycle_hours = np.array([CYCLE_HOURS.get(spec.category, LONG_HAUL_CYCLE_HOURS) for spec in specs])
+        conditions = np.array([condition.value for condition in LISTING_CONDITIONS], dtype=object)
+        sellers = np.array(SELLER_TYPES, dtype=object)
+        locations = np.array(MARKET_LOCATIONS, dtype=object)
+        # Airlines only sell for cash; manufacturers and lessors also lease and lend
+        financing = np.array([
+            json.dumps([FinancingType.CASH.value] if seller == "airline" else [f.value for f in FinancingType])
+            for seller in SELLER_TYPES
+        ], dtype=object)
+        now = now or datetime.now()
+        until = np.array([(now + timedelta(days=days)).isoformat()
+                          for days in range(LISTING_DAYS[1] + 1)], dtype=object)
+        owned_ids = self._owned_aircraft_ids()
+        # Serial numbers continue across batches
+        serial = int(rng.integers(1000, 10_000_000)) if first_serial is None else first_serial
         
-        # Add some market randomness
-        market_value *= random.uniform(0.9, 1.1)
+        for start in range(0, count, batch_size):
+            n = min(batch_size, count - start)
+            spec = rng.integers(0, len(specs), n)
+            age_years = rng.uniform(0, 25, n)
+            condition = listing_conditions(age_years, rng)
+            total_flight_hours = (age_years * rng.uniform(2000, 4000, n)).astype(np.int64)
+            asking_price = market_values(base_price[spec], age_years, condition, total_flight_hours, rng)
+            seller = rng.integers(0, len(SELLER_TYPES), n)
+            batch = {
+                'id': [f"{id_prefixes[s]}_{serial + i}" for i, s in enumerate(spec.tolist())],
+                'model': models[spec],
+                'category': categories[spec],
+                'condition': conditions[condition],
+                'age_years': age_years,
+                'total_flight_hours': total_flight_hours,
+                'cycles': (total_flight_hours / cycle_hours[spec]).astype(np.int64),
+                'asking_price': asking_price,
+                # Lease rate: typically 0.8-1.2% of aircraft value per month
+                'lease_rate_monthly': asking_price * rng.uniform(0.008, 0.012, n),
+                'seller_type': sellers[seller],
+                'location': locations[rng.integers(0, len(MARKET_LOCATIONS), n)],
+                'available_until': until[rng.integers(LISTING_DAYS[0], LISTING_DAYS[1] + 1, n)],
+                'maintenance_due_hours': rng.integers(100, 2001, n),
+                'financing_available': financing[seller]
+            }
+            serial += n
+            if owned_ids:
+                keep = np.array([aircraft_id not in owned_ids for aircraft_id in batch['id']])
+                if not keep.all():
+                    batch = {column: np.asarray(values, dtype=object if column == 'id' else None)[keep]
+                             for column, values in batch.items()}
+            yield batch
+    
+    @staticmethod
+    def listing_rows(batch: Dict[str, np.ndarray]) -> Iterator[tuple]:
+        """Rows of a listing batch in MARKET_AIRCRAFT_COLUMNS order (SQLite does not bind NumPy scalars)"""
+        return zip(*(
+            batch[column] if isinstance(batch[column], list) else batch[column].tolist()
+            for column in MARKET_AIRCRAFT_COLUMNS
+        ))
+    
+    def _owned_aircraft_ids(self) -> set:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return {row[0] for row in conn.execute("SELECT id FROM owned_aircraft")}
+        finally:
+            conn.close()
+    
+    def regenerate_market(self, count: int, seed: Optional[int] = None,
+                          batch_size: int = LISTING_BATCH_SIZE) -> int:
+        """Replace the market with ``count`` freshly generated listings; returns the number written"""
+        return self.replace_market(
+            self.listing_rows(batch) for batch in self.generate_listing_batches(count, seed, batch_size)
+        )
+    
+    def replace_market(self, row_batches: Iterable[Iterable[tuple]]) -> int:
+        """Swap in a new market from batches of MARKET_AIRCRAFT_COLUMNS rows; returns the number of listings.
         
-        return round(market_value, 2)
+        Batches are written to a shadow table, one transaction each, and it is
+        indexed one index per transaction, so no write holds the database for
+        long. The shadow then replaces market_aircraft with a drop and rename.
+        Readers see the old market until that commit - never an empty or
+        partial one - and a failed run leaves it untouched.
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.cursor()
+            live_suffix = market_index_set(cursor, 'market_aircraft')
+            shadow_suffix = next(suffix for suffix in MARKET_INDEX_SETS if suffix != live_suffix)
+            # A shadow table left by an interrupted run is discarded
+            conn.execute(f"DROP TABLE IF EXISTS {MARKET_SHADOW_TABLE}")
+            conn.execute(MARKET_AIRCRAFT_TABLE.format(table=MARKET_SHADOW_TABLE))
+            insert = (f"INSERT INTO {MARKET_SHADOW_TABLE} ({', '.join(MARKET_AIRCRAFT_COLUMNS)}) "
+                      f"VALUES ({', '.join('?' * len(MARKET_AIRCRAFT_COLUMNS))})")
+            written = 0
+            for rows in row_batches:
+                with conn:
+                    written += conn.executemany(insert, rows).rowcount
+            create_market_indexes(cursor, MARKET_SHADOW_TABLE, shadow_suffix)
+            
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("DROP TABLE IF EXISTS market_aircraft")
+            cursor.execute(f"ALTER TABLE {MARKET_SHADOW_TABLE} RENAME TO market_aircraft")
+            conn.commit()
+        finally:
+            conn.close()
+        return written
     
     def save_market_aircraft(self, aircraft_list: List[MarketAircraft]):
-        """Save market aircraft to database"""
+        """Replace the market with these aircraft"""
         conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Clear existing market
-        cursor.execute("DELETE FROM market_aircraft")
+        try:
+            with conn:
+                # Listings reference their spec by model
+                specs = {aircraft.spec.model: aircraft.spec for aircraft in aircraft_list}
+                conn.executemany(
+                    f"INSERT OR IGNORE INTO aircraft_specs VALUES ({', '.join('?' * len(AIRCRAFT_SPEC_COLUMNS))})",
+                    [tuple(self._spec_to_dict(spec).values()) for spec in specs.values()]
+                )
+        finally:
+            conn.close()
         
-        for aircraft in aircraft_list:
-            cursor.execute('''
-                INSERT INTO market_aircraft VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+        self.replace_market([[
+            (
                 aircraft.id,
                 aircraft.spec.model,
+                aircraft.spec.category.value,
                 aircraft.condition.value,
                 aircraft.age_years,
                 aircraft.total_flight_hours,
@@ -308,12 +597,11 @@ class AircraftMarketplace:
                 aircraft.location,
                 aircraft.available_until.isoformat(),
                 aircraft.maintenance_due_hours,
-                json.dumps([f.value for f in aircraft.financing_available]),
-                json.dumps(self._spec_to_dict(aircraft.spec))
-            ))
-        
-        conn.commit()
-        conn.close()
+                json.dumps([f.value for f in aircraft.financing_available])
+            )
+            for aircraft in aircraft_list
+        ]])
+        self.specs.reload()
     
     def _spec_to_dict(self, spec: AircraftSpec) -> Dict:
         """Convert AircraftSpec to dictionary with enum values"""
@@ -323,66 +611,105 @@ class AircraftMarketplace:
         return spec_dict
     
     def _dict_to_spec(self, spec_dict: Dict) -> AircraftSpec:
-        """Convert dictionary back to AircraftSpec with proper enum"""
-        # Convert string back to enum
-        spec_dict['category'] = AircraftCategory(spec_dict['category'])
-        return AircraftSpec(**spec_dict)
+        """Convert dictionary back to the shared AircraftSpec"""
+        return self.specs.intern(spec_from_dict(spec_dict))
     
-    def get_market_aircraft(self, filters: Dict = None) -> List[MarketAircraft]:
-        """Retrieve market aircraft with optional filters"""
+    def _financing(self, financing_available: str) -> List[FinancingType]:
+        """Financing options from their JSON column, parsed once per distinct value"""
+        options = self._financing_options.get(financing_available)
+        if options is None:
+            options = tuple(FinancingType(f) for f in json.loads(financing_available))
+            self._financing_options[financing_available] = options
+        return list(options)
+    
+    def _row_to_market_aircraft(self, row) -> Optional[MarketAircraft]:
+        """MarketAircraft from a MARKET_AIRCRAFT_QUERY row, None if its model has no spec"""
+        (aircraft_id, model, _category, condition, age_years, total_flight_hours, cycles, asking_price,
+         lease_rate_monthly, seller_type, location, available_until, maintenance_due_hours,
+         financing_available) = row
+        spec = self.specs.get(model)
+        if spec is None:
+            return None
+        
+        return MarketAircraft(
+            aircraft_id, spec, AircraftCondition(condition), age_years, total_flight_hours, cycles,
+            asking_price, lease_rate_monthly, seller_type, location, datetime.fromisoformat(available_until),
+            maintenance_due_hours, self._financing(financing_available)
+        )
+    
+    def get_market_aircraft(self, filters: Dict = None, limit: Optional[int] = None, sort: str = 'price',
+                            descending: bool = False, after: Optional[Tuple[float, str]] = None,
+                            now: Optional[datetime] = None) -> List[MarketAircraft]:
+        """Retrieve market aircraft with optional filters, ordered by ``sort`` then id.
+        
+        ``sort`` is a MARKET_SORT_COLUMNS key (cheapest / newest first unless
+        ``descending``). ``after`` is the (sort value, id) of the last listing
+        of the previous page: the next page starts right after it, so paging
+        is an index seek rather than an OFFSET scan and stays stable while
+        listings come and go. Category, location, price and age filters use
+        the listing indexes, so with a ``limit`` a page reads only about
+        ``limit`` index entries however large the market is. Listings still
+        available at ``now`` (default: the wall clock) are returned; pass the
+        simulation time so pages agree with MarketMaker's expiries.
+        """
+        column = MARKET_SORT_COLUMNS[sort]
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
-        query = "SELECT * FROM market_aircraft WHERE available_until > ?"
-        params = [datetime.now().isoformat()]
+        query = MARKET_AIRCRAFT_QUERY + " WHERE m.available_until > ?"
+        params = [(now or datetime.now()).isoformat()]
         
         if filters:
             if 'category' in filters:
-                query += " AND spec_data LIKE ?"
-                params.append(f'%"category": "{filters["category"].value}"%')
+                query += " AND m.category = ?"
+                params.append(filters['category'].value)
             
             if 'max_price' in filters:
-                query += " AND asking_price <= ?"
+                query += " AND m.asking_price <= ?"
                 params.append(filters['max_price'])
             
             if 'min_price' in filters:
-                query += " AND asking_price >= ?"
+                query += " AND m.asking_price >= ?"
                 params.append(filters['min_price'])
             
             if 'max_age' in filters:
-                query += " AND age_years <= ?"
+                query += " AND m.age_years <= ?"
                 params.append(filters['max_age'])
             
+            if 'min_age' in filters:
+                query += " AND m.age_years >= ?"
+                params.append(filters['min_age'])
+            
             if 'location' in filters:
-                query += " AND location = ?"
+                query += " AND m.location = ?"
                 params.append(filters['location'])
+            
+            if 'condition' in filters:
+                query += " AND m.condition = ?"
+                params.append(filters['condition'].value)
+            
+            if 'financing' in filters:
+                # financing_available is a short JSON list of enum values
+                query += " AND instr(m.financing_available, ?) > 0"
+                params.append(json.dumps(filters['financing'].value))
+        
+        direction = "DESC" if descending else "ASC"
+        if after is not None:
+            query += f" AND (m.{column}, m.id) {'<' if descending else '>'} (?, ?)"
+            params.extend(after)
+        query += f" ORDER BY m.{column} {direction}, m.id {direction}"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
         
         cursor.execute(query, params)
         rows = cursor.fetchall()
         conn.close()
         
-        aircraft_list = []
-        for row in rows:
-            spec_data = json.loads(row[13])
-            spec = self._dict_to_spec(spec_data)
-            
-            aircraft = MarketAircraft(
-                id=row[0],
-                spec=spec,
-                condition=AircraftCondition(row[2]),
-                age_years=row[3],
-                total_flight_hours=row[4],
-                cycles=row[5],
-                asking_price=row[6],
-                lease_rate_monthly=row[7],
-                seller_type=row[8],
-                location=row[9],
-                available_until=datetime.fromisoformat(row[10]),
-                maintenance_due_hours=row[11],
-                financing_available=[FinancingType(f) for f in json.loads(row[12])]
-            )
-            aircraft_list.append(aircraft)
-        
+        aircraft_list = [self._row_to_market_aircraft(row) for row in rows]
+        if None in aircraft_list:
+            print(f"⚠️  Skipped {aircraft_list.count(None)} market listings with unknown aircraft models")
+            aircraft_list = [aircraft for aircraft in aircraft_list if aircraft is not None]
         return aircraft_list
     
     def purchase_aircraft(self, aircraft_id: str, financing_type: FinancingType, 
@@ -392,7 +719,7 @@ class AircraftMarketplace:
         cursor = conn.cursor()
         
         # Get aircraft from market
-        cursor.execute("SELECT * FROM market_aircraft WHERE id = ?", (aircraft_id,))
+        cursor.execute(MARKET_AIRCRAFT_QUERY + " WHERE m.id = ?", (aircraft_id,))
         row = cursor.fetchone()
         
         if not row:
@@ -404,16 +731,10 @@ class AircraftMarketplace:
         current_cash = balance_row[0] if balance_row else 0
         
         # Create MarketAircraft object
-        spec_data = json.loads(row[13])
-        spec = self._dict_to_spec(spec_data)
-        market_aircraft = MarketAircraft(
-            id=row[0], spec=spec, condition=AircraftCondition(row[2]),
-            age_years=row[3], total_flight_hours=row[4], cycles=row[5],
-            asking_price=row[6], lease_rate_monthly=row[7], seller_type=row[8],
-            location=row[9], available_until=datetime.fromisoformat(row[10]),
-            maintenance_due_hours=row[11],
-            financing_available=[FinancingType(f) for f in json.loads(row[12])]
-        )
+        market_aircraft = self._row_to_market_aircraft(row)
+        if market_aircraft is None:
+            return False, "Aircraft specification not found", None
+        spec = market_aircraft.spec
         
         # Check if financing type is available
         if financing_type not in market_aircraft.financing_available:
@@ -537,12 +858,9 @@ class AircraftMarketplace:
         
         aircraft_list = []
         for row in rows:
-            spec_data = json.loads(row[16])
-            spec = self._dict_to_spec(spec_data)
-            
             aircraft = OwnedAircraft(
                 id=row[0],
-                spec=spec,
+                spec=self.specs.from_json(row[16]),
                 condition=AircraftCondition(row[2]),
                 age_years=row[3],
                 total_flight_hours=row[4],
@@ -621,9 +939,7 @@ class AircraftMarketplace:
                 return False, "Cannot sell aircraft - it has active flights. Wait for flights to complete.", 0.0
             
             # Parse aircraft data
-            spec_data = json.loads(aircraft_row[16])
-            spec = self._dict_to_spec(spec_data)
-            
+            spec = self.specs.from_json(aircraft_row[16])
             current_value = aircraft_row[7]  # current_value column
             financing_type = FinancingType(aircraft_row[8])
             remaining_payments = aircraft_row[10]
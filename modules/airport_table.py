@@ -0,0 +1,103 @@
+# modules/airport_table.py
+
+import math
+import sqlite3
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Optional, Tuple
+
+import numpy as np
+
+from modules.distance_matrix import haversine_nm
+
+@dataclass(frozen=True)
+class AirportRecord:
+    """One airport's reference data, with its position pre-converted for distance maths"""
+    index: int
+    icao: str
+    iata: str
+    name: str
+    city: str
+    country: str
+    latitude: float
+    longitude: float
+    elevation: int
+    runway_length: int
+    hub_size: str
+    landing_fee_base: float
+    gate_cost_per_hour: float
+    lat_rad: float
+    lon_rad: float
+    cos_lat: float
+
+
+class AirportTable:
+    """Immutable snapshot of the airports table with O(1) lookups by ICAO code.
+
+    Records are addressed by code or by row index; the column arrays (read
+    only) follow the same index order, for vectorized distance maths. Build
+    a new table to pick up database changes - RouteEconomics does that on
+    reload or when the database's data_version moves.
+    """
+
+    def __init__(self, records: Tuple[AirportRecord, ...]):
+        self.records = records
+        self.codes = tuple(r.icao for r in records)
+        self._by_code = MappingProxyType({r.icao: r for r in records})
+
+        def column(field, dtype=np.float64):
+            values = np.array([getattr(r, field) for r in records], dtype=dtype)
+            values.flags.writeable = False
+            return values
+
+        self.latitude = column('latitude')
+        self.longitude = column('longitude')
+        self.lat_rad = column('lat_rad')
+        self.lon_rad = column('lon_rad')
+        self.cos_lat = column('cos_lat')
+        self.sin_lat = np.sin(self.lat_rad)
+        self.sin_lat.flags.writeable = False
+        self.landing_fee_base = column('landing_fee_base')
+        self.gate_cost_per_hour = column('gate_cost_per_hour')
+        self.runway_length = column('runway_length')
+
+    @classmethod
+    def load(cls, db_path: str) -> 'AirportTable':
+        """Read every airport in one query"""
+        conn = sqlite3.connect(db_path)
+        try:
+            rows = conn.execute('''
+                SELECT icao, iata, name, city, country, latitude, longitude, elevation,
+                       runway_length, hub_size, landing_fee_base, gate_cost_per_hour
+                FROM airports
+            ''').fetchall()
+        finally:
+            conn.close()
+
+        records = []
+        for index, row in enumerate(rows):
+            lat_rad, lon_rad = math.radians(row[5]), math.radians(row[6])
+            records.append(AirportRecord(index, *row, lat_rad=lat_rad, lon_rad=lon_rad,
+                                         cos_lat=math.cos(lat_rad)))
+        return cls(tuple(records))
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, icao: str):
+        return icao in self._by_code
+
+    def get(self, icao: str) -> Optional[AirportRecord]:
+        return self._by_code.get(icao)
+
+    def index_of(self, icao: str) -> int:
+        """Row index of an airport (KeyError if unknown)"""
+        return self._by_code[icao].index
+
+    def distance_nm(self, origin_icao: str, dest_icao: str) -> float:
+        """Great circle distance in nautical miles in float64, 0 if an airport is unknown"""
+        origin, dest = self._by_code.get(origin_icao), self._by_code.get(dest_icao)
+        if origin is None or dest is None:
+            return 0.0
+        return float(haversine_nm(origin.lat_rad, origin.lon_rad, origin.cos_lat,
+                                  dest.lat_rad, dest.lon_rad, dest.cos_lat))
@@ -0,0 +1,102 @@
+# modules/assignment_registry.py
+
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+ASSIGNMENT_QUERY = """
+    SELECT ra.id AS assignment_id, ra.aircraft_id, ra.route_id, ra.frequency_weekly,
+           ra.fare_economy, ra.fare_business, ra.active,
+           r.departure_airport, r.arrival_airport, r.distance_nm
+    FROM route_assignments ra
+    JOIN routes r ON ra.route_id = r.id
+    WHERE ra.active = 1
+"""
+
+
+class AssignmentRegistry:
+    """In-memory cache of active route assignments for the simulation loop.
+
+    Assignments are loaded once and then kept current in two ways: the write
+    endpoints patch or invalidate the cache directly, and every read runs a
+    ``PRAGMA data_version`` check on a long-lived connection, which changes
+    whenever another connection (or another process) commits to the database.
+    ``version`` increases each time the cached assignment list actually changes.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.version = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._data_version = None
+        self._stale = True
+        self._assignments: List[Dict] = []
+
+    def get_assignments(self) -> List[Dict]:
+        """Active assignments - treat the returned list as read-only"""
+        return self.snapshot()[1]
+
+    def snapshot(self) -> Tuple[int, List[Dict]]:
+        """(version, assignments) read atomically, for compiling into the flight engine"""
+        with self._lock:
+            data_version = self._read_data_version()
+            if self._stale or data_version != self._data_version:
+                self._reload()
+                self._data_version = data_version
+            return self.version, self._assignments
+
+    def invalidate(self):
+        """Force a full reload on the next read"""
+        with self._lock:
+            self._stale = True
+
+    def refresh_aircraft(self, aircraft_id: str):
+        """Re-read the active assignments of a single aircraft"""
+        with self._lock:
+            try:
+                with sqlite3.connect(self.db_path) as conn:
+                    conn.row_factory = sqlite3.Row
+                    rows = conn.execute(ASSIGNMENT_QUERY + " AND ra.aircraft_id = ?",
+                                        (str(aircraft_id),)).fetchall()
+            except Exception as e:
+                print(f"Error refreshing assignments for aircraft {aircraft_id}: {e}")
+                self._stale = True
+                return
+            kept = [a for a in self._assignments if str(a['aircraft_id']) != str(aircraft_id)]
+            self._replace(kept + [dict(row) for row in rows])
+
+    def remove(self, aircraft_id: str, route_id: str = None):
+        """Drop an aircraft's assignments (optionally only one route) from the cache"""
+        with self._lock:
+            self._replace([
+                a for a in self._assignments
+                if not (str(a['aircraft_id']) == str(aircraft_id)
+                        and (route_id is None or a['route_id'] == route_id))
+            ])
+
+    def _replace(self, assignments: List[Dict]):
+        if assignments != self._assignments:
+            self._assignments = assignments
+            self.version += 1
+
+    def _reload(self):
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.row_factory = sqlite3.Row
+                rows = conn.execute(ASSIGNMENT_QUERY).fetchall()
+        except Exception as e:
+            print(f"Error loading assignments: {e}")
+            return
+        self._stale = False
+        self._replace([dict(row) for row in rows])
+
+    def _read_data_version(self):
+        try:
+            if self._conn is None:
+                self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"Error checking assignment data version: {e}")
+            self._conn = None
+            return None
@@ -0,0 +1,204 @@
+# modules/broadcast_scheduler.py
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set
+
+from modules.flight_stream import DeltaEncoder
+
+SIM_TICK_HZ = 5.0  # Internal tick rate - also the fastest rate a client can negotiate
+MIN_CLIENT_HZ = 0.2  # Slowest negotiable client rate
+ACK_TIMEOUT = 10.0  # Seconds before an unacknowledged frame is written off
+
+
+@dataclass
+class ClientStream:
+    """Per-client stream state: protocol, negotiated rate and flow-control counters"""
+    sid: str
+    mode: str = 'full'
+    interval: Optional[float] = None  # Seconds between frames, None = server default
+    ack: bool = False  # Client acknowledges frames, so slow consumers get frames skipped
+    next_send: float = 0.0
+    frame_number: int = 0
+    awaiting_frame: Optional[int] = None
+    awaiting_since: Optional[float] = None
+    frames_sent: int = 0
+    frames_dropped: int = 0
+    ack_rtt: Optional[float] = None  # Smoothed send -> ack time in seconds
+
+    # Mode-specific state
+    encoder: Optional[DeltaEncoder] = None  # delta: own sequence, since frames can be skipped
+    tile_level: int = 0  # viewport: grid level of the subscribed tiles
+    tiles: Set[str] = field(default_factory=set)  # viewport: subscribed tile keys
+    sent_version: Optional[int] = None  # plans/binary: assignment version last sent
+
+
+class BroadcastScheduler:
+    """Fixed-rate tick loop that serves each client at its own rate.
+
+    Every tick the scheduler hands the step function the clients that are due
+    a frame. Clients that negotiated acknowledgements are never sent a new
+    frame while the previous one is unacknowledged - the frame is skipped and
+    counted as dropped instead of piling up in the socket buffer, so a slow
+    consumer only slows itself down.
+    """
+
+    def __init__(self, socketio, tick_hz: float = SIM_TICK_HZ,
+                 default_interval: Callable[[], float] = None):
+        self.socketio = socketio
+        self.tick_hz = tick_hz
+        self.tick_interval = 1.0 / tick_hz
+        self.default_interval = default_interval or (lambda: 1.0)
+        self._clients: Dict[str, ClientStream] = {}
+        self._lock = threading.Lock()
+
+        self.ticks = 0
+        self.late_ticks = 0
+        self.errors = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.last_tick_duration = 0.0
+        self.avg_tick_duration = 0.0
+        self.max_tick_duration = 0.0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    def add_client(self, sid: str, mode: str = 'full') -> ClientStream:
+        return self.configure(sid, mode)
+
+    def remove_client(self, sid: str):
+        with self._lock:
+            self._clients.pop(sid, None)
+
+    def client(self, sid: str) -> Optional[ClientStream]:
+        return self._clients.get(sid)
+
+    def configure(self, sid: str, mode: str, rate: float = None, ack: bool = None) -> ClientStream:
+        """Switch a client's protocol (resetting its mode state) and negotiate its rate"""
+        with self._lock:
+            client = self._clients.get(sid)
+            if client is None:
+                client = self._clients[sid] = ClientStream(sid=sid)
+            if rate is not None:
+                rate = min(max(float(rate), MIN_CLIENT_HZ), self.tick_hz)
+                client.interval = 1.0 / rate
+            if ack is not None:
+                client.ack = bool(ack)
+            client.mode = mode
+            client.encoder = DeltaEncoder() if mode == 'delta' else None
+            client.tiles = set()
+            client.sent_version = None
+            client.next_send = 0.0
+            client.awaiting_frame = client.awaiting_since = None
+            return client
+
+    def clients(self) -> List[ClientStream]:
+        with self._lock:
+            return list(self._clients.values())
+
+    def due_clients(self, now: float) -> List[ClientStream]:
+        """Clients whose next frame is due; slow acknowledging clients have it skipped"""
+        due = []
+        with self._lock:
+            for client in self._clients.values():
+                if now < client.next_send:
+                    continue
+                client.next_send = now + (client.interval or self.default_interval())
+                if client.awaiting_since is not None:
+                    if now - client.awaiting_since < ACK_TIMEOUT:
+                        client.frames_dropped += 1
+                        self.frames_dropped += 1
+                        continue
+                    # Acknowledgement lost - write the frame off and carry on
+                    client.awaiting_frame = client.awaiting_since = None
+                due.append(client)
+        return due
+
+    def emit(self, client: ClientStream, event: str, payload):
+        """Send a non-frame event (plans, index tables) to one client"""
+        self.socketio.emit(event, payload, to=client.sid)
+
+    def send_frame(self, client: ClientStream, event: str, payload: Dict):
+        """Send one frame event; acknowledging clients are asked to ack it"""
+        client.frame_number += 1
+        callback = None
+        if client.ack:
+            client.awaiting_frame = client.frame_number
+            client.awaiting_since = time.monotonic()
+            callback = self._ack_callback(client, client.frame_number)
+        self.socketio.emit(event, payload, to=client.sid, callback=callback)
+        client.frames_sent += 1
+        self.frames_sent += 1
+
+    def _ack_callback(self, client: ClientStream, frame_number: int) -> Callable:
+        def acknowledged(*args):
+            if client.awaiting_frame != frame_number:
+                return  # Ack for a frame that was already written off
+            rtt = time.monotonic() - client.awaiting_since
+            client.ack_rtt = rtt if client.ack_rtt is None else client.ack_rtt * 0.8 + rtt * 0.2
+            client.awaiting_frame = client.awaiting_since = None
+        return acknowledged
+
+    def run(self, step: Callable[[float], None]):
+        """Call ``step(now)`` every tick forever; overruns skip ticks rather than burst"""
+        next_tick = time.monotonic()
+        while True:
+            started = time.monotonic()
+            lag = max(0.0, started - next_tick)
+            try:
+                step(started)
+            except Exception as e:
+                self.errors += 1
+                print(f"Error in broadcast tick: {e}")
+            self._record_tick(time.monotonic() - started, lag)
+
+            next_tick += self.tick_interval
+            now = time.monotonic()
+            if now > next_tick:
+                self.late_ticks += 1
+                missed = int((now - next_tick) / self.tick_interval) + 1
+                next_tick += missed * self.tick_interval
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+
+    def _record_tick(self, duration: float, lag: float):
+        self.ticks += 1
+        self.last_tick_duration = duration
+        self.avg_tick_duration = (duration if self.ticks == 1
+                                  else self.avg_tick_duration * 0.95 + duration * 0.05)
+        self.max_tick_duration = max(self.max_tick_duration, duration)
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+
+    def stats(self) -> Dict:
+        """Tick timing, lag and per-client frame counters"""
+        return {
+            'tick_hz': self.tick_hz,
+            'ticks': self.ticks,
+            'late_ticks': self.late_ticks,
+            'errors': self.errors,
+            'tick_ms': {
+                'last': self.last_tick_duration * 1000,
+                'avg': self.avg_tick_duration * 1000,
+                'max': self.max_tick_duration * 1000
+            },
+            'lag_ms': {
+                'last': self.last_lag * 1000,
+                'max': self.max_lag * 1000
+            },
+            'frames_sent': self.frames_sent,
+            'frames_dropped': self.frames_dropped,
+            'clients': [
+                {
+                    'sid': client.sid,
+                    'mode': client.mode,
+                    'rate_hz': 1.0 / (client.interval or self.default_interval()),
+                    'ack': client.ack,
+                    'awaiting_ack': client.awaiting_since is not None,
+                    'ack_rtt_ms': client.ack_rtt * 1000 if client.ack_rtt is not None else None,
+                    'frames_sent': client.frames_sent,
+                    'frames_dropped': client.frames_dropped
+                }
+                for client in self.clients()
+            ]
+        }
@@ -0,0 +1,191 @@
+# modules/demand_model.py
+
+import sqlite3
+import threading
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+BASE_LOAD_FACTOR = 0.75
+LOAD_FACTOR_BOUNDS = (0.30, 0.95)
+PRICE_IMPACT_BOUNDS = (0.6, 1.2)  # Load factor scales with market fare / fare, within these bounds
+COMPETITION_PENALTY = 0.08  # Load factor lost per competition level
+MIN_COMPETITION_IMPACT = 0.4
+
+# Share of the base load factor each demand level fills
+DEMAND_LEVEL_MULTIPLIERS = {
+    'very_low': 0.3,
+    'low': 0.5,
+    'medium': 0.7,
+    'high': 0.85,
+    'very_high': 1.0
+}
+
+# Monthly demand relative to the annual average, January first
+SEASONALITY = (0.85, 0.80, 0.90, 0.95, 1.05, 1.15, 1.20, 1.15, 1.05, 1.00, 0.90, 0.95)
+
+# Weekly passenger volume on a route: base x distance band x demand level
+WEEKLY_DEMAND_BASE = 2000
+WEEKLY_DEMAND_DISTANCE_BANDS = (500, 1500, 3000)  # nm
+WEEKLY_DEMAND_DISTANCE_MODIFIERS = (1.5, 1.2, 1.0, 0.8)  # Short routes draw more demand
+WEEKLY_DEMAND_LEVEL_MODIFIERS = {
+    'very_low': 0.3,
+    'low': 0.5,
+    'medium': 0.7,
+    'high': 1.0,
+    'very_high': 1.4
+}
+
+ROUTE_DEMAND_QUERY = """
+    SELECT r.id, r.distance_nm, r.competition_level, r.base_ticket_price,
+           e.base_demand, e.seasonal_factor
+    FROM routes r
+    LEFT JOIN route_extended_data e ON r.id = e.route_id
+"""
+
+
+def competition_impact(competition):
+    """Load factor multiplier for a route's competition level (scalar or array)"""
+    return np.maximum(MIN_COMPETITION_IMPACT, 1.0 - (competition * COMPETITION_PENALTY))
+
+
+def demand_factor(demand_multiplier, competition):
+    """Load factor at market fare before seasonality: base x demand level x competition"""
+    return BASE_LOAD_FACTOR * demand_multiplier * competition_impact(competition)
+
+
+def price_impact(market_fare, fare):
+    """Price elasticity multiplier - cheaper than market fills more seats"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sensitivity = np.where(np.greater(fare, 0), np.divide(market_fare, fare), 1.0)
+    return np.minimum(PRICE_IMPACT_BOUNDS[1], np.maximum(PRICE_IMPACT_BOUNDS[0], sensitivity))
+
+
+def expected_load_factor(route_demand_factor, route_price_impact, season=1.0):
+    return np.minimum(LOAD_FACTOR_BOUNDS[1], np.maximum(
+        LOAD_FACTOR_BOUNDS[0], route_demand_factor * route_price_impact * season))
+
+
+def estimate_weekly_demand(distance_nm: float, demand_level: str) -> int:
+    """Weekly passengers a route can draw across all carriers"""
+    band = int(np.searchsorted(WEEKLY_DEMAND_DISTANCE_BANDS, distance_nm, side='right'))
+    level_modifier = WEEKLY_DEMAND_LEVEL_MODIFIERS.get(demand_level, 0.7)
+    return int(WEEKLY_DEMAND_BASE * WEEKLY_DEMAND_DISTANCE_MODIFIERS[band] * level_modifier)
+
+
+class RouteDemandCurves:
+    """Per-route demand arrays for one snapshot of the routes table"""
+
+    def __init__(self, rows):
+        self.route_ids = tuple(row[0] for row in rows)
+        self.index = {route_id: i for i, route_id in enumerate(self.route_ids)}
+        levels = [row[4] if row[4] in DEMAND_LEVEL_MULTIPLIERS else 'medium' for row in rows]
+
+        distance = np.array([row[1] or 0 for row in rows], dtype=np.float64)
+        competition = np.array([row[2] or 0 for row in rows], dtype=np.float64)
+        self.market_fare = np.array([row[3] or 0 for row in rows], dtype=np.float64)
+        self.competition_impact = competition_impact(competition)
+        self.demand_factor = demand_factor(
+            np.array([DEMAND_LEVEL_MULTIPLIERS[level] for level in levels], dtype=np.float64), competition)
+
+        # Month curve: network seasonality scaled by the route's own seasonal factor
+        seasonal_factor = np.array([row[5] if row[5] else 1.0 for row in rows], dtype=np.float64)
+        self.season = seasonal_factor[:, None] * np.array(SEASONALITY)[None, :]
+
+        distance_modifier = np.array(WEEKLY_DEMAND_DISTANCE_MODIFIERS)[
+            np.searchsorted(WEEKLY_DEMAND_DISTANCE_BANDS, distance, side='right')]
+        level_modifier = np.array([WEEKLY_DEMAND_LEVEL_MODIFIERS[level] for level in levels], dtype=np.float64)
+        self.weekly_demand = (WEEKLY_DEMAND_BASE * distance_modifier * level_modifier).astype(np.int64)
+
+    def __len__(self):
+        return len(self.route_ids)
+
+    def rows(self, route_ids: Sequence[str]) -> np.ndarray:
+        """Row index per route id, -1 for unknown routes"""
+        return np.array([self.index.get(route_id, -1) for route_id in route_ids], dtype=np.int64)
+
+
+class DemandModel:
+    """Route demand curves: base demand x season x competition x price elasticity.
+
+    The per-route factors are computed once into arrays, so a load factor
+    at any fare and month is a vectorized lookup - a fare sweep over
+    thousands of price points costs one NumPy expression. Curves are
+    rebuilt when another connection commits to the database (``PRAGMA
+    data_version``) or after ``invalidate()``.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._data_version = None
+        self._curves: Optional[RouteDemandCurves] = None
+
+    def invalidate(self):
+        """Rebuild the curves on the next lookup"""
+        with self._lock:
+            self._curves = None
+
+    @property
+    def curves(self) -> RouteDemandCurves:
+        """Current curves - hold on to the returned object for a consistent snapshot"""
+        with self._lock:
+            data_version = self._read_data_version()
+            if self._curves is None or data_version is None or data_version != self._data_version:
+                self._curves = self._load()
+                self._data_version = data_version
+            return self._curves
+
+    def _read_data_version(self):
+        try:
+            if self._conn is None:
+                self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"Error checking demand data version: {e}")
+            self._conn = None
+            return None
+
+    def _load(self) -> RouteDemandCurves:
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                rows = conn.execute(ROUTE_DEMAND_QUERY).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error loading route demand: {e}")
+            rows = []
+        return RouteDemandCurves(rows)
+
+    def load_factor(self, route_ids: Union[str, Sequence[str]], fares, month=None) -> np.ndarray:
+        """Expected load factor for routes at economy fares, optionally in a month (1-12).
+
+        ``route_ids``, ``fares`` and ``month`` broadcast against each other,
+        e.g. one route id with an array of fares is a fare sweep. Unknown
+        routes give NaN.
+        """
+        curves = self.curves
+        single = isinstance(route_ids, str)
+        rows = curves.rows([route_ids] if single else route_ids)
+        if single:
+            rows = rows[0]
+        known = rows >= 0
+        if not len(curves):
+            return np.full(np.broadcast(rows, np.asarray(fares)).shape, np.nan)
+        rows = np.where(known, rows, 0)
+
+        season = 1.0 if month is None else curves.season[rows, np.asarray(month) - 1]
+        load_factor = expected_load_factor(
+            curves.demand_factor[rows], price_impact(curves.market_fare[rows], fares), season)
+        return np.where(known, load_factor, np.nan)
+
+    def seasonality(self, route_id: str) -> Optional[np.ndarray]:
+        """The route's 12 monthly demand multipliers, None if unknown"""
+        curves = self.curves
+        row = curves.index.get(route_id)
+        return None if row is None else curves.season[row]
+
+    def weekly_demand(self, route_id: str) -> Optional[int]:
+        """Weekly passengers across all carriers, None if unknown"""
+        curves = self.curves
+        row = curves.index.get(route_id)
+        return None if row is None else int(curves.weekly_demand[row])
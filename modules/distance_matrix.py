@@ -0,0 +1,120 @@
+# modules/distance_matrix.py
+
+import json
+import os
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+EARTH_RADIUS_NM = 3440.065
+BLOCK_ELEMENTS = 4_000_000  # Pairs per vectorized block (~100MB of float64 temporaries)
+
+
+def haversine_nm(lat1, lon1, cos_lat1, lat2, lon2, cos_lat2):
+    """Great circle distance in nautical miles (float64) from radians and latitude cosines; broadcasts"""
+    a = np.sin((lat2 - lat1) / 2)**2 + cos_lat1 * cos_lat2 * np.sin((lon2 - lon1) / 2)**2
+    return EARTH_RADIUS_NM * 2 * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class DistanceMatrix:
+    """All-pairs great-circle distances (nm) and initial bearings (degrees) between airports.
+
+    Both matrices are float32 (unless built with another ``dtype``) and
+    indexed by airport row: ``distance[i, j]`` is the haversine distance
+    from ``codes[i]`` to ``codes[j]`` and ``bearing[i, j]`` the initial
+    course at ``codes[i]``. They are built in row blocks, so large networks
+    can be written straight to a memory-mapped file (see
+    ``build(..., path=...)`` and ``load``) instead of held in RAM.
+
+    float32 distances are within ~0.001 nm, which can still land on the
+    other side of a whole mile: stored whole-mile distances are truncated
+    from haversine_nm in float64 instead.
+    """
+
+    def __init__(self, codes: Sequence[str], distance: np.ndarray, bearing: np.ndarray):
+        self.codes = tuple(codes)
+        self.index: Dict[str, int] = {code: i for i, code in enumerate(self.codes)}
+        self.distance = distance
+        self.bearing = bearing
+
+    @classmethod
+    def build(cls, codes: Sequence[str], latitude, longitude, path: Optional[str] = None,
+              dtype=np.float32) -> 'DistanceMatrix':
+        """Compute both matrices from coordinates in degrees; with ``path`` they are stored there"""
+        lat = np.radians(np.asarray(latitude, dtype=np.float64))
+        lon = np.radians(np.asarray(longitude, dtype=np.float64))
+        return cls._build(codes, lat, lon, np.cos(lat), np.sin(lat), path, dtype)
+
+    @classmethod
+    def from_table(cls, table, path: Optional[str] = None) -> 'DistanceMatrix':
+        """Matrices for an AirportTable, reusing its precomputed radians"""
+        return cls._build(table.codes, table.lat_rad, table.lon_rad, table.cos_lat, table.sin_lat, path, np.float32)
+
+    @classmethod
+    def _build(cls, codes, lat, lon, cos_lat, sin_lat, path, dtype):
+        n = len(codes)
+        if path:
+            os.makedirs(path, exist_ok=True)
+            distance = np.lib.format.open_memmap(os.path.join(path, 'distance.npy'), mode='w+',
+                                                 dtype=dtype, shape=(n, n))
+            bearing = np.lib.format.open_memmap(os.path.join(path, 'bearing.npy'), mode='w+',
+                                                dtype=dtype, shape=(n, n))
+        else:
+            distance = np.empty((n, n), dtype=dtype)
+            bearing = np.empty((n, n), dtype=dtype)
+
+        rows = max(1, BLOCK_ELEMENTS // max(n, 1))
+        for start in range(0, n, rows):
+            block = slice(start, min(start + rows, n))
+            distance[block] = haversine_nm(lat[block, None], lon[block, None], cos_lat[block, None],
+                                           lat[None, :], lon[None, :], cos_lat[None, :])
+
+            dlon = lon[None, :] - lon[block, None]
+            y = np.sin(dlon) * cos_lat[None, :]
+            x = cos_lat[block, None] * sin_lat[None, :] - sin_lat[block, None] * cos_lat[None, :] * np.cos(dlon)
+            bearing[block] = np.degrees(np.arctan2(y, x)) % 360
+
+        if path:
+            distance.flush()
+            bearing.flush()
+            with open(os.path.join(path, 'codes.json'), 'w') as f:
+                json.dump(list(codes), f)
+        return cls(codes, distance, bearing)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'DistanceMatrix':
+        """Open matrices stored by ``build(..., path=...)``, memory-mapped read-only by default"""
+        mode = 'r' if mmap else None
+        with open(os.path.join(path, 'codes.json')) as f:
+            codes = json.load(f)
+        distance = np.load(os.path.join(path, 'distance.npy'), mmap_mode=mode)
+        bearing = np.load(os.path.join(path, 'bearing.npy'), mmap_mode=mode)
+        if distance.shape != (len(codes), len(codes)) or bearing.shape != distance.shape:
+            raise ValueError(f"Distance matrix at {path} does not match its airport list")
+        return cls(codes, distance, bearing)
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def nbytes(self) -> int:
+        return self.distance.nbytes + self.bearing.nbytes
+
+    def distance_nm(self, origin_icao: str, dest_icao: str) -> float:
+        """Great circle distance in nautical miles, 0 if an airport is unknown"""
+        i, j = self.index.get(origin_icao), self.index.get(dest_icao)
+        if i is None or j is None:
+            return 0.0
+        return float(self.distance[i, j])
+
+    def bearing_deg(self, origin_icao: str, dest_icao: str) -> float:
+        """Initial great circle course from origin to destination, 0 if an airport is unknown"""
+        i, j = self.index.get(origin_icao), self.index.get(dest_icao)
+        if i is None or j is None:
+            return 0.0
+        return float(self.bearing[i, j])
+
+    def distances_from(self, origin_icao: str) -> Optional[np.ndarray]:
+        """Row of distances from one airport to every other, in ``codes`` order"""
+        i = self.index.get(origin_icao)
+        return None if i is None else self.distance[i]
@@ -0,0 +1,353 @@
+# modules/fleet_optimizer.py
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from modules.demand_model import (
+    LOAD_FACTOR_BOUNDS, PRICE_IMPACT_BOUNDS, demand_factor, expected_load_factor, price_impact
+)
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # SciPy is optional - fall back to the NumPy solver below
+    linear_sum_assignment = None
+
+FREQUENCY_OPTIONS = (7, 14, 21)  # Daily, twice daily, three times daily
+FARE_FACTOR_BOUNDS = (0.85, 1.05)  # Fare search range relative to the market fare
+MAX_WEEKLY_BLOCK_HOURS = 16 * 7  # Utilization limit per aircraft
+BUSINESS_RATIO = 0.15
+
+# Defaults used by RouteEconomics when a spec field is missing
+SPEC_DEFAULTS = {
+    'passenger_capacity': 180,
+    'cruise_speed': 450,
+    'fuel_burn_per_hour': 800,
+    'crew_required': 2,
+    'base_price': 100
+}
+
+
+def solve_assignment(cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Minimum-cost assignment of every row to a distinct column (rows <= columns).
+
+    Uses scipy.optimize.linear_sum_assignment when SciPy is installed and the
+    equivalent shortest augmenting path algorithm in NumPy otherwise.
+    Returns (row indices, column indices).
+    """
+    if linear_sum_assignment is not None:
+        return linear_sum_assignment(cost)
+    return _shortest_augmenting_path(cost)
+
+
+def _shortest_augmenting_path(cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Jonker-Volgenant style successive shortest paths, one row at a time.
+
+    Each row is added with a Dijkstra search over reduced costs; the scan
+    over columns is vectorized, so the Python loop runs once per column
+    visited rather than once per matrix entry.
+    """
+    n, m = cost.shape
+    if n > m:
+        raise ValueError("More rows than columns - transpose the cost matrix")
+    u = np.zeros(n)
+    v = np.zeros(m)
+    row_for_col = np.full(m, -1, dtype=np.int64)
+    col_for_row = np.full(n, -1, dtype=np.int64)
+
+    for current in range(n):
+        shortest = np.full(m, np.inf)
+        path = np.full(m, -1, dtype=np.int64)
+        visited = np.zeros(m, dtype=bool)
+        tree_rows = [current]
+        row, min_value, sink = current, 0.0, -1
+
+        while sink == -1:
+            reduced = min_value + cost[row] - u[row] - v
+            better = (reduced < shortest) & ~visited
+            shortest[better] = reduced[better]
+            path[better] = row
+
+            candidates = np.where(visited, np.inf, shortest)
+            col = int(np.argmin(candidates))
+            min_value = candidates[col]
+            if min_value == np.inf:
+                raise ValueError("Cost matrix is infeasible")
+            if row_for_col[col] != -1:
+                # Prefer a free column among equally short ones - it ends the search
+                ties = np.flatnonzero((candidates == min_value) & (row_for_col == -1))
+                if len(ties):
+                    col = int(ties[0])
+            visited[col] = True
+            if row_for_col[col] == -1:
+                sink = col
+            else:
+                row = int(row_for_col[col])
+                tree_rows.append(row)
+
+        # Update the dual variables, then flip the augmenting path
+        u[current] += min_value
+        for row in tree_rows[1:]:
+            u[row] += min_value - shortest[col_for_row[row]]
+        v[visited] -= min_value - shortest[visited]
+
+        col = sink
+        while True:
+            row = path[col]
+            row_for_col[col] = row
+            col, col_for_row[row] = col_for_row[row], col
+            if row == current:
+                break
+
+    return np.arange(n), col_for_row
+
+
+def best_fare_factors(demand_multiplier: np.ndarray, competition: np.ndarray,
+                      bounds: Tuple[float, float] = FARE_FACTOR_BOUNDS) -> Tuple[np.ndarray, np.ndarray]:
+    """Revenue-maximizing fare factor per route, searched continuously within ``bounds``.
+
+    With fares at ``factor`` x market, the demand model's load factor is
+    clip(K * clip(1 / factor, 0.6, 1.2), 0.30, 0.95) with K = 0.75 x demand x
+    competition impact, so revenue per seat (factor x load factor) is
+    piecewise monotonic and its maximum lies on a segment end. Every
+    breakpoint inside the range is evaluated; ties go to the lower fare.
+    Returns (factor, load factor) arrays.
+    """
+    lo, hi = bounds
+    k = demand_factor(demand_multiplier, competition)
+    candidates = np.stack([
+        np.full_like(k, lo), np.full_like(k, hi),
+        np.full_like(k, 1 / PRICE_IMPACT_BOUNDS[1]), np.full_like(k, 1 / PRICE_IMPACT_BOUNDS[0]),
+        k / LOAD_FACTOR_BOUNDS[1], k / LOAD_FACTOR_BOUNDS[0]
+    ], axis=1)
+    candidates = np.sort(np.clip(candidates, lo, hi), axis=1)
+    load_factor = expected_load_factor(k[:, None], price_impact(1.0, candidates))
+    revenue = candidates * load_factor
+    best = np.argmax(revenue >= revenue.max(axis=1, keepdims=True) * (1 - 1e-12), axis=1)
+    rows = np.arange(len(k))
+    return candidates[rows, best], load_factor[rows, best]
+
+
+class FleetOptimizer:
+    """Fleet-wide aircraft-to-route assignment.
+
+    The monthly profit of every aircraft x route pair is precomputed as one
+    matrix - fares from a continuous search per route, frequency from the
+    per-flight margin within the utilization limit - with range, runway and
+    utilization constraints marking pairs infeasible. A global assignment
+    then gives each route at most ``route_capacity`` aircraft. Aircraft only
+    get a route that beats ``min_profit``; pass None to always assign
+    a feasible route, as the old per-aircraft search did.
+
+    ``update_aircraft``/``remove_aircraft``/``update_route`` only recompute
+    the affected matrix row or column, and the next ``solve`` is skipped
+    when the change cannot alter the optimum.
+    """
+
+    def __init__(self, route_economics, aircraft: List[Dict], route_ids: List[str],
+                 route_capacity: int = 1, min_profit: Optional[float] = 0.0,
+                 fare_bounds: Tuple[float, float] = FARE_FACTOR_BOUNDS):
+        self.route_economics = route_economics
+        self.route_capacity = route_capacity
+        self.min_profit = min_profit
+        self.fare_bounds = fare_bounds
+
+        self.aircraft: List[Dict] = list(aircraft)
+        self.route_ids: List[str] = []
+        self._load_routes(route_ids)
+        self._set_aircraft_arrays()
+        self.profit, self.frequency = self._pair_matrices(np.arange(len(self.aircraft)),
+                                                         np.arange(len(self.route_ids)))
+        self._solution: Optional[Dict[int, int]] = None  # aircraft row -> route column
+
+    # Data
+
+    def _load_routes(self, route_ids: List[str]):
+        data = self.route_economics.load_route_economics_data(route_ids)
+        self.route_ids = [route_id for route_id in route_ids if route_id in data]
+
+        def column(field, default=np.nan):
+            return np.array([data[r][field] if data[r][field] is not None else default
+                             for r in self.route_ids], dtype=np.float64)
+
+        self.distance = column('distance_nm')
+        self.airport_fees = column('airport_fees')
+        self.min_runway = column('min_runway_length', 0)
+        self.market_fare_economy = column('market_fare_economy')
+        self.market_fare_business = column('market_fare_business')
+        self.fare_factor, self.load_factor = best_fare_factors(
+            column('demand_multiplier'), column('competition_level'), self.fare_bounds)
+        # Revenue per seat flown at the chosen fares
+        self.seat_revenue = self.load_factor * self.fare_factor * (
+            self.market_fare_economy * (1 - BUSINESS_RATIO) + self.market_fare_business * BUSINESS_RATIO)
+
+    def _set_aircraft_arrays(self):
+        specs = [dict(SPEC_DEFAULTS, **a['spec']) for a in self.aircraft]
+
+        def column(field, default=np.nan):
+            return np.array([s.get(field, default) if s.get(field) is not None else default
+                             for s in specs], dtype=np.float64)
+
+        self.capacity = column('passenger_capacity')
+        self.cruise_speed = column('cruise_speed')
+        # Per block hour: fuel, crew and maintenance (2% of value per 3000 hours)
+        self.hourly_cost = (column('fuel_burn_per_hour') * 3.50 + 250 * column('crew_required') +
+                            column('base_price') * 1000000 * 0.02 / 3000)
+        self.max_range = column('max_range', np.inf)
+        self.runway_required = column('runway_length_required', 0)
+
+    def _pair_matrices(self, rows: np.ndarray, cols: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(monthly profit, weekly frequency) for aircraft ``rows`` x routes ``cols``; -inf = infeasible"""
+        distance = self.distance[cols][None, :]
+        flight_time = distance / self.cruise_speed[rows][:, None] + 0.5  # 30min ground ops
+        cost_per_flight = flight_time * self.hourly_cost[rows][:, None] + self.airport_fees[cols][None, :]
+        margin = self.capacity[rows][:, None] * self.seat_revenue[cols][None, :] - cost_per_flight
+
+        # Fly as often as utilization allows when each flight makes money, as little as possible otherwise
+        options = np.array(FREQUENCY_OPTIONS)
+        allowed = (options[None, None, :] * flight_time[:, :, None] <= MAX_WEEKLY_BLOCK_HOURS).sum(axis=2)
+        frequency = np.where(allowed == 0, 0, np.where(margin > 0, options[np.maximum(allowed - 1, 0)], options[0]))
+
+        feasible = ((frequency > 0) & np.isfinite(margin) &
+                    (distance <= self.max_range[rows][:, None]) &
+                    (self.min_runway[cols][None, :] >= self.runway_required[rows][:, None]))
+        profit = np.where(feasible, frequency * 4.33 * margin, -np.inf)
+        return profit, frequency
+
+    # Incremental updates
+
+    def update_aircraft(self, aircraft: Dict):
+        """Add an aircraft or replace its spec; only its matrix row is recomputed"""
+        index = next((i for i, a in enumerate(self.aircraft) if a['id'] == aircraft['id']), None)
+        if index is None:
+            self.aircraft.append(aircraft)
+            index = len(self.aircraft) - 1
+            self.profit = np.vstack([self.profit, np.full(len(self.route_ids), -np.inf)])
+            self.frequency = np.vstack([self.frequency, np.zeros(len(self.route_ids), dtype=np.int64)])
+            self._solution = None
+        else:
+            self.aircraft[index] = aircraft
+        self._set_aircraft_arrays()
+        profit, frequency = self._pair_matrices(np.array([index]), np.arange(len(self.route_ids)))
+        in_use = self._solution is not None and index in self._solution
+        self._apply_change(self.profit[index], profit[0], in_use)
+        self.profit[index], self.frequency[index] = profit[0], frequency[0]
+
+    def remove_aircraft(self, aircraft_id: str):
+        index = next((i for i, a in enumerate(self.aircraft) if a['id'] == aircraft_id), None)
+        if index is None:
+            return
+        del self.aircraft[index]
+        self.profit = np.delete(self.profit, index, axis=0)
+        self.frequency = np.delete(self.frequency, index, axis=0)
+        self._set_aircraft_arrays()
+        if self._solution is not None and index not in self._solution:
+            # An idle aircraft leaving changes nothing - just shift the row numbers
+            self._solution = {row - (row > index): col for row, col in self._solution.items()}
+        else:
+            self._solution = None
+
+    def update_route(self, route_id: str):
+        """Reload one route (or add it); only its matrix column is recomputed"""
+        route_ids = self.route_ids if route_id in self.route_ids else self.route_ids + [route_id]
+        previous = dict(zip(self.route_ids, range(len(self.route_ids))))
+        self._load_routes(route_ids)
+        if route_id not in self.route_ids:
+            # Route is gone from the database
+            if route_id in previous:
+                keep = [previous[r] for r in self.route_ids]
+                self.profit, self.frequency = self.profit[:, keep], self.frequency[:, keep]
+                self._solution = None
+            return
+        index = self.route_ids.index(route_id)
+        if index == self.profit.shape[1]:
+            self.profit = np.hstack([self.profit, np.full((len(self.aircraft), 1), -np.inf)])
+            self.frequency = np.hstack([self.frequency, np.zeros((len(self.aircraft), 1), dtype=np.int64)])
+        profit, frequency = self._pair_matrices(np.arange(len(self.aircraft)), np.array([index]))
+        in_use = self._solution is not None and any(
+            col // self.route_capacity == index for col in self._solution.values())
+        self._apply_change(self.profit[:, index], profit[:, 0], in_use)
+        self.profit[:, index], self.frequency[:, index] = profit[:, 0], frequency[:, 0]
+
+    def _apply_change(self, old: np.ndarray, new: np.ndarray, in_use: bool):
+        """Drop the current solution unless the change provably cannot alter it.
+
+        Lowering options nobody uses never changes the optimum; touching an
+        assigned pair or raising any option needs a new solve.
+        """
+        if self._solution is not None and (in_use or np.any(new > old)):
+            self._solution = None
+
+    # Solving
+
+    def solve(self) -> List[Dict]:
+        """Optimal assignment in optimize_aircraft_assignment's result format, best first"""
+        if self._solution is None:
+            self._solution = self._solve()
+        if not self._solution:
+            return []
+
+        rows = list(self._solution)
+        cols = [self._solution[row] // self.route_capacity for row in rows]
+        configurations = [{
+            'route_id': self.route_ids[col],
+            'aircraft_spec': self.aircraft[row]['spec'],
+            'frequency_weekly': int(self.frequency[row, col]),
+            'fare_economy': float(self.market_fare_economy[col] * self.fare_factor[col]),
+            'fare_business': float(self.market_fare_business[col] * self.fare_factor[col]),
+            'business_ratio': BUSINESS_RATIO
+        } for row, col in zip(rows, cols)]
+        # Report the exact RouteEconomics figures for the chosen configurations
+        analyses = self.route_economics.calculate_route_profitability_batch(configurations)
+
+        results = []
+        for row, config, analysis in zip(rows, configurations, analyses):
+            if 'error' in analysis:
+                continue
+            results.append({
+                'aircraft_id': self.aircraft[row]['id'],
+                'recommended_route': config['route_id'],
+                'configuration': {
+                    'frequency_weekly': config['frequency_weekly'],
+                    'fare_economy': config['fare_economy'],
+                    'fare_business': config['fare_business'],
+                    'profitability': analysis
+                },
+                'monthly_profit': analysis['profitability']['monthly_profit']
+            })
+        results.sort(key=lambda x: x['monthly_profit'], reverse=True)
+        return results
+
+    def _solve(self) -> Dict[int, int]:
+        n = len(self.aircraft)
+        if n == 0 or not self.route_ids:
+            return {}
+        # One column per route slot, plus one "stay idle" column per aircraft worth min_profit
+        profit = np.repeat(self.profit, self.route_capacity, axis=1)
+        feasible = np.isfinite(profit)
+        if not feasible.any():
+            return {}
+        penalty = (np.abs(profit[feasible]).max() + 1) * (n + 1)
+        cost = np.where(feasible, -profit, penalty)
+
+        # Some optimal solution only uses each aircraft's n best slots (at most
+        # n - 1 others can take the better ones), so drop every other column
+        slots = np.arange(cost.shape[1])
+        if len(slots) > n:
+            slots = np.unique(np.argpartition(cost, n - 1, axis=1)[:, :n])
+            cost = cost[:, slots]
+        if self.min_profit is not None:
+            cost = np.hstack([cost, np.full((n, n), -self.min_profit)])
+
+        if n > cost.shape[1]:
+            cols, rows = solve_assignment(cost.T)
+        else:
+            rows, cols = solve_assignment(cost)
+        solution = {}
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            if col >= len(slots):
+                continue  # Idle
+            slot = int(slots[col])
+            if feasible[row, slot] and (self.min_profit is None or profit[row, slot] > self.min_profit):
+                solution[row] = slot
+        return solution
@@ -0,0 +1,145 @@
+# modules/flight_debug.py
+
+import logging
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from modules.flight_engine import STATUS_NAMES
+
+PHASE_NAMES = ('outbound', 'parked_arrival', 'return', 'parked_departure')
+
+# Channel levels: 'off' costs nothing per tick, 'info' records sampled phase/status
+# transitions into the ring buffer, 'debug' also echoes them to the flight_sim logger
+LEVELS = {'off': 0, 'info': 1, 'debug': 2}
+
+logger = logging.getLogger('flight_sim')
+
+
+def enable_debug_logging():
+    """Let the flight_sim logger emit DEBUG records, to stderr unless logging is already set up"""
+    logger.setLevel(logging.DEBUG)
+    if not logger.hasHandlers():
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+        logger.addHandler(handler)
+
+
+class FlightDebugChannel:
+    """Sampled, level-gated diagnostics for the flight simulation.
+
+    Each observed tick is compared with the previous one in a single vector
+    pass, and every sampled aircraft whose phase or status changed is appended
+    to a fixed-size ring buffer. Sampling is a stable hash of the aircraft id,
+    so a sampled aircraft stays sampled and its transitions form a complete
+    history.
+    """
+
+    def __init__(self, level: str = 'off', sample_rate: float = 1.0, capacity: int = 2000):
+        self.level = LEVELS['off']
+        self.sample_rate = 1.0
+        self.transitions = deque(maxlen=capacity)
+        self.total_transitions = 0
+        self.summary: Optional[Dict] = None
+        self._lock = threading.Lock()
+        self._version = None
+        self._sampled: Optional[np.ndarray] = None
+        self._phase: Optional[np.ndarray] = None
+        self._status: Optional[np.ndarray] = None
+        self.configure(level, sample_rate)
+
+    @property
+    def enabled(self) -> bool:
+        return self.level > LEVELS['off']
+
+    @property
+    def level_name(self) -> str:
+        return next(name for name, value in LEVELS.items() if value == self.level)
+
+    def configure(self, level: str = None, sample_rate: float = None, capacity: int = None):
+        """Change level, sample rate (0-1] or ring buffer size at runtime"""
+        with self._lock:
+            if level is not None:
+                if level not in LEVELS:
+                    raise ValueError(f"Unknown debug level '{level}' (expected one of {', '.join(LEVELS)})")
+                self.level = LEVELS[level]
+                if self.level >= LEVELS['debug']:
+                    enable_debug_logging()
+            if sample_rate is not None:
+                sample_rate = float(sample_rate)
+                if not 0 < sample_rate <= 1:
+                    raise ValueError("Sample rate must be in (0, 1]")
+                self.sample_rate = sample_rate
+            if capacity is not None:
+                self.transitions = deque(self.transitions, maxlen=int(capacity))
+            # Force the sample mask and previous-tick state to be rebuilt
+            self._version = self._phase = self._status = None
+
+    def observe(self, engine, state: Dict[str, np.ndarray], sim_time: float, version=None):
+        """Record sampled transitions for one simulate() result - a no-op when off"""
+        if not self.level:
+            return
+        with self._lock:
+            if version is None or version != self._version:
+                # New assignment set: rows changed meaning, start a fresh comparison
+                self._version = version
+                self._sampled = self._sample_mask(engine.ids)
+                self._phase = self._status = None
+
+            phase, status = state['phase'], state['status']
+            if self._phase is not None:
+                changed = np.flatnonzero(((phase != self._phase) | (status != self._status)) & self._sampled)
+                self._record(engine, state, changed, sim_time)
+            self._phase, self._status = phase, status
+
+            self.summary = {
+                'sim_time': sim_time,
+                'aircraft': len(engine),
+                'status_counts': {
+                    name: int(count)
+                    for name, count in zip(STATUS_NAMES, np.bincount(status, minlength=len(STATUS_NAMES)))
+                }
+            }
+
+    def _sample_mask(self, ids: List[str]) -> np.ndarray:
+        if self.sample_rate >= 1:
+            return np.ones(len(ids), dtype=bool)
+        buckets = np.fromiter((zlib.crc32(i.encode('utf-8')) % 10000 for i in ids),
+                              dtype=np.int64, count=len(ids))
+        return buckets < self.sample_rate * 10000
+
+    def _record(self, engine, state, changed: np.ndarray, sim_time: float):
+        wall_time = time.time()
+        for i in changed.tolist():
+            record = {
+                'wall_time': wall_time,
+                'sim_time': sim_time,
+                'aircraft_id': engine.assignments[i]['aircraft_id'],
+                'route_id': engine.assignments[i].get('route_id'),
+                'from_phase': PHASE_NAMES[self._phase[i]],
+                'to_phase': PHASE_NAMES[state['phase'][i]],
+                'from_status': STATUS_NAMES[self._status[i]],
+                'to_status': STATUS_NAMES[state['status'][i]],
+                'progress': float(state['progress'][i]),
+                'raw_progress': float(state['raw_progress'][i]),
+                'lat': float(state['lat'][i]),
+                'lon': float(state['lon'][i])
+            }
+            self.transitions.append(record)
+            self.total_transitions += 1
+            if self.level >= LEVELS['debug']:
+                logger.debug("Aircraft %s: %s/%s -> %s/%s at progress %.3f",
+                             record['aircraft_id'], record['from_phase'], record['from_status'],
+                             record['to_phase'], record['to_status'], record['progress'])
+
+    def recent(self, aircraft_id: str = None, limit: int = 100) -> List[Dict]:
+        """Most recent transitions first, optionally for a single aircraft"""
+        with self._lock:
+            records = list(self.transitions)
+        if aircraft_id is not None:
+            records = [r for r in records if str(r['aircraft_id']) == str(aircraft_id)]
+        return records[::-1][:limit]
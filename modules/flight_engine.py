@@ -0,0 +1,299 @@
+# modules/flight_engine.py
+
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from modules.distance_matrix import DistanceMatrix
+from modules.flight_events import FlightEventScheduler
+from modules.route_paths import RoutePathCache
+
+# Round-trip phases
+PHASE_OUTBOUND = 0
+PHASE_PARKED_ARRIVAL = 1
+PHASE_RETURN = 2
+PHASE_PARKED_DEPARTURE = 3
+
+# Flight status codes (index into STATUS_NAMES / STATUS_COLORS)
+STATUS_PARKED = 0
+STATUS_DEPARTING = 1
+STATUS_EN_ROUTE = 2
+STATUS_ARRIVING = 3
+
+STATUS_NAMES = ('parked', 'departing', 'en_route', 'arriving')
+STATUS_COLORS = ('#FFC107', 'green', 'red', 'orange')
+
+REST_TIME_HOURS = 0.01  # About 36 seconds rest between flights for visible parking
+CRUISE_ALTITUDE = 35000  # Cruise altitude in feet
+NM_PER_DEGREE = 60  # Great circle nautical miles per degree of arc
+
+
+def bezier_positions(from_lat: np.ndarray, from_lon: np.ndarray,
+                     control_lat: np.ndarray, control_lon: np.ndarray,
+                     to_lat: np.ndarray, to_lon: np.ndarray,
+                     straight: np.ndarray, progress: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Positions along the route curves from cached control points (straight for short routes) - matches the frontend"""
+    t = progress
+    curved_lat = (1 - t) * (1 - t) * from_lat + 2 * (1 - t) * t * control_lat + t * t * to_lat
+    curved_lon = (1 - t) * (1 - t) * from_lon + 2 * (1 - t) * t * control_lon + t * t * to_lon
+    lat = np.where(straight, from_lat + (to_lat - from_lat) * progress, curved_lat)
+    lon = np.where(straight, from_lon + (to_lon - from_lon) * progress, curved_lon)
+    return lat, lon
+
+
+class FlightEngine:
+    """Batched flight position engine - one vectorized pass for every assignment.
+
+    Phases are driven by the discrete-event core in ``self.events``: only
+    aircraft with a due event change phase on a tick, and positions are
+    interpolated from the start of each aircraft's current cycle.
+    """
+
+    def __init__(self, airports: Dict[str, Dict], paths: RoutePathCache = None,
+                 distances: Optional[DistanceMatrix] = None):
+        self.airports = airports
+        self.paths = paths or RoutePathCache(airports)
+        self.distances = distances
+        self.events = FlightEventScheduler()
+        self.load([])
+
+    def load(self, assignments: List[Dict], version: Optional[int] = None):
+        """Compile assignment geometry into NumPy arrays.
+
+        When a ``version`` is given (see AssignmentRegistry.version) the arrays
+        are only rebuilt if it differs from the one already loaded.
+        """
+        if version is not None and version == getattr(self, 'version', None):
+            return
+        self.version = version
+        airports = self.airports
+        self.assignments = [
+            a for a in assignments
+            if a['departure_airport'] in airports and a['arrival_airport'] in airports
+        ]
+
+        dep = [airports[a['departure_airport']] for a in self.assignments]
+        arr = [airports[a['arrival_airport']] for a in self.assignments]
+        self.dep_lat = np.array([ap['lat'] for ap in dep], dtype=np.float64)
+        self.dep_lon = np.array([ap['lon'] for ap in dep], dtype=np.float64)
+        self.arr_lat = np.array([ap['lat'] for ap in arr], dtype=np.float64)
+        self.arr_lon = np.array([ap['lon'] for ap in arr], dtype=np.float64)
+
+        # Flight time based on distance in degrees (ULTRA fast game pace); static per assignment.
+        # With a distance matrix that is the great circle arc, otherwise the planar map distance
+        if self.distances is not None:
+            arc_degrees = [
+                self.distances.distance_nm(a['departure_airport'], a['arrival_airport']) / NM_PER_DEGREE
+                for a in self.assignments
+            ]
+        else:
+            arc_degrees = [math.sqrt((a['lat'] - d['lat'])**2 + (a['lon'] - d['lon'])**2) for d, a in zip(dep, arr)]
+        self.flight_time_hours = np.array([max(0.005, degrees * 0.02) for degrees in arc_degrees], dtype=np.float64)
+        self.round_trip_hours = (self.flight_time_hours + REST_TIME_HOURS) * 2
+
+        # Curve control points come from the per-route path cache
+        outbound = [self.paths.get(a['departure_airport'], a['arrival_airport']) for a in self.assignments]
+        inbound = [self.paths.get(a['arrival_airport'], a['departure_airport']) for a in self.assignments]
+        self.outbound_paths, self.return_paths = outbound, inbound
+        self.outbound_straight = np.array([p.straight for p in outbound], dtype=bool)
+        self.return_straight = np.array([p.straight for p in inbound], dtype=bool)
+        self.outbound_control_lat = np.array([p.control[0] if p.control else 0.0 for p in outbound], dtype=np.float64)
+        self.outbound_control_lon = np.array([p.control[1] if p.control else 0.0 for p in outbound], dtype=np.float64)
+        self.return_control_lat = np.array([p.control[0] if p.control else 0.0 for p in inbound], dtype=np.float64)
+        self.return_control_lon = np.array([p.control[1] if p.control else 0.0 for p in inbound], dtype=np.float64)
+
+        # Headings only depend on the leg, so compute them once per assignment
+        self.outbound_heading = np.array([
+            self._heading(a['lat'] - d['lat'], a['lon'] - d['lon']) for d, a in zip(dep, arr)
+        ], dtype=np.float64)
+        self.return_heading = np.array([
+            self._heading(d['lat'] - a['lat'], d['lon'] - a['lon']) for d, a in zip(dep, arr)
+        ], dtype=np.float64)
+
+        # Static per-assignment strings, reused on every tick
+        self.ids = [f"{a['aircraft_id']}" for a in self.assignments]
+        self.names = [f"Flight {a['aircraft_id']}" for a in self.assignments]
+        self.outbound_routes = [f"{a['departure_airport']} → {a['arrival_airport']}" for a in self.assignments]
+        self.return_routes = [f"{a['arrival_airport']} → {a['departure_airport']}" for a in self.assignments]
+        self.parked_at_arrival = [f"PARKED at {a['arrival_airport']}" for a in self.assignments]
+        self.parked_at_departure = [f"PARKED at {a['departure_airport']}" for a in self.assignments]
+
+        self.events.reset(self.flight_time_hours, self.round_trip_hours, self.assignments, REST_TIME_HOURS)
+
+    @staticmethod
+    def _heading(lat_diff: float, lon_diff: float) -> float:
+        """Compass heading in degrees for a leg"""
+        heading = math.degrees(math.atan2(lon_diff, lat_diff))
+        if heading < 0:
+            heading += 360
+        return heading
+
+    def __len__(self):
+        return len(self.assignments)
+
+    def simulate(self, current_time: float) -> Dict[str, np.ndarray]:
+        """Compute phase, progress, position, heading, altitude and status for all aircraft.
+
+        ``current_time`` is simulation time in seconds and should not go
+        backwards - the event core re-seeks (without firing events) if it does.
+        """
+        flight_time = self.flight_time_hours
+        self.events.advance(current_time)
+
+        # Phase comes from the last event; time into the current cycle (hours) from its start
+        phase = self.events.phase.copy()
+        cycle_time = np.maximum(current_time / 3600 - self.events.cycle * self.round_trip_hours, 0.0)
+        first_rest_end = flight_time + REST_TIME_HOURS
+        outbound = phase == PHASE_OUTBOUND
+        returning = phase == PHASE_RETURN
+        flying = outbound | returning
+
+        raw_progress = np.maximum(np.where(returning, cycle_time - first_rest_end, cycle_time) / flight_time, 0.0)
+
+        # 🛬 SLOW DOWN LANDING: past 90% the remaining distance is flown at half speed
+        landing = flying & (raw_progress >= 0.90)
+        slowed = np.minimum(0.90 + ((raw_progress - 0.90) / 0.10 * 0.5) * 0.10, 1.0)
+        progress = np.where(landing, slowed, raw_progress)
+        progress[~flying] = 0.0
+
+        # Curved path: return flights run arr -> dep
+        from_lat = np.where(returning, self.arr_lat, self.dep_lat)
+        from_lon = np.where(returning, self.arr_lon, self.dep_lon)
+        to_lat = np.where(returning, self.dep_lat, self.arr_lat)
+        to_lon = np.where(returning, self.dep_lon, self.arr_lon)
+        control_lat = np.where(returning, self.return_control_lat, self.outbound_control_lat)
+        control_lon = np.where(returning, self.return_control_lon, self.outbound_control_lon)
+        straight = np.where(returning, self.return_straight, self.outbound_straight)
+        lat, lon = bezier_positions(from_lat, from_lon, control_lat, control_lon,
+                                    to_lat, to_lon, straight, progress)
+
+        # Parked aircraft sit at the airport they last landed at
+        parked_arrival = phase == PHASE_PARKED_ARRIVAL
+        parked_departure = phase == PHASE_PARKED_DEPARTURE
+        lat = np.where(parked_arrival, self.arr_lat, np.where(parked_departure, self.dep_lat, lat))
+        lon = np.where(parked_arrival, self.arr_lon, np.where(parked_departure, self.dep_lon, lon))
+
+        heading = np.where(outbound, self.outbound_heading,
+                           np.where(returning, self.return_heading, 0.0))
+
+        # Altitude and status by flight phase
+        status = np.full(len(self), STATUS_EN_ROUTE, dtype=np.int8)
+        status[progress >= 0.90] = STATUS_ARRIVING
+        status[progress <= 0.05] = STATUS_DEPARTING
+        status[progress == 0] = STATUS_PARKED
+
+        altitude = np.full(len(self), CRUISE_ALTITUDE, dtype=np.int64)
+        climb = status == STATUS_DEPARTING
+        descent = status == STATUS_ARRIVING
+        altitude[climb] = np.trunc(progress[climb] / 0.05 * CRUISE_ALTITUDE)
+        altitude[descent] = np.trunc((1.0 - progress[descent]) / 0.10 * CRUISE_ALTITUDE)
+        altitude[status == STATUS_PARKED] = 0
+
+        return {
+            'cycle_time': cycle_time,
+            'phase': phase,
+            'raw_progress': raw_progress,
+            'landing': landing,
+            'progress': progress,
+            'lat': lat,
+            'lon': lon,
+            'heading': heading,
+            'altitude': altitude,
+            'status': status,
+        }
+
+    def flight_plans(self) -> List[Dict]:
+        """Static cycle parameters per assignment, for clients that dead-reckon positions.
+
+        Every cycle starts at simulation time 0 (``cycle_time = t / 3600 mod
+        round_trip_hours``), so together with a simulation clock these are
+        enough to reproduce ``simulate`` on the client.
+        """
+        plans = []
+        for i, assignment in enumerate(self.assignments):
+            dep_lat, dep_lon = float(self.dep_lat[i]), float(self.dep_lon[i])
+            arr_lat, arr_lon = float(self.arr_lat[i]), float(self.arr_lon[i])
+            outbound_control = self.outbound_paths[i].control
+            return_control = self.return_paths[i].control
+            plans.append({
+                'id': self.ids[i],
+                'name': self.names[i],
+                'aircraft_id': assignment['aircraft_id'],
+                'dep_airport': assignment['departure_airport'],
+                'arr_airport': assignment['arrival_airport'],
+                'dep': [dep_lat, dep_lon],
+                'arr': [arr_lat, arr_lon],
+                'outbound_control': list(outbound_control) if outbound_control else None,
+                'return_control': list(return_control) if return_control else None,
+                'outbound_heading': float(self.outbound_heading[i]),
+                'return_heading': float(self.return_heading[i]),
+                'flight_time_hours': float(self.flight_time_hours[i]),
+                'rest_time_hours': REST_TIME_HOURS,
+                'round_trip_hours': float(self.round_trip_hours[i]),
+            })
+        return plans
+
+    def build_flights(self, state: Dict[str, np.ndarray], time_multiplier: float = 1.0) -> List[Dict]:
+        """Materialize simulate() output into the active_flights dict format"""
+        speed = f"{time_multiplier}x"
+        cycle_time = state['cycle_time'].tolist()
+        cycle_remaining = (self.round_trip_hours - state['cycle_time']).tolist()
+        phase = state['phase'].tolist()
+        progress = state['progress'].tolist()
+        lat = state['lat'].tolist()
+        lon = state['lon'].tolist()
+        heading = state['heading'].tolist()
+        altitude = state['altitude'].tolist()
+        status = state['status'].tolist()
+        flight_time = self.flight_time_hours.tolist()
+        round_trip = self.round_trip_hours.tolist()
+
+        active_flights = []
+        for i, assignment in enumerate(self.assignments):
+            p = phase[i]
+            dep = assignment['departure_airport']
+            arr = assignment['arrival_airport']
+            if p == PHASE_OUTBOUND:
+                route, current_dep, current_arr = self.outbound_routes[i], dep, arr
+            elif p == PHASE_PARKED_ARRIVAL:
+                route, current_dep, current_arr = self.parked_at_arrival[i], arr, dep
+            elif p == PHASE_RETURN:
+                route, current_dep, current_arr = self.return_routes[i], arr, dep
+            else:
+                route, current_dep, current_arr = self.parked_at_departure[i], dep, arr
+
+            is_return_flight = p == PHASE_RETURN
+            pct = progress[i] if p == PHASE_OUTBOUND or is_return_flight else 0
+            code = status[i]
+
+            active_flights.append({
+                'id': self.ids[i],
+                'name': self.names[i],
+                'lat': lat[i],
+                'lon': lon[i],
+                'heading': heading[i],
+                'aircraft_id': assignment['aircraft_id'],
+                'route': route,
+                'progress': pct * 100,
+                'dep_airport': current_dep,
+                'arr_airport': current_arr,
+                'status': STATUS_NAMES[code],
+                'color': STATUS_COLORS[code],
+                'speed': speed,
+                'altitude': altitude[i],  # Realistic altitude based on flight phase
+                'altitude_meters': altitude[i] * 0.3048,  # Convert feet to meters for 3D globe
+                'ground_speed': 450 + (pct * 50),  # Simulated varying speed
+                'is_return_flight': is_return_flight,
+                'cycle_time_remaining': cycle_remaining[i],
+                'rest_time_remaining': 0,
+                'debug_info': {
+                    'current_cycle_time': cycle_time[i],
+                    'flight_time_hours': flight_time[i],
+                    'round_trip_duration_hours': round_trip[i],
+                    'time_multiplier': time_multiplier,
+                    'phase': 'return' if is_return_flight else 'outbound'
+                }
+            })
+
+        return active_flights
@@ -0,0 +1,184 @@
+# modules/flight_events.py
+
+import heapq
+from typing import Callable, Dict, List
+
+import numpy as np
+
+# Event types
+EVENT_TAKEOFF = 0
+EVENT_TOP_OF_CLIMB = 1
+EVENT_TOP_OF_DESCENT = 2
+EVENT_LANDING = 3
+EVENT_TURNAROUND_DONE = 4
+
+EVENT_NAMES = ('takeoff', 'top_of_climb', 'top_of_descent', 'landing', 'turnaround_done')
+
+# Leg fractions where the flight status changes (see FlightEngine.simulate)
+TOP_OF_CLIMB_PROGRESS = 0.05
+TOP_OF_DESCENT_PROGRESS = 0.90
+
+# Phase codes (same values as flight_engine.PHASE_*)
+_OUTBOUND, _PARKED_ARRIVAL, _RETURN, _PARKED_DEPARTURE = 0, 1, 2, 3
+
+# One round trip as (event, phase after the event, is_return_leg) per step;
+# the offsets of each step within the cycle are built per aircraft in reset()
+CYCLE_STEPS = (
+    (EVENT_TAKEOFF, _OUTBOUND, False),
+    (EVENT_TOP_OF_CLIMB, _OUTBOUND, False),
+    (EVENT_TOP_OF_DESCENT, _OUTBOUND, False),
+    (EVENT_LANDING, _PARKED_ARRIVAL, False),
+    (EVENT_TURNAROUND_DONE, _PARKED_ARRIVAL, True),
+    (EVENT_TAKEOFF, _RETURN, True),
+    (EVENT_TOP_OF_CLIMB, _RETURN, True),
+    (EVENT_TOP_OF_DESCENT, _RETURN, True),
+    (EVENT_LANDING, _PARKED_DEPARTURE, True),
+    (EVENT_TURNAROUND_DONE, _PARKED_DEPARTURE, False),
+)
+
+# A single advance() popping more than this many events per aircraft re-seeks instead
+MAX_EVENTS_PER_AIRCRAFT = 50
+
+
+class FlightEventScheduler:
+    """Discrete-event core for the round-trip flight cycle.
+
+    Each aircraft has exactly one pending event in a heap ordered by
+    simulation time. ``advance`` pops due events, updates the per-aircraft
+    phase and current-cycle arrays, notifies listeners and schedules the
+    aircraft's next event, so its cost scales with the number of events
+    rather than aircraft x ticks. Positions are interpolated by the engine
+    from the cycle start these arrays describe.
+
+    Simulation time must move forward; going backwards (or jumping so far
+    that replaying every event would be wasteful) re-seeks from scratch
+    without notifying listeners.
+    """
+
+    def __init__(self):
+        self._listeners: Dict[int, List[Callable[[Dict], None]]] = {}
+        self.events_processed = 0
+        self.seeks = 0
+        self.reset(np.empty(0), np.empty(0), [])
+
+    def on(self, event: str, callback: Callable[[Dict], None]):
+        """Call ``callback(event_dict)`` whenever an event of this type happens"""
+        self._listeners.setdefault(EVENT_NAMES.index(event), []).append(callback)
+
+    def reset(self, flight_time_hours: np.ndarray, round_trip_hours: np.ndarray,
+              assignments: List[Dict], rest_time_hours: float = 0.01):
+        """Load a new assignment set; the schedule is built on the next advance()"""
+        self.assignments = assignments
+        self.round_trip_hours = round_trip_hours
+        ft = flight_time_hours
+        return_start = ft + rest_time_hours
+        # Hours into the cycle of every step in CYCLE_STEPS, per aircraft
+        self.step_offsets = np.stack([
+            np.zeros_like(ft),
+            ft * TOP_OF_CLIMB_PROGRESS,
+            ft * TOP_OF_DESCENT_PROGRESS,
+            ft,
+            return_start,
+            return_start,
+            return_start + ft * TOP_OF_CLIMB_PROGRESS,
+            return_start + ft * TOP_OF_DESCENT_PROGRESS,
+            return_start + ft,
+            round_trip_hours
+        ], axis=1)
+
+        n = len(assignments)
+        self.phase = np.full(n, _PARKED_DEPARTURE, dtype=np.int8)
+        self.cycle = np.zeros(n, dtype=np.int64)  # Index of the current round trip
+        self.now = None
+        self._heap = []
+        self._seq = 0
+
+    def seek(self, sim_time: float):
+        """Rebuild every aircraft's state and pending event at ``sim_time``"""
+        self.seeks += 1
+        hours = sim_time / 3600
+        n = len(self.assignments)
+        self.cycle = np.floor_divide(hours, self.round_trip_hours).astype(np.int64)
+        into_cycle = hours - self.cycle * self.round_trip_hours
+
+        # The next step is the first one still in the future; everything before it happened
+        pending = self.step_offsets > into_cycle[:, None]
+        next_step = np.where(pending.any(axis=1), pending.argmax(axis=1), len(CYCLE_STEPS))
+        step_phase = np.array([phase for _, phase, _ in CYCLE_STEPS], dtype=np.int8)
+        self.phase = np.where(next_step > 0, step_phase[np.maximum(next_step - 1, 0)],
+                              _PARKED_DEPARTURE).astype(np.int8)
+
+        self._heap = []
+        self._seq = 0
+        for row, step, cycle in zip(range(n), next_step.tolist(), self.cycle.tolist()):
+            if step == len(CYCLE_STEPS):
+                step, cycle = 0, cycle + 1
+            self._push(row, step, cycle)
+        heapq.heapify(self._heap)
+        self.now = sim_time
+
+    def advance(self, sim_time: float) -> int:
+        """Process every event up to ``sim_time``; returns the number processed"""
+        if self.now is None or sim_time < self.now:
+            self.seek(sim_time)
+            return 0
+
+        heap = self._heap
+        limit = MAX_EVENTS_PER_AIRCRAFT * max(len(self.assignments), 1)
+        processed = 0
+        while heap and heap[0][0] <= sim_time:
+            event_time, _, row, step, cycle = heapq.heappop(heap)
+            event, phase, is_return = CYCLE_STEPS[step]
+            self.phase[row] = phase
+            self.cycle[row] = cycle
+
+            listeners = self._listeners.get(event)
+            if listeners:
+                self._notify(listeners, event, event_time, row, is_return)
+
+            if step + 1 == len(CYCLE_STEPS):
+                self._push(row, 0, cycle + 1, heap)
+            else:
+                self._push(row, step + 1, cycle, heap)
+
+            processed += 1
+            if processed >= limit:
+                # Too far behind to replay - jump straight to the present
+                self.seek(sim_time)
+                break
+
+        self.events_processed += processed
+        self.now = sim_time
+        return processed
+
+    def _push(self, row: int, step: int, cycle: int, heap: list = None):
+        event_time = (cycle * self.round_trip_hours[row] + self.step_offsets[row, step]) * 3600
+        entry = (float(event_time), self._seq, row, step, cycle)
+        self._seq += 1
+        if heap is None:
+            self._heap.append(entry)  # seek() heapifies once at the end
+        else:
+            heapq.heappush(heap, entry)
+
+    def _notify(self, listeners, event: int, event_time: float, row: int, is_return: bool):
+        assignment = self.assignments[row]
+        dep, arr = assignment['departure_airport'], assignment['arrival_airport']
+        if is_return:
+            dep, arr = arr, dep
+        record = {
+            'type': EVENT_NAMES[event],
+            'sim_time': event_time,
+            'aircraft_id': assignment['aircraft_id'],
+            'route_id': assignment.get('route_id'),
+            'dep_airport': dep,
+            'arr_airport': arr,
+            'is_return_flight': is_return
+        }
+        for callback in listeners:
+            try:
+                callback(record)
+            except Exception as e:
+                print(f"Error in flight event listener: {e}")
+
+    def __len__(self):
+        return len(self._heap)
@@ -0,0 +1,119 @@
+# modules/flight_stream.py
+
+import threading
+from typing import Dict, List
+
+import numpy as np
+
+# One packed little-endian record per aircraft in a binary aircraft_frame (21 bytes,
+# no padding). ``index`` points into the aircraft table from build_frame_index;
+# ``phase`` is a flight_engine PHASE_* code, ``status`` a STATUS_* code and
+# ``progress`` the leg progress scaled to 0-255.
+FRAME_DTYPE = np.dtype([
+    ('index', '<u4'),
+    ('lat', '<f4'),
+    ('lon', '<f4'),
+    ('heading', '<f4'),
+    ('altitude', '<u2'),
+    ('status', 'u1'),
+    ('phase', 'u1'),
+    ('progress', 'u1'),
+])
+
+
+def _diff_fields(previous: Dict, current: Dict) -> Dict:
+    """Fields of current that differ from previous (nested dicts diffed one level deep)"""
+    diff = {}
+    for key, value in current.items():
+        old = previous.get(key)
+        if old == value:
+            continue
+        if isinstance(value, dict) and isinstance(old, dict):
+            diff[key] = {k: v for k, v in value.items() if old.get(k) != v}
+        else:
+            diff[key] = value
+    return diff
+
+
+class DeltaEncoder:
+    """Encodes successive active_flights lists as keyframes plus per-aircraft deltas.
+
+    Every call to ``encode`` bumps ``seq``; a delta with sequence number N
+    applies on top of the state at N - 1, so clients can detect gaps and ask
+    for a fresh keyframe.
+    """
+
+    def __init__(self):
+        self.seq = 0
+        self._state: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def keyframe(self) -> Dict:
+        """Full state at the current sequence number"""
+        with self._lock:
+            return {
+                'type': 'keyframe',
+                'seq': self.seq,
+                'flights': list(self._state.values())
+            }
+
+    def encode(self, flights: List[Dict]) -> Dict:
+        """Delta from the previous state to ``flights``"""
+        current = {flight['id']: flight for flight in flights}
+        with self._lock:
+            previous = self._state
+            added = [flight for flight_id, flight in current.items() if flight_id not in previous]
+            removed = [flight_id for flight_id in previous if flight_id not in current]
+            changed = {}
+            for flight_id, flight in current.items():
+                old = previous.get(flight_id)
+                if old is not None:
+                    diff = _diff_fields(old, flight)
+                    if diff:
+                        changed[flight_id] = diff
+
+            self._state = current
+            self.seq += 1
+            return {
+                'type': 'delta',
+                'seq': self.seq,
+                'added': added,
+                'removed': removed,
+                'changed': changed
+            }
+
+    def reset(self):
+        """Forget the current state (next delta re-adds every aircraft); seq keeps counting"""
+        with self._lock:
+            self._state = {}
+
+
+def pack_frame(state: Dict[str, np.ndarray]) -> bytes:
+    """Pack FlightEngine.simulate() output into FRAME_DTYPE records"""
+    records = np.empty(len(state['lat']), dtype=FRAME_DTYPE)
+    records['index'] = np.arange(len(records))
+    records['lat'] = state['lat']
+    records['lon'] = state['lon']
+    records['heading'] = state['heading']
+    records['altitude'] = state['altitude']
+    records['status'] = state['status']
+    records['phase'] = state['phase']
+    records['progress'] = np.rint(state['progress'] * 255)
+    return records.tobytes()
+
+
+def build_frame_index(engine) -> Dict:
+    """Static per-aircraft fields that binary frame records refer to by index"""
+    return {
+        'record_size': FRAME_DTYPE.itemsize,
+        'aircraft': [
+            {
+                'id': engine.ids[i],
+                'name': engine.names[i],
+                'aircraft_id': assignment['aircraft_id'],
+                'dep_airport': assignment['departure_airport'],
+                'arr_airport': assignment['arrival_airport']
+            }
+            for i, assignment in enumerate(engine.assignments)
+        ]
+    }
@@ -0,0 +1,96 @@
+# modules/flight_tiles.py
+
+import zlib
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Tile size per level: level 0 splits the world into 4x2 tiles of 90 degrees,
+# each further level halves the tile edge
+TILE_DEGREES = (90.0, 45.0, 22.5, 11.25, 5.625)
+
+# Level-of-detail: most aircraft kept per tile when zoomed out (None = all)
+LOD_TILE_CAPS = (50, 100, 200, 400, None)
+
+# A viewport needing more tiles than this is served from a coarser level
+MAX_VIEWPORT_TILES = 64
+
+
+def tile_level_for_zoom(zoom: float) -> int:
+    """Grid level for a Leaflet zoom level (world view = 0, regional = deepest)"""
+    return int(min(max(zoom - 2, 0), len(TILE_DEGREES) - 1))
+
+
+def tile_grid(level: int) -> Tuple[int, int]:
+    """(columns, rows) of the grid at a level"""
+    degrees = TILE_DEGREES[level]
+    return int(360 / degrees), int(180 / degrees)
+
+
+def tile_key(level: int, x: int, y: int) -> str:
+    """Subscription key for a tile"""
+    return f"tile:{level}:{x}:{y}"
+
+
+def tiles_in_bounds(south: float, west: float, north: float, east: float, level: int) -> List[str]:
+    """Keys of every tile at ``level`` intersecting a lat/lon box.
+
+    Leaflet reports longitudes past +/-180 when the map is panned across the
+    antimeridian; those wrap around onto the grid.
+    """
+    degrees = TILE_DEGREES[level]
+    columns, rows = tile_grid(level)
+
+    y0 = min(max(int((south + 90) // degrees), 0), rows - 1)
+    y1 = min(max(int((north + 90) // degrees), 0), rows - 1)
+    if east - west >= 360:
+        xs = range(columns)
+    else:
+        x0 = int((west + 180) // degrees)
+        x1 = int((east + 180) // degrees)
+        xs = sorted({x % columns for x in range(x0, x1 + 1)})
+    return [tile_key(level, x, y) for y in range(y0, y1 + 1) for x in xs]
+
+
+def viewport_tiles(south: float, west: float, north: float, east: float,
+                   zoom: float) -> Tuple[int, List[str]]:
+    """(level, tile keys) covering a viewport, coarsened until it fits MAX_VIEWPORT_TILES"""
+    level = tile_level_for_zoom(zoom)
+    tiles = tiles_in_bounds(south, west, north, east, level)
+    while len(tiles) > MAX_VIEWPORT_TILES and level > 0:
+        level -= 1
+        tiles = tiles_in_bounds(south, west, north, east, level)
+    return level, tiles
+
+
+def lod_priority(ids: List[str]) -> np.ndarray:
+    """Stable per-aircraft ranking so thinning keeps the same aircraft tick after tick"""
+    return np.fromiter((zlib.crc32(str(i).encode('utf-8')) for i in ids),
+                       dtype=np.uint32, count=len(ids))
+
+
+def bucket_by_tile(lat: np.ndarray, lon: np.ndarray, priority: np.ndarray,
+                   level: int) -> Dict[str, np.ndarray]:
+    """Indices of the aircraft in each occupied tile, thinned to the level's LOD cap"""
+    if len(lat) == 0:
+        return {}
+    degrees = TILE_DEGREES[level]
+    columns, rows = tile_grid(level)
+    x = np.clip(np.floor_divide(lon + 180, degrees).astype(np.int64), 0, columns - 1)
+    y = np.clip(np.floor_divide(lat + 90, degrees).astype(np.int64), 0, rows - 1)
+    key = y * columns + x
+
+    # Group by tile, best priority first within each tile
+    order = np.lexsort((priority, key))
+    sorted_key = key[order]
+    starts = np.flatnonzero(np.r_[True, sorted_key[1:] != sorted_key[:-1]])
+    ends = np.r_[starts[1:], len(order)]
+
+    cap = LOD_TILE_CAPS[level]
+    buckets = {}
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        tile = int(sorted_key[start])
+        if cap is not None:
+            end = min(end, start + cap)
+        buckets[tile_key(level, tile % columns, tile // columns)] = order[start:end]
+    return buckets
@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 from core.config_manager import ConfigManager
+from modules.demand_model import DemandModel, SEASONALITY
 
 
 @dataclass
@@ -30,16 +31,16 @@ class ScenarioParameters:
 class ForecastingEngine:
     """Advanced forecasting and optimization engine for airline operations."""
     
-    def __init__(self, airline_id: int):
+    def __init__(self, airline_id: int, demand_model: Optional[DemandModel] = None):
         self.airline_id = airline_id
         self.config_manager = ConfigManager()
+        # Opt-in route demand curves (pass RouteEconomics.demand_model to share its cache);
+        # without one, route forecasts and price sweeps keep the sample figures
+        self.demand_model = demand_model
         
         # Forecasting parameters
         self.base_growth_rate = 0.05  # 5% annual growth
-        self.seasonality_factors = {
-            1: 0.85, 2: 0.80, 3: 0.90, 4: 0.95, 5: 1.05, 6: 1.15,
-            7: 1.20, 8: 1.15, 9: 1.05, 10: 1.00, 11: 0.90, 12: 0.95
-        }
+        self.seasonality_factors = {month: factor for month, factor in enumerate(SEASONALITY, start=1)}
         
         # Load historical data
         self.historical_data = self.load_historical_data()
@@ -150,13 +151,22 @@ class ForecastingEngine:
     
     def generate_demand_forecast(self, route: str, months: int = 6) -> List[Dict]:
         """Generate passenger demand forecast for a specific route."""
-        # Sample implementation - would use route-specific historical data
-        base_demand = 1000  # Monthly passengers
+        weekly_demand = self.demand_model.weekly_demand(route) if self.demand_model else None
+        if weekly_demand is not None:
+            base_demand = weekly_demand * 4.33  # Monthly passengers
+            seasonality = self.demand_model.seasonality(route)
+        else:
+            # Sample figures for routes the demand model does not know
+            base_demand = 1000  # Monthly passengers
+            seasonality = None
         forecasts = []
         
         for month in range(1, months + 1):
             date = datetime.now() + timedelta(days=30 * month)
-            seasonal_factor = self.seasonality_factors[date.month]
+            if seasonality is not None:
+                seasonal_factor = float(seasonality[date.month - 1])
+            else:
+                seasonal_factor = self.seasonality_factors[date.month]
             trend_factor = 1 + (0.03 * month / 12)  # 3% annual growth
             
             forecast_demand = int(base_demand * seasonal_factor * trend_factor)
@@ -181,30 +191,33 @@ class ForecastingEngine:
         
         # Test different price points
         price_tests = np.linspace(current_price * 0.7, current_price * 1.3, 20)
-        best_profit = 0
-        optimal_price = current_price
-        
-        for test_price in price_tests:
-            # Calculate demand response
-            price_change = (test_price - current_price) / current_price
-            demand_change = elasticity * price_change
-            adjusted_demand = base_demand * (1 + demand_change)
-            
-            # Calculate revenue and profit
-            revenue = test_price * max(0, adjusted_demand)
-            costs = adjusted_demand * 150  # Cost per passenger
-            profit = revenue - costs
-            
-            if profit > best_profit:
-                best_profit = profit
-                optimal_price = test_price
+        
+        # Demand response: the route's load factor curve when known, constant elasticity otherwise
+        load_factors = self.demand_model.load_factor(route, price_tests) if self.demand_model else None
+        if load_factors is not None and not np.isnan(load_factors).any():
+            current_load_factor = float(self.demand_model.load_factor(route, current_price))
+            adjusted_demand = base_demand * load_factors / current_load_factor
+        else:
+            adjusted_demand = base_demand * (1 + elasticity * (price_tests - current_price) / current_price)
+        
+        # Calculate revenue and profit
+        revenue = price_tests * np.maximum(0, adjusted_demand)
+        costs = adjusted_demand * 150  # Cost per passenger
+        profits = revenue - costs
+        
+        best = int(np.argmax(profits))
+        if profits[best] > 0:
+            best_profit, optimal_price = float(profits[best]), float(price_tests[best])
+            demand_impact = float(adjusted_demand[best] / base_demand - 1)
+        else:
+            best_profit, optimal_price, demand_impact = 0, current_price, 0.0
         
         return {
             'current_price': current_price,
             'optimal_price': optimal_price,
             'price_change': (optimal_price - current_price) / current_price,
             'expected_profit_increase': (best_profit - (current_price * base_demand - base_demand * 150)),
-            'demand_impact': elasticity * ((optimal_price - current_price) / current_price)
+            'demand_impact': demand_impact
         }
     
     def analyze_fleet_optimization(self) -> Dict:
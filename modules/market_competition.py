@@ -10,6 +10,7 @@ from typing import List, Dict, Optional, Tuple
 from enum import Enum
 import uuid
 
+from modules.demand_model import estimate_weekly_demand
 from modules.route_management import RouteEconomics, RouteData
 from modules.aircraft_marketplace import AircraftMarketplace
 
@@ -123,6 +124,7 @@ class MarketCompetition:
     def __init__(self, db_path: str):
         self.db_path = db_path
         self.route_economics = RouteEconomics(db_path)
+        self.demand_model = self.route_economics.demand_model
         self.aircraft_marketplace = AircraftMarketplace(db_path)
         self.init_database()
         self.load_competitor_templates()
@@ -682,32 +684,10 @@ class MarketCompetition:
     
     def _estimate_route_demand(self, route: RouteData) -> int:
         """Estimate weekly passenger demand for a route"""
-        # Base demand calculation (simplified)
-        base_demand = 2000  # Base weekly passengers
-        
-        # Distance modifier
-        if route.distance_nm < 500:
-            distance_modifier = 1.5  # High demand for short routes
-        elif route.distance_nm < 1500:
-            distance_modifier = 1.2
-        elif route.distance_nm < 3000:
-            distance_modifier = 1.0
-        else:
-            distance_modifier = 0.8  # Lower demand for very long routes
-        
-        # Demand level modifier
-        demand_modifiers = {
-            "very_low": 0.3,
-            "low": 0.5,
-            "medium": 0.7,
-            "high": 1.0,
-            "very_high": 1.4
-        }
-        
-        demand_modifier = demand_modifiers.get(route.base_demand.value, 0.7)
-        
-        total_demand = int(base_demand * distance_modifier * demand_modifier)
-        return total_demand
+        weekly_demand = self.demand_model.weekly_demand(route.id)
+        if weekly_demand is None:  # Not saved yet
+            weekly_demand = estimate_weekly_demand(route.distance_nm, route.base_demand.value)
+        return weekly_demand
     
     def save_route_competition(self, competition: RouteCompetition):
         """Save route competition data to database"""
@@ -0,0 +1,165 @@
+# modules/market_maker.py
+
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+import numpy as np
+
+from modules.aircraft_marketplace import AircraftMarketplace, MARKET_AIRCRAFT_COLUMNS
+
+DAILY_LISTINGS = 1.0  # Mean new listings per simulated day (Poisson)
+# Unsold listings are marked down as they near expiry: (days left, price multiplier)
+REPRICE_STEPS = ((30, 0.95), (10, 0.92))
+
+# Numeric suffix of a listing id (MODEL_12345 -> 12345)
+LISTING_SERIAL = "CAST(substr(id, length(rtrim(id, '0123456789')) + 1) AS INTEGER)"
+ID_LOOKUP_CHUNK = 500  # Ids per IN (...) lookup, well under SQLite's bound-parameter limit
+
+
+class MarketMaker:
+    """Day-by-day marketplace churn: expiries, markdowns and new listings.
+
+    advance() moves the market to a simulated date. Expired listings are
+    deleted through the available_until index, unsold listings are marked
+    down as they cross each REPRICE_STEPS threshold and a Poisson number of
+    new listings arrives per elapsed day, all in one transaction whose cost
+    follows the number of changes rather than the size of the market. The
+    returned delta lists what changed, so clients can patch their view
+    instead of re-fetching it.
+    """
+
+    def __init__(self, marketplace: AircraftMarketplace, daily_listings: float = DAILY_LISTINGS, seed=None):
+        self.marketplace = marketplace
+        self.daily_listings = daily_listings
+        self.rng = np.random.default_rng(seed)
+        self.market_date: Optional[datetime] = None
+        self._next_serial: Optional[int] = None
+        self._lock = threading.Lock()
+        self.days = 0
+        self.listed = 0
+        self.expired = 0
+        self.repriced = 0
+
+    def advance(self, now: datetime) -> Optional[Dict]:
+        """Churn the market up to ``now``, one step per whole simulated day since the last call.
+
+        The first call only sweeps out listings that expired in the meantime.
+        Returns {'date', 'added', 'removed', 'repriced'} - new MarketAircraft,
+        removed listing ids and {'id', 'price', 'lease_rate'} markdowns - or
+        None when nothing changed.
+        """
+        with self._lock:
+            previous = self.market_date
+            days = 0
+            if previous is not None:
+                days = (now - previous).days
+                if days < 1:
+                    return None
+                now = previous + timedelta(days=days)
+
+            # Drawn before the write transaction, which holds the database once it grows
+            rows = self._draw_listings(int(self.rng.poisson(self.daily_listings * days)), now)
+            conn = sqlite3.connect(self.marketplace.db_path)
+            try:
+                cursor = conn.cursor()
+                cursor.execute("BEGIN IMMEDIATE")
+                removed = self._expire(cursor, now)
+                repriced = self._reprice(cursor, previous, now) if previous is not None else {}
+                added = self._list(cursor, rows)
+                conn.commit()
+            finally:
+                conn.close()
+
+            self.market_date = now
+            self.days += days
+            self.listed += len(added)
+            self.expired += len(removed)
+            self.repriced += len(repriced)
+            if not (added or removed or repriced):
+                return None
+            return {
+                'date': now.isoformat(),
+                'added': added,
+                'removed': removed,
+                'repriced': list(repriced.values())
+            }
+
+    def _expire(self, cursor: sqlite3.Cursor, now: datetime):
+        until = now.isoformat()
+        removed = [row[0] for row in cursor.execute(
+            "SELECT id FROM market_aircraft WHERE available_until <= ?", (until,))]
+        if removed:
+            cursor.execute("DELETE FROM market_aircraft WHERE available_until <= ?", (until,))
+        return removed
+
+    def _reprice(self, cursor: sqlite3.Cursor, previous: datetime, now: datetime) -> Dict[str, Dict]:
+        """Mark down listings that crossed a REPRICE_STEPS threshold since ``previous``"""
+        repriced = {}
+        for days_left, factor in REPRICE_STEPS:
+            window = ((previous + timedelta(days=days_left)).isoformat(),
+                      (now + timedelta(days=days_left)).isoformat())
+            cursor.execute('''
+                UPDATE market_aircraft
+                SET asking_price = ROUND(asking_price * ?, 2), lease_rate_monthly = lease_rate_monthly * ?
+                WHERE available_until > ? AND available_until <= ?
+            ''', (factor, factor) + window)
+            if not cursor.rowcount:
+                continue
+            for aircraft_id, price, lease_rate in cursor.execute(
+                    "SELECT id, asking_price, lease_rate_monthly FROM market_aircraft "
+                    "WHERE available_until > ? AND available_until <= ?", window):
+                repriced[aircraft_id] = {'id': aircraft_id, 'price': price, 'lease_rate': lease_rate}
+        return repriced
+
+    def _draw_listings(self, count: int, now: datetime):
+        """``count`` new listing rows dated ``now``"""
+        if not count:
+            return []
+        if self._next_serial is None:
+            # Continue after the highest serial in use, listed or owned
+            conn = sqlite3.connect(self.marketplace.db_path)
+            try:
+                self._next_serial = (conn.execute(
+                    f"SELECT MAX(serial) FROM (SELECT {LISTING_SERIAL} AS serial FROM market_aircraft "
+                    f"UNION ALL SELECT {LISTING_SERIAL} FROM owned_aircraft)").fetchone()[0] or 0) + 1
+            finally:
+                conn.close()
+
+        rows = [row for batch in self.marketplace.generate_listing_batches(
+                    count, self.rng, now=now, first_serial=self._next_serial)
+                for row in self.marketplace.listing_rows(batch)]
+        self._next_serial += count
+        return rows
+
+    def _list(self, cursor: sqlite3.Cursor, rows):
+        """Insert new listing rows; returns them as MarketAircraft"""
+        if not rows:
+            return []
+        # A regeneration since the serial was read may have used these ids
+        ids = [row[0] for row in rows]
+        taken = set()
+        for start in range(0, len(ids), ID_LOOKUP_CHUNK):
+            chunk = ids[start:start + ID_LOOKUP_CHUNK]
+            taken.update(row[0] for row in cursor.execute(
+                f"SELECT id FROM market_aircraft WHERE id IN ({', '.join('?' * len(chunk))})", chunk))
+        if taken:
+            rows = [row for row in rows if row[0] not in taken]
+            self._next_serial = None
+
+        cursor.executemany(
+            f"INSERT INTO market_aircraft ({', '.join(MARKET_AIRCRAFT_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(MARKET_AIRCRAFT_COLUMNS))})", rows)
+        return [self.marketplace._row_to_market_aircraft(row) for row in rows]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'market_date': self.market_date.isoformat() if self.market_date else None,
+                'daily_listings': self.daily_listings,
+                'days': self.days,
+                'listed': self.listed,
+                'expired': self.expired,
+                'repriced': self.repriced
+            }
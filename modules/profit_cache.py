@@ -0,0 +1,93 @@
+# modules/profit_cache.py
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+# Aircraft spec fields the P&L reads; other spec data (names, images...) doesn't affect it
+SPEC_KEY_FIELDS = ('passenger_capacity', 'cruise_speed', 'fuel_burn_per_hour', 'crew_required', 'base_price')
+
+
+def profitability_key(route_id: str, aircraft_spec: Dict, frequency_weekly, fare_economy,
+                      fare_business=None, business_ratio=0.15, month=None) -> tuple:
+    """Hashable key over the inputs of RouteEconomics.calculate_route_profitability"""
+    return (route_id, tuple(aircraft_spec.get(field) for field in SPEC_KEY_FIELDS),
+            frequency_weekly, fare_economy, fare_business, business_ratio, month)
+
+
+class ProfitabilityCache:
+    """LRU/TTL memo of route P&L results.
+
+    Every lookup passes the caller's current route-data stamp; when it differs
+    from the stamp the entries were stored under, the cache is emptied first,
+    so results never outlive the route, airport and demand rows they were
+    computed from. Entries also expire after ``ttl_seconds`` and the least
+    recently used ones are evicted beyond ``max_entries``. Results are copied
+    in and out, so callers may modify what they get back.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()  # key -> (expires, result)
+        self._stamp = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, stamp) -> Optional[Dict]:
+        """Cached result for ``key`` under route-data ``stamp``, None on a miss"""
+        with self._lock:
+            self._check_stamp(stamp)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def put(self, key: Hashable, stamp, result: Dict):
+        with self._lock:
+            self._check_stamp(stamp)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _check_stamp(self, stamp):
+        if stamp != self._stamp:
+            if self._entries:
+                self._entries.clear()
+                self.invalidations += 1
+            self._stamp = stamp
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
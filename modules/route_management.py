@@ -2,12 +2,28 @@
 
 import sqlite3
 import json
-import math
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
 from enum import Enum
 import random
+import threading
+
+import numpy as np
+
+from modules.airport_table import AirportTable
+from modules.demand_model import (
+    DemandModel, DEMAND_LEVEL_MULTIPLIERS, SEASONALITY, demand_factor, price_impact, expected_load_factor
+)
+from modules.distance_matrix import DistanceMatrix, haversine_nm
+from modules.profit_cache import ProfitabilityCache, profitability_key
+from modules.schema_versions import applied_version, record_version
+
+from modules.fleet_optimizer import FleetOptimizer
+
+# Bump these to re-run table creation / airport seeding on existing databases
+SCHEMA_VERSION = 1
+AIRPORT_SEED_VERSION = 1
 
 class RouteType(Enum):
     DOMESTIC = "domestic"
@@ -21,6 +37,41 @@ class DemandLevel(Enum):
     HIGH = "high"
     VERY_HIGH = "very_high"
 
+# Share of the base load factor each demand level fills (see modules/demand_model.py)
+DEMAND_MULTIPLIERS = {level: DEMAND_LEVEL_MULTIPLIERS[level.value] for level in DemandLevel}
+
+# Route classes by distance band, as used by route generation:
+# (route type, demand levels drawn from, competition range, base fare, fare per nm)
+ROUTE_CLASS_BOUNDS = (500, 1500)  # nm; shorter is regional, longer international
+ROUTE_CLASSES = (
+    (RouteType.REGIONAL, (DemandLevel.MEDIUM, DemandLevel.HIGH), (3, 8), 120, 0.15),
+    (RouteType.DOMESTIC, (DemandLevel.MEDIUM, DemandLevel.HIGH, DemandLevel.VERY_HIGH), (2, 6), 180, 0.12),
+    (RouteType.INTERNATIONAL, (DemandLevel.LOW, DemandLevel.MEDIUM, DemandLevel.HIGH), (1, 4), 350, 0.08),
+)
+ROUTE_TYPES = tuple(route_class[0] for route_class in ROUTE_CLASSES)
+DEMAND_LEVELS = tuple(DemandLevel)
+
+ROUTE_INSERT = '''
+    INSERT OR REPLACE INTO routes
+    (id, departure_airport, arrival_airport, distance_nm, demand_passengers,
+     demand_cargo, competition_level, base_ticket_price, created_date)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+ROUTE_EXTENDED_INSERT = '''
+    INSERT OR REPLACE INTO route_extended_data
+    (route_id, route_type, base_demand, seasonal_factor, historical_load_factor, market_fare_business)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+DEFAULT_PASSENGER_DEMAND = 200
+DEFAULT_CARGO_DEMAND = 5.0
+
+# Array inputs of RouteEconomics.profitability_arrays, in column order
+PROFITABILITY_INPUTS = (
+    'distance_nm', 'competition', 'market_fare', 'demand_multiplier', 'airport_fees', 'season',
+    'capacity', 'cruise_speed', 'fuel_burn', 'crew_required', 'base_price', 'has_price', 'frequency',
+    'fare_economy', 'fare_business', 'split_cabin', 'business_ratio'
+)
+
 @dataclass
 class Airport:
     """Airport data structure"""
@@ -86,14 +137,90 @@ class RouteEconomics:
     
     def __init__(self, db_path: str):
         self.db_path = db_path
+        self._airport_table: Optional[AirportTable] = None
+        self._distance_matrix: Optional[DistanceMatrix] = None
+        self._distance_source: Optional[AirportTable] = None
+        self._airport_data_version = None
+        self._version_conn: Optional[sqlite3.Connection] = None
+        self._airport_lock = threading.Lock()
         self.init_database()
-        self.load_airport_data()
+        self.demand_model = DemandModel(db_path)
+        # P&L results by inputs, dropped whenever the database changes
+        self.profitability_cache = ProfitabilityCache()
+    
+    @property
+    def airports(self) -> AirportTable:
+        """In-memory airport table, reloaded after a reload_airports() call or any database commit"""
+        with self._airport_lock:
+            data_version = self._read_data_version()
+            if self._airport_table is None or data_version is None or data_version != self._airport_data_version:
+                table = AirportTable.load(self.db_path)
+                # Commits to other tables also move data_version; keep the old table
+                # (and the distance matrix built from it) when no airport changed
+                if self._airport_table is None or table.records != self._airport_table.records:
+                    self._airport_table = table
+                self._airport_data_version = data_version
+            return self._airport_table
+    
+    @property
+    def distances(self) -> DistanceMatrix:
+        """All-pairs distance/bearing matrix for the current airport table"""
+        airports = self.airports
+        with self._airport_lock:
+            if self._distance_matrix is None or self._distance_source is not airports:
+                self._distance_matrix = DistanceMatrix.from_table(airports)
+                self._distance_source = airports
+            return self._distance_matrix
+    
+    def reload_airports(self):
+        """Drop the cached airport table; the next access reads it again"""
+        with self._airport_lock:
+            self._airport_table = None
+        self.profitability_cache.clear()
+    
+    def route_data_stamp(self):
+        """Stamp that changes with every commit to the database, None if unreadable"""
+        with self._airport_lock:
+            return self._read_data_version()
+    
+    def _read_data_version(self):
+        # PRAGMA data_version changes whenever another connection commits to the database
+        try:
+            if self._version_conn is None:
+                self._version_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            return self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"Error checking airport data version: {e}")
+            self._version_conn = None
+            return None
         
     def init_database(self):
-        """Initialize route management database tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Create tables and seed airports once per schema/seed version.
         
+        On an up-to-date database this is a single read, so constructing
+        RouteEconomics never takes the write lock or touches airport rows.
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            if (applied_version(conn, 'route_management.schema') >= SCHEMA_VERSION and
+                    applied_version(conn, 'route_management.airport_seed') >= AIRPORT_SEED_VERSION):
+                return
+            
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            # Re-check under the write lock in case another process got here first
+            if applied_version(conn, 'route_management.schema') < SCHEMA_VERSION:
+                self.create_tables(cursor)
+                record_version(cursor, 'route_management.schema', SCHEMA_VERSION)
+            if applied_version(conn, 'route_management.airport_seed') < AIRPORT_SEED_VERSION:
+                self.load_airport_data(cursor)
+                record_version(cursor, 'route_management.airport_seed', AIRPORT_SEED_VERSION)
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def create_tables(self, cursor: sqlite3.Cursor):
+        """Route management tables (idempotent)"""
         # Airports table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS airports (
@@ -166,11 +293,8 @@ class RouteEconomics:
             )
         ''')
         
-        conn.commit()
-        conn.close()
-        
-    def load_airport_data(self):
-        """Load major airport data into the database"""
+    def load_airport_data(self, cursor: sqlite3.Cursor):
+        """Seed the major airports, keeping any airport rows that already exist"""
         major_airports = [
             # US Major Hubs
             Airport("KJFK", "JFK", "John F Kennedy Intl", "New York", "USA", 40.6398, -73.7789, 13, 14511, "mega", 850, 45),
@@ -198,135 +322,147 @@ class RouteEconomics:
             Airport("KSFO", "SFO", "San Francisco Intl", "San Francisco", "USA", 37.6213, -122.3790, 13, 11870, "large", 680, 38),
         ]
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Clear existing airports
-        cursor.execute("DELETE FROM airports")
-        
-        for airport in major_airports:
-            cursor.execute('''
-                INSERT INTO airports VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                airport.icao, airport.iata, airport.name, airport.city, airport.country,
-                airport.latitude, airport.longitude, airport.elevation, airport.runway_length,
-                airport.hub_size, airport.landing_fee_base, airport.gate_cost_per_hour
-            ))
-        
-        conn.commit()
-        conn.close()
+        cursor.executemany('''
+            INSERT OR IGNORE INTO airports VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [(
+            airport.icao, airport.iata, airport.name, airport.city, airport.country,
+            airport.latitude, airport.longitude, airport.elevation, airport.runway_length,
+            airport.hub_size, airport.landing_fee_base, airport.gate_cost_per_hour
+        ) for airport in major_airports])
     
     def calculate_distance(self, origin_icao: str, dest_icao: str) -> int:
         """Calculate great circle distance between two airports in nautical miles"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT latitude, longitude FROM airports WHERE icao = ?", (origin_icao,))
-        origin = cursor.fetchone()
-        cursor.execute("SELECT latitude, longitude FROM airports WHERE icao = ?", (dest_icao,))
-        dest = cursor.fetchone()
-        
-        conn.close()
-        
-        if not origin or not dest:
-            return 0
-        
-        # Haversine formula
-        lat1, lon1 = math.radians(origin[0]), math.radians(origin[1])
-        lat2, lon2 = math.radians(dest[0]), math.radians(dest[1])
-        
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        
-        a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-        c = 2 * math.asin(math.sqrt(a))
-        
-        # Earth radius in nautical miles
-        distance_nm = int(3440.065 * c)
-        return distance_nm
+        # Truncated from float64: the float32 distance matrix can sit just under a whole mile
+        return int(self.airports.distance_nm(origin_icao, dest_icao))
     
     def generate_routes(self, airline_hub: str, route_count: int = 50) -> List[RouteData]:
         """Generate realistic routes from airline hub"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT icao FROM airports WHERE icao != ?", (airline_hub,))
-        destinations = [row[0] for row in cursor.fetchall()]
-        conn.close()
-        
-        routes = []
-        for i, dest in enumerate(destinations[:route_count]):
-            distance = self.calculate_distance(airline_hub, dest)
-            
-            # Determine route characteristics based on distance
-            if distance < 500:
-                route_type = RouteType.REGIONAL
-                base_demand = random.choice([DemandLevel.MEDIUM, DemandLevel.HIGH])
-                competition = random.randint(3, 8)
-                base_fare = 120 + distance * 0.15
-            elif distance < 1500:
-                route_type = RouteType.DOMESTIC
-                base_demand = random.choice([DemandLevel.MEDIUM, DemandLevel.HIGH, DemandLevel.VERY_HIGH])
-                competition = random.randint(2, 6)
-                base_fare = 180 + distance * 0.12
-            else:
-                route_type = RouteType.INTERNATIONAL
-                base_demand = random.choice([DemandLevel.LOW, DemandLevel.MEDIUM, DemandLevel.HIGH])
-                competition = random.randint(1, 4)
-                base_fare = 350 + distance * 0.08
-            
-            route_id = f"{airline_hub}_{dest}_{i+1}"
-            
-            route = RouteData(
-                id=route_id,
-                origin_icao=airline_hub,
-                destination_icao=dest,
-                distance_nm=distance,
-                route_type=route_type,
-                base_demand=base_demand,
-                competition_level=competition,
-                seasonal_factor=random.uniform(0.8, 1.2),
-                historical_load_factor=random.uniform(0.65, 0.85),
-                market_fare_economy=base_fare,
-                market_fare_business=base_fare * 3.5,
-                created_date=datetime.now()
+        batch = self.generate_route_batch([airline_hub], route_count)
+        created_date = datetime.now()
+        return [
+            RouteData(
+                id=route_id, origin_icao=origin, destination_icao=dest, distance_nm=distance,
+                route_type=ROUTE_TYPES[route_type], base_demand=DEMAND_LEVELS[demand],
+                competition_level=competition, seasonal_factor=seasonal,
+                historical_load_factor=load_factor, market_fare_economy=fare_economy,
+                market_fare_business=fare_business, created_date=created_date
             )
-            routes.append(route)
+            for (route_id, origin, dest, distance, route_type, demand, competition, seasonal,
+                 load_factor, fare_economy, fare_business) in zip(*self._batch_columns(batch))
+        ]
+    
+    def generate_route_batch(self, hubs: Optional[List[str]] = None, routes_per_hub: Optional[int] = None,
+                             seed: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Routes from each hub (default: every airport) to the other airports, as NumPy columns.
+        
+        Candidates are every hub/airport pair of the airport table; their
+        distances (float64, truncated to whole miles like calculate_distance)
+        are classified, priced and given demand in one vectorized pass. ``route_type`` and
+        ``base_demand`` are indexes into ROUTE_TYPES / DEMAND_LEVELS. Pass
+        the result to save_route_batch, or see generate_routes for RouteData.
+        """
+        rng = np.random.default_rng(seed)
+        airports = self.airports
+        n = len(airports)
+        if hubs is None:
+            hub_rows = np.arange(n)
+        else:
+            hub_rows = np.array([airports.index_of(hub) for hub in hubs if hub in airports], dtype=np.int64)
+        
+        # Every other airport per hub, in airport order; rank numbers a hub's routes from 0
+        origin = np.repeat(hub_rows, n)
+        dest = np.tile(np.arange(n), len(hub_rows))
+        candidates = origin != dest
+        origin, dest = origin[candidates], dest[candidates]
+        rank = np.tile(np.arange(max(n - 1, 0)), len(hub_rows))
+        if routes_per_hub is not None:
+            keep = rank < routes_per_hub
+            origin, dest, rank = origin[keep], dest[keep], rank[keep]
+        count = len(origin)
+        
+        distance = haversine_nm(airports.lat_rad[origin], airports.lon_rad[origin], airports.cos_lat[origin],
+                                airports.lat_rad[dest], airports.lon_rad[dest], airports.cos_lat[dest]).astype(np.int64)
+        route_class = np.searchsorted(ROUTE_CLASS_BOUNDS, distance, side='right')
+        
+        demand_choices = np.zeros((len(ROUTE_CLASSES), max(len(c[1]) for c in ROUTE_CLASSES)), dtype=np.int64)
+        for k, (_, levels, _, _, _) in enumerate(ROUTE_CLASSES):
+            demand_choices[k, :len(levels)] = [DEMAND_LEVELS.index(level) for level in levels]
+        choice_counts = np.array([len(c[1]) for c in ROUTE_CLASSES])
+        competition_low = np.array([c[2][0] for c in ROUTE_CLASSES])
+        competition_high = np.array([c[2][1] for c in ROUTE_CLASSES])
+        base_fare = np.array([c[3] for c in ROUTE_CLASSES], dtype=np.float64)
+        fare_per_nm = np.array([c[4] for c in ROUTE_CLASSES], dtype=np.float64)
+        
+        fare_economy = base_fare[route_class] + distance * fare_per_nm[route_class]
+        codes = np.array(airports.codes, dtype=object)
+        return {
+            'id': [f"{o}_{d}_{r}" for o, d, r in zip(codes[origin], codes[dest], (rank + 1).tolist())],
+            'origin_icao': codes[origin],
+            'destination_icao': codes[dest],
+            'distance_nm': distance,
+            'route_type': route_class,
+            'base_demand': demand_choices[route_class, rng.integers(0, choice_counts[route_class])],
+            'competition_level': rng.integers(competition_low[route_class], competition_high[route_class] + 1),
+            'seasonal_factor': rng.uniform(0.8, 1.2, count),
+            'historical_load_factor': rng.uniform(0.65, 0.85, count),
+            'market_fare_economy': fare_economy,
+            'market_fare_business': fare_economy * 3.5
+        }
+    
+    @staticmethod
+    def _batch_columns(batch: Dict[str, np.ndarray]):
+        """Batch columns as plain Python lists (SQLite does not bind NumPy scalars)"""
+        return [
+            column if isinstance(column, list) else column.tolist()
+            for column in (batch['id'], batch['origin_icao'], batch['destination_icao'], batch['distance_nm'],
+                           batch['route_type'], batch['base_demand'], batch['competition_level'],
+                           batch['seasonal_factor'], batch['historical_load_factor'],
+                           batch['market_fare_economy'], batch['market_fare_business'])
+        ]
+    
+    def save_route_batch(self, batch: Dict[str, np.ndarray], created_date: Optional[datetime] = None) -> int:
+        """Persist a generate_route_batch result in one transaction; returns the number of routes"""
+        (ids, origins, dests, distance, route_type, demand, competition, seasonal,
+         load_factor, fare_economy, fare_business) = self._batch_columns(batch)
+        created = (created_date or datetime.now()).isoformat()
+        type_values = [t.value for t in ROUTE_TYPES]
+        demand_values = [d.value for d in DEMAND_LEVELS]
         
-        return routes
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                conn.executemany(ROUTE_INSERT, (
+                    (route_id, origin, dest, nm, DEFAULT_PASSENGER_DEMAND, DEFAULT_CARGO_DEMAND, level, fare, created)
+                    for route_id, origin, dest, nm, level, fare in zip(ids, origins, dests, distance, competition, fare_economy)
+                ))
+                conn.executemany(ROUTE_EXTENDED_INSERT, (
+                    (route_id, type_values[t], demand_values[d], season, load, business)
+                    for route_id, t, d, season, load, business in zip(ids, route_type, demand, seasonal, load_factor, fare_business)
+                ))
+        finally:
+            conn.close()
+        return len(ids)
     
     def save_routes(self, routes: List[RouteData]):
         """Save routes to database using existing schema"""
         conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        for route in routes:
-            # Insert into main routes table (existing schema)
-            cursor.execute('''
-                INSERT OR REPLACE INTO routes 
-                (id, departure_airport, arrival_airport, distance_nm, demand_passengers, 
-                 demand_cargo, competition_level, base_ticket_price, created_date)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                route.id, route.origin_icao, route.destination_icao, route.distance_nm,
-                200,  # default passenger demand
-                5.0,  # default cargo demand
-                route.competition_level, route.market_fare_economy,
-                route.created_date.isoformat()
-            ))
-            
-            # Insert extended data
-            cursor.execute('''
-                INSERT OR REPLACE INTO route_extended_data 
-                (route_id, route_type, base_demand, seasonal_factor, historical_load_factor, market_fare_business)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                route.id, route.route_type.value, route.base_demand.value,
-                route.seasonal_factor, route.historical_load_factor, route.market_fare_business
-            ))
-        
-        conn.commit()
-        conn.close()
+        try:
+            with conn:
+                # Insert into main routes table (existing schema)
+                conn.executemany(ROUTE_INSERT, (
+                    (route.id, route.origin_icao, route.destination_icao, route.distance_nm,
+                     DEFAULT_PASSENGER_DEMAND, DEFAULT_CARGO_DEMAND,
+                     route.competition_level, route.market_fare_economy, route.created_date.isoformat())
+                    for route in routes
+                ))
+                # Insert extended data
+                conn.executemany(ROUTE_EXTENDED_INSERT, (
+                    (route.id, route.route_type.value, route.base_demand.value,
+                     route.seasonal_factor, route.historical_load_factor, route.market_fare_business)
+                    for route in routes
+                ))
+        finally:
+            conn.close()
     
     def get_routes(self, origin_icao: str = None) -> List[RouteData]:
         """Get routes, optionally filtered by origin"""
@@ -375,62 +511,23 @@ class RouteEconomics:
     
     def calculate_route_revenue(self, route_id: str, aircraft_capacity: int, 
                               frequency_weekly: int, fare_economy: float, 
-                              fare_business: float = None, business_ratio: float = 0.15) -> Dict:
-        """Calculate potential revenue for a route"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Get route data with extended info
-        cursor.execute('''
-            SELECT r.id, r.departure_airport, r.arrival_airport, r.distance_nm, 
-                   r.competition_level, r.base_ticket_price, r.created_date,
-                   e.route_type, e.base_demand, e.seasonal_factor, 
-                   e.historical_load_factor, e.market_fare_business
-            FROM routes r
-            LEFT JOIN route_extended_data e ON r.id = e.route_id
-            WHERE r.id = ?
-        ''', (route_id,))
-        route_data = cursor.fetchone()
-        conn.close()
-        
-        if not route_data:
+                              fare_business: float = None, business_ratio: float = 0.15,
+                              month: Optional[int] = None) -> Dict:
+        """Calculate potential revenue for a route (in a given month 1-12, or on average)"""
+        curves = self.demand_model.curves
+        row = curves.index.get(route_id)
+        if row is None:
             return {"error": "Route not found"}
         
-        # Route characteristics with defaults for missing extended data
-        try:
-            base_demand = DemandLevel(route_data[8]) if route_data[8] else DemandLevel.MEDIUM
-        except (ValueError, TypeError):
-            base_demand = DemandLevel.MEDIUM
-        competition = route_data[4]
-        market_fare = route_data[5]
-        
-        # Demand multipliers
-        demand_multipliers = {
-            DemandLevel.VERY_LOW: 0.3,
-            DemandLevel.LOW: 0.5,
-            DemandLevel.MEDIUM: 0.7,
-            DemandLevel.HIGH: 0.85,
-            DemandLevel.VERY_HIGH: 1.0
-        }
-        
-        # Competition impact on load factor
-        competition_impact = max(0.4, 1.0 - (competition * 0.08))
-        
-        # Price sensitivity (lower fares = higher load factor)
-        price_sensitivity = market_fare / fare_economy if fare_economy > 0 else 1.0
-        price_impact = min(1.2, max(0.6, price_sensitivity))
-        
-        # Calculate expected load factor
-        base_load_factor = 0.75
-        expected_load_factor = (base_load_factor * 
-                              demand_multipliers[base_demand] * 
-                              competition_impact * 
-                              price_impact)
-        expected_load_factor = min(0.95, max(0.30, expected_load_factor))
+        # Demand level x competition, price elasticity and seasonality come from the demand model
+        competition_impact = float(curves.competition_impact[row])
+        price_impact_factor = float(price_impact(curves.market_fare[row], fare_economy))
+        season = 1.0 if month is None else float(curves.season[row, month - 1])
+        load_factor = float(expected_load_factor(curves.demand_factor[row], price_impact_factor, season))
         
         # Calculate passengers
         flights_per_month = frequency_weekly * 4.33
-        passengers_per_flight = aircraft_capacity * expected_load_factor
+        passengers_per_flight = aircraft_capacity * load_factor
         
         if fare_business and business_ratio > 0:
             business_passengers = passengers_per_flight * business_ratio
@@ -441,13 +538,13 @@ class RouteEconomics:
             monthly_revenue = passengers_per_flight * fare_economy * flights_per_month
         
         return {
-            "expected_load_factor": expected_load_factor,
+            "expected_load_factor": load_factor,
             "passengers_per_flight": passengers_per_flight,
             "flights_per_month": flights_per_month,
             "monthly_passengers": passengers_per_flight * flights_per_month,
             "monthly_revenue": monthly_revenue,
             "competition_impact": competition_impact,
-            "price_impact": price_impact
+            "price_impact": price_impact_factor
         }
     
     def calculate_operating_costs(self, route_id: str, aircraft_spec: Dict, 
@@ -458,13 +555,12 @@ class RouteEconomics:
         
         cursor.execute("SELECT distance_nm, departure_airport, arrival_airport FROM routes WHERE id = ?", (route_id,))
         route_data = cursor.fetchone()
-        
-        cursor.execute("SELECT landing_fee_base, gate_cost_per_hour FROM airports WHERE icao IN (?, ?)", 
-                      (route_data[1], route_data[2]))
-        airport_costs = cursor.fetchall()
         conn.close()
         
-        if not route_data or len(airport_costs) < 2:
+        airports = self.airports
+        origin = airports.get(route_data[1]) if route_data else None
+        dest = airports.get(route_data[2]) if route_data else None
+        if origin is None or dest is None:
             return {"error": "Route or airport data not found"}
         
         distance_nm = route_data[0]
@@ -484,10 +580,10 @@ class RouteEconomics:
         crew_cost_per_flight = flight_time_hours * crew_cost_per_hour * crew_required
         
         # Airport fees
-        origin_landing_fee = airport_costs[0][0]
-        dest_landing_fee = airport_costs[1][0] if len(airport_costs) > 1 else airport_costs[0][0]
-        origin_gate_cost = airport_costs[0][1] * 2  # 2 hours gate time
-        dest_gate_cost = airport_costs[1][1] * 2 if len(airport_costs) > 1 else airport_costs[0][1] * 2
+        origin_landing_fee = origin.landing_fee_base
+        dest_landing_fee = dest.landing_fee_base
+        origin_gate_cost = origin.gate_cost_per_hour * 2  # 2 hours gate time
+        dest_gate_cost = dest.gate_cost_per_hour * 2
         
         airport_fees_per_flight = origin_landing_fee + dest_landing_fee + origin_gate_cost + dest_gate_cost
         
@@ -521,13 +617,32 @@ class RouteEconomics:
     
     def calculate_route_profitability(self, route_id: str, aircraft_spec: Dict, 
                                     frequency_weekly: int, fare_economy: float, 
-                                    fare_business: float = None, business_ratio: float = 0.15) -> Dict:
-        """Calculate complete P&L analysis for a route"""
-        
+                                    fare_business: float = None, business_ratio: float = 0.15,
+                                    month: Optional[int] = None) -> Dict:
+        """Calculate complete P&L analysis for a route (memoized, see profitability_cache)"""
+        stamp = self.route_data_stamp()
+        key = profitability_key(route_id, aircraft_spec, frequency_weekly, fare_economy,
+                                fare_business, business_ratio, month)
+        if stamp is not None:
+            cached = self.profitability_cache.get(key, stamp)
+            if cached is not None:
+                return cached
+        
+        result = self._calculate_route_profitability(
+            route_id, aircraft_spec, frequency_weekly, fare_economy, fare_business, business_ratio, month
+        )
+        if stamp is not None and "error" not in result:
+            self.profitability_cache.put(key, stamp, result)
+        return result
+    
+    def _calculate_route_profitability(self, route_id: str, aircraft_spec: Dict,
+                                       frequency_weekly: int, fare_economy: float,
+                                       fare_business: float = None, business_ratio: float = 0.15,
+                                       month: Optional[int] = None) -> Dict:
         # Get revenue calculation
         revenue_data = self.calculate_route_revenue(
             route_id, aircraft_spec.get('passenger_capacity', 180), 
-            frequency_weekly, fare_economy, fare_business, business_ratio
+            frequency_weekly, fare_economy, fare_business, business_ratio, month
         )
         
         if "error" in revenue_data:
@@ -578,6 +693,297 @@ class RouteEconomics:
             }
         }
     
+    def calculate_route_profitability_batch(self, requests: List[Dict]) -> List[Dict]:
+        """Calculate P&L for many route/aircraft configurations at once.
+
+        Each request holds ``route_id``, ``aircraft_spec``, ``frequency_weekly``,
+        ``fare_economy`` and optionally ``fare_business`` / ``business_ratio`` /
+        ``month``, i.e. the arguments of calculate_route_profitability. Route, extended
+        and airport rows are read in one query and the maths runs on arrays;
+        results come back in request order with the same structure (or an
+        ``error`` dict) as calculate_route_profitability. Results already in
+        profitability_cache are not recomputed.
+        """
+        if not requests:
+            return []
+        
+        results: List[Optional[Dict]] = [None] * len(requests)
+        stamp = self.route_data_stamp()
+        keys = [
+            profitability_key(req['route_id'], req['aircraft_spec'], req['frequency_weekly'], req['fare_economy'],
+                              req.get('fare_business'), req.get('business_ratio', 0.15), req.get('month'))
+            for req in requests
+        ]
+        pending = list(range(len(requests)))
+        if stamp is not None:
+            for i, key in enumerate(keys):
+                results[i] = self.profitability_cache.get(key, stamp)
+            pending = [i for i in pending if results[i] is None]
+            if not pending:
+                return results
+        
+        route_rows = self.load_route_economics_data({requests[i]['route_id'] for i in pending})
+        
+        rows, columns = [], []
+        for i in pending:
+            req = requests[i]
+            route = route_rows.get(req['route_id'])
+            if route is None:
+                results[i] = {"error": "Route not found"}
+                continue
+            if route['airport_fees'] is None:
+                results[i] = {"error": "Route or airport data not found"}
+                continue
+            
+            spec = req['aircraft_spec']
+            fare_business = req.get('fare_business')
+            business_ratio = req.get('business_ratio', 0.15)
+            month = req.get('month')
+            rows.append(i)
+            columns.append((
+                route['distance_nm'], route['competition_level'], route['market_fare_economy'],
+                route['demand_multiplier'], route['airport_fees'],
+                1.0 if month is None else SEASONALITY[month - 1] * route['seasonal_factor'],
+                spec.get('passenger_capacity', 180), spec.get('cruise_speed', 450),
+                spec.get('fuel_burn_per_hour', 800), spec.get('crew_required', 2),
+                spec.get('base_price', 100), spec.get('base_price', 0) > 0,
+                req['frequency_weekly'], req['fare_economy'],
+                fare_business or 0, bool(fare_business and business_ratio > 0), business_ratio
+            ))
+        
+        if not rows:
+            return results
+        
+        arrays = self.profitability_arrays({
+            name: np.array(column, dtype=np.float64) for name, column in zip(PROFITABILITY_INPUTS, zip(*columns))
+        })
+        columns = {name: values.tolist() for name, values in arrays.items()}
+        
+        for j, i in enumerate(rows):
+            if columns['seat_miles'][j] == 0:
+                results[i] = {"error": "Route distance or aircraft capacity is zero"}
+                continue
+            results[i] = {
+                "revenue": {
+                    "monthly_revenue": columns['monthly_revenue'][j],
+                    "revenue_per_passenger": columns['revenue_per_passenger'][j],
+                    "load_factor": columns['load_factor'][j],
+                    "monthly_passengers": columns['monthly_passengers'][j],
+                    "flights_per_month": columns['flights_per_month'][j]
+                },
+                "costs": {
+                    "monthly_total": columns['monthly_costs'][j],
+                    "cost_per_passenger": columns['cost_per_passenger'][j],
+                    "breakdown": {
+                        "fuel": columns['fuel'][j],
+                        "crew": columns['crew'][j],
+                        "airport_fees": columns['airport_fees'][j],
+                        "maintenance": columns['maintenance'][j],
+                        "total": columns['monthly_costs'][j]
+                    }
+                },
+                "profitability": {
+                    "monthly_profit": columns['monthly_profit'][j],
+                    "profit_margin": columns['profit_margin'][j],
+                    "breakeven_load_factor": min(1.0, max(0.0, columns['breakeven'][j])),
+                    "roi_monthly": columns['roi'][j]
+                },
+                "efficiency": {
+                    "cost_per_available_seat_mile": columns['casm'][j],
+                    "revenue_per_available_seat_mile": columns['rasm'][j]
+                }
+            }
+            if stamp is not None:
+                self.profitability_cache.put(keys[i], stamp, results[i])
+        
+        return results
+    
+    @staticmethod
+    def profitability_arrays(inputs: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """The P&L maths of calculate_route_profitability on arrays.
+        
+        ``inputs`` maps every name in PROFITABILITY_INPUTS to an array; they
+        broadcast against each other, so a profit surface over fares,
+        frequencies and aircraft is one call with arrays on separate axes.
+        """
+        (distance_nm, competition, market_fare, demand_multiplier, airport_fees, season, capacity,
+         cruise_speed, fuel_burn, crew_required, base_price, has_price, frequency,
+         fare_economy, fare_business, split_cabin, business_ratio) = (inputs[name] for name in PROFITABILITY_INPUTS)
+        has_price, split_cabin = has_price.astype(bool), split_cabin.astype(bool)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Revenue (see calculate_route_revenue)
+            load_factor = expected_load_factor(demand_factor(demand_multiplier, competition),
+                                               price_impact(market_fare, fare_economy), season)
+            
+            flights_per_month = frequency * 4.33
+            passengers_per_flight = capacity * load_factor
+            monthly_passengers = passengers_per_flight * flights_per_month
+            monthly_revenue = np.where(
+                split_cabin,
+                ((passengers_per_flight * (1 - business_ratio) * fare_economy +
+                  passengers_per_flight * business_ratio * fare_business) * flights_per_month),
+                passengers_per_flight * fare_economy * flights_per_month
+            )
+            
+            # Operating costs (see calculate_operating_costs)
+            flight_time_hours = (distance_nm / cruise_speed) + 0.5
+            fuel = flight_time_hours * fuel_burn * 3.50
+            crew = flight_time_hours * 250 * crew_required
+            maintenance = flight_time_hours * (base_price * 1000000 * 0.02 / 3000)
+            per_flight_total = fuel + crew + airport_fees + maintenance
+            monthly_fuel = fuel * flights_per_month
+            monthly_crew = crew * flights_per_month
+            monthly_airport_fees = airport_fees * flights_per_month
+            monthly_maintenance = maintenance * flights_per_month
+            monthly_costs = per_flight_total * flights_per_month
+            
+            # Profitability
+            monthly_profit = monthly_revenue - monthly_costs
+            carried = monthly_passengers > 0
+            profit_margin = np.where(monthly_revenue > 0, monthly_profit / monthly_revenue * 100, 0)
+            cost_per_passenger = np.where(carried, monthly_costs / monthly_passengers, 0)
+            revenue_per_passenger = np.where(carried, monthly_revenue / monthly_passengers, 0)
+            variable_cost_per_passenger = np.where(carried, (monthly_fuel + monthly_maintenance) / monthly_passengers, 0)
+            breakeven = np.where(
+                revenue_per_passenger > variable_cost_per_passenger,
+                (monthly_crew + monthly_airport_fees) / (revenue_per_passenger * flights_per_month * capacity -
+                                                        variable_cost_per_passenger * flights_per_month * capacity),
+                1.0
+            )
+            roi = np.where(has_price, (monthly_profit / (base_price * 1000000 / 12)) * 100, 0)
+            seat_miles = capacity * flights_per_month * distance_nm
+            casm = monthly_costs / seat_miles
+            rasm = monthly_revenue / seat_miles
+        
+        
+        return {
+            'monthly_revenue': monthly_revenue, 'revenue_per_passenger': revenue_per_passenger,
+            'load_factor': load_factor, 'monthly_passengers': monthly_passengers,
+            'flights_per_month': flights_per_month, 'monthly_costs': monthly_costs,
+            'cost_per_passenger': cost_per_passenger, 'fuel': monthly_fuel, 'crew': monthly_crew,
+            'airport_fees': monthly_airport_fees, 'maintenance': monthly_maintenance,
+            'monthly_profit': monthly_profit, 'profit_margin': profit_margin,
+            'breakeven': breakeven, 'roi': roi, 'casm': casm, 'rasm': rasm, 'seat_miles': seat_miles
+        }
+    
+    def route_profit_surface(self, route_id: str, aircraft_specs: List[Dict], frequencies,
+                             fares_economy, fares_business=None, business_ratio: float = 0.15,
+                             month: Optional[int] = None) -> Dict:
+        """P&L of one route over every aircraft x frequency x economy fare (x business fare).
+        
+        The grid is evaluated in one profitability_arrays pass with each
+        dimension on its own axis. Without ``fares_business`` the business
+        fare follows the economy fare at the route's market ratio and the
+        last axis is dropped (the derived fares are in ``fare_business``).
+        Returns ``{"error": ...}`` or the grid ``shape`` plus full-shape
+        ``monthly_profit`` / ``monthly_revenue`` / ``monthly_costs`` arrays
+        (NaN where the P&L is undefined) and the per-economy-fare
+        ``load_factor``.
+        """
+        route = self.load_route_economics_data([route_id]).get(route_id)
+        if route is None:
+            return {"error": "Route not found"}
+        if route['airport_fees'] is None:
+            return {"error": "Route or airport data not found"}
+        
+        def spec_axis(field, default):
+            return np.array([spec.get(field, default) for spec in aircraft_specs], dtype=np.float64).reshape(-1, 1, 1, 1)
+        
+        frequency = np.asarray(frequencies, dtype=np.float64).reshape(1, -1, 1, 1)
+        fare_economy = np.asarray(fares_economy, dtype=np.float64).reshape(1, 1, -1, 1)
+        if fares_business is None:
+            market_fare = route['market_fare_economy']
+            ratio = route['market_fare_business'] / market_fare if market_fare else 3.5
+            fare_business = fare_economy * ratio
+        else:
+            fare_business = np.asarray(fares_business, dtype=np.float64).reshape(1, 1, 1, -1)
+        
+        season = 1.0 if month is None else SEASONALITY[month - 1] * route['seasonal_factor']
+        arrays = self.profitability_arrays({
+            'distance_nm': np.float64(route['distance_nm']),
+            'competition': np.float64(route['competition_level']),
+            'market_fare': np.float64(route['market_fare_economy']),
+            'demand_multiplier': np.float64(route['demand_multiplier']),
+            'airport_fees': np.float64(route['airport_fees']),
+            'season': np.float64(season),
+            'capacity': spec_axis('passenger_capacity', 180),
+            'cruise_speed': spec_axis('cruise_speed', 450),
+            'fuel_burn': spec_axis('fuel_burn_per_hour', 800),
+            'crew_required': spec_axis('crew_required', 2),
+            'base_price': spec_axis('base_price', 100),
+            'has_price': spec_axis('base_price', 0) > 0,
+            'frequency': frequency,
+            'fare_economy': fare_economy,
+            'fare_business': fare_business,
+            'split_cabin': (fare_business != 0) & (business_ratio > 0),
+            'business_ratio': np.float64(business_ratio)
+        })
+        
+        shape = (len(aircraft_specs), frequency.size, fare_economy.size, fare_business.shape[3])
+        defined = np.broadcast_to(arrays['seat_miles'] != 0, shape)
+        surface = {
+            name: np.where(defined, np.broadcast_to(arrays[name], shape), np.nan)
+            for name in ('monthly_profit', 'monthly_revenue', 'monthly_costs')
+        }
+        if fares_business is None:
+            shape = shape[:3]
+            surface = {name: values[..., 0] for name, values in surface.items()}
+            surface['fare_business'] = fare_business.reshape(-1)
+        surface['shape'] = shape
+        surface['load_factor'] = np.broadcast_to(arrays['load_factor'], (1, 1, fare_economy.size, 1)).reshape(-1)
+        return surface
+    
+    def load_route_economics_data(self, route_ids) -> Dict[str, Dict]:
+        """route_id -> the route, extended and airport fields the P&L maths needs, in one query.
+        
+        ``airport_fees`` is the per-flight landing + gate cost of both
+        airports, or None when an airport is missing.
+        """
+        route_ids = list(route_ids)
+        airports = self.airports
+        routes = {}
+        conn = sqlite3.connect(self.db_path)
+        try:
+            # Stay under SQLite's default host parameter limit
+            for start in range(0, len(route_ids), 900):
+                chunk = route_ids[start:start + 900]
+                cursor = conn.execute(f'''
+                    SELECT r.id, r.distance_nm, r.competition_level, r.base_ticket_price,
+                           e.base_demand, e.market_fare_business, e.seasonal_factor,
+                           r.departure_airport, r.arrival_airport
+                    FROM routes r
+                    LEFT JOIN route_extended_data e ON r.id = e.route_id
+                    WHERE r.id IN ({','.join('?' * len(chunk))})
+                ''', chunk)
+                for (route_id, distance_nm, competition, market_fare, base_demand, market_fare_business,
+                     seasonal_factor, origin_icao, dest_icao) in cursor.fetchall():
+                    try:
+                        demand = DemandLevel(base_demand) if base_demand else DemandLevel.MEDIUM
+                    except (ValueError, TypeError):
+                        demand = DemandLevel.MEDIUM
+                    
+                    origin, dest = airports.get(origin_icao), airports.get(dest_icao)
+                    fees = None
+                    if origin is not None and dest is not None:
+                        # Same summation order as calculate_operating_costs
+                        fees = (origin.landing_fee_base + dest.landing_fee_base +
+                                origin.gate_cost_per_hour * 2 + dest.gate_cost_per_hour * 2)
+                    
+                    routes[route_id] = {
+                        'distance_nm': distance_nm,
+                        'competition_level': competition,
+                        'market_fare_economy': market_fare,
+                        'market_fare_business': market_fare_business if market_fare_business else market_fare * 3.5,
+                        'demand_multiplier': DEMAND_MULTIPLIERS[demand],
+                        'seasonal_factor': seasonal_factor if seasonal_factor else 1.0,
+                        'airport_fees': fees,
+                        'min_runway_length': min(origin.runway_length, dest.runway_length) if fees is not None else 0
+                    }
+        finally:
+            conn.close()
+        return routes
+    
     def get_route_distance(self, route_id: str) -> int:
         """Get distance for a route"""
         conn = sqlite3.connect(self.db_path)
@@ -647,72 +1053,13 @@ class RouteEconomics:
     
     def optimize_aircraft_assignment(self, available_aircraft: List[Dict], 
                                    available_routes: List[str]) -> List[Dict]:
-        """Optimize aircraft assignments to maximize profitability"""
+        """Optimize aircraft assignments to maximize profitability.
         
-        optimization_results = []
-        
-        for aircraft in available_aircraft:
-            aircraft_id = aircraft['id']
-            aircraft_spec = aircraft['spec']
-            best_route = None
-            best_profit = -float('inf')
-            best_config = None
-            
-            for route_id in available_routes:
-                # Try different frequency configurations
-                for frequency in [7, 14, 21]:  # Daily, twice daily, three times daily
-                    # Get route market fare as starting point
-                    conn = sqlite3.connect(self.db_path)
-                    cursor = conn.cursor()
-                    cursor.execute('''
-                        SELECT r.base_ticket_price, e.market_fare_business
-                        FROM routes r
-                        LEFT JOIN route_extended_data e ON r.id = e.route_id
-                        WHERE r.id = ?
-                    ''', (route_id,))
-                    route_fares = cursor.fetchone()
-                    conn.close()
-                    
-                    if not route_fares:
-                        continue
-                    
-                    market_fare_economy = route_fares[0]
-                    market_fare_business = route_fares[1] if route_fares[1] else market_fare_economy * 3.5
-                    
-                    # Try different pricing strategies
-                    for price_factor in [0.85, 0.95, 1.05]:  # 15% below, 5% below, 5% above market
-                        fare_economy = market_fare_economy * price_factor
-                        fare_business = market_fare_business * price_factor
-                        
-                        profitability = self.calculate_route_profitability(
-                            route_id, aircraft_spec, frequency, fare_economy, fare_business
-                        )
-                        
-                        if "error" not in profitability:
-                            monthly_profit = profitability['profitability']['monthly_profit']
-                            
-                            if monthly_profit > best_profit:
-                                best_profit = monthly_profit
-                                best_route = route_id
-                                best_config = {
-                                    'frequency_weekly': frequency,
-                                    'fare_economy': fare_economy,
-                                    'fare_business': fare_business,
-                                    'profitability': profitability
-                                }
-            
-            if best_route and best_config:
-                optimization_results.append({
-                    'aircraft_id': aircraft_id,
-                    'recommended_route': best_route,
-                    'configuration': best_config,
-                    'monthly_profit': best_profit
-                })
-        
-        # Sort by profitability
-        optimization_results.sort(key=lambda x: x['monthly_profit'], reverse=True)
-        
-        return optimization_results
+        Solved fleet-wide by FleetOptimizer, so no two aircraft are sent to
+        the same route; every aircraft with a feasible route gets one.
+        """
+        optimizer = FleetOptimizer(self, available_aircraft, available_routes, min_profit=None)
+        return optimizer.solve()
     
     def get_route_assignments(self, aircraft_id: str = None, route_id: str = None) -> List[RouteAssignment]:
         """Get route assignments with optional filters"""
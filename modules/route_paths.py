@@ -0,0 +1,80 @@
+# modules/route_paths.py
+
+import math
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+PATH_SAMPLES = 15  # Polyline segments per route - same as the frontend route lines
+
+
+def bezier_control_point(lat1, lon1, lat2, lon2) -> Optional[Tuple[float, float]]:
+    """Control point of the curved route path, or None for short straight-line routes"""
+    delta_lat = lat2 - lat1
+    delta_lon = lon2 - lon1
+    distance = math.sqrt(delta_lat * delta_lat + delta_lon * delta_lon)
+    if distance < 5:
+        return None
+    curve_offset = min(distance * 0.15, 15)
+    return ((lat1 + lat2) / 2 + -delta_lon * (curve_offset / distance),
+            (lon1 + lon2) / 2 + delta_lat * (curve_offset / distance))
+
+
+@dataclass(frozen=True)
+class RoutePath:
+    """Static geometry of one directed route"""
+    dep: str
+    arr: str
+    start: Tuple[float, float]
+    end: Tuple[float, float]
+    control: Optional[Tuple[float, float]]  # None = straight line
+    points: np.ndarray  # (PATH_SAMPLES + 1, 2) lat/lon polyline at t = i / PATH_SAMPLES
+
+    @property
+    def straight(self) -> bool:
+        return self.control is None
+
+    def polyline(self) -> List[List[float]]:
+        return self.points.tolist()
+
+
+class RoutePathCache:
+    """Per-route Bezier geometry keyed by (dep, arr), built on first use.
+
+    The control point and drawing polyline only depend on the two airports,
+    so they are computed once per directed route instead of once per aircraft
+    per tick.
+    """
+
+    def __init__(self, airports: Dict[str, Dict], samples: int = PATH_SAMPLES):
+        self.airports = airports
+        self.samples = samples
+        self._paths: Dict[Tuple[str, str], RoutePath] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._paths)
+
+    def get(self, dep: str, arr: str) -> RoutePath:
+        """Path for a directed route (KeyError if an airport is unknown)"""
+        path = self._paths.get((dep, arr))
+        if path is None:
+            path = self._build(dep, arr)
+            with self._lock:
+                self._paths[(dep, arr)] = path
+        return path
+
+    def _build(self, dep: str, arr: str) -> RoutePath:
+        start = (self.airports[dep]['lat'], self.airports[dep]['lon'])
+        end = (self.airports[arr]['lat'], self.airports[arr]['lon'])
+        control = bezier_control_point(*start, *end)
+
+        t = np.linspace(0.0, 1.0, self.samples + 1)[:, None]
+        p0, p2 = np.array(start), np.array(end)
+        if control is None:
+            points = p0 + (p2 - p0) * t
+        else:
+            points = (1 - t) * (1 - t) * p0 + 2 * (1 - t) * t * np.array(control) + t * t * p2
+        return RoutePath(dep, arr, start, end, control, points)
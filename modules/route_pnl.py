@@ -0,0 +1,121 @@
+# modules/route_pnl.py
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+COST_CATEGORIES = ('fuel', 'crew', 'maintenance', 'airport_fees')
+
+
+class RoutePnLView:
+    """Per-assignment monthly P&L, maintained incrementally.
+
+    Each assignment's P&L is cached under its assignment id together with the
+    inputs it was computed from (route, frequency and fares, plus the route
+    and airport data the P&L reads, re-read after any commit). ``sync`` only
+    recomputes assignments whose inputs changed, using one batched
+    RouteEconomics call, and applies the difference to the fleet totals - so
+    an unchanged assignment set costs nothing and an edit costs one row.
+    """
+
+    def __init__(self, route_economics, aircraft_spec: Dict):
+        self.route_economics = route_economics
+        self.aircraft_spec = aircraft_spec
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[Tuple, Optional[Dict]]] = {}  # id -> (inputs, analysis or None)
+        self._version = None
+        self._stamp = None
+        self.recomputed = 0  # Assignments (re)calculated since start, for diagnostics
+        self._reset_totals()
+
+    def _reset_totals(self):
+        self.monthly_revenue = 0.0
+        self.monthly_costs = 0.0
+        self.cost_breakdown = {category: 0.0 for category in COST_CATEGORIES}
+
+    @staticmethod
+    def assignment_key(assignment: Dict) -> str:
+        return str(assignment.get('assignment_id') or f"{assignment['route_id']}_{assignment['aircraft_id']}")
+
+    @staticmethod
+    def _inputs(assignment: Dict, route: Optional[Dict]) -> Tuple:
+        return (assignment['route_id'], assignment['frequency_weekly'],
+                assignment['fare_economy'], assignment['fare_business'],
+                tuple(sorted(route.items())) if route else None)
+
+    def invalidate(self):
+        """Recompute every assignment on the next sync"""
+        with self._lock:
+            self._entries = {}
+            self._version = None
+            self._stamp = None
+            self._reset_totals()
+
+    def sync(self, assignments: List[Dict], version: Optional[int] = None):
+        """Bring the view up to date with an assignment list.
+
+        With a ``version`` (see AssignmentRegistry.version) an unchanged set
+        returns immediately unless the database changed since (e.g. a route's
+        distance or an airport's fees were edited); otherwise inputs are
+        compared per assignment.
+        """
+        with self._lock:
+            stamp = self.route_economics.route_data_stamp()
+            if version is not None and version == self._version and stamp is not None and stamp == self._stamp:
+                return
+            current = {self.assignment_key(a): a for a in assignments}
+            routes = self.route_economics.load_route_economics_data({a['route_id'] for a in current.values()})
+            inputs = {key: self._inputs(a, routes.get(a['route_id'])) for key, a in current.items()}
+
+            for key in self._entries.keys() - current.keys():
+                self._apply(self._entries.pop(key)[1], -1)
+
+            changed = [
+                (key, assignment) for key, assignment in current.items()
+                if key not in self._entries or self._entries[key][0] != inputs[key]
+            ]
+            analyses = self.route_economics.calculate_route_profitability_batch([
+                {
+                    'route_id': assignment['route_id'],
+                    'aircraft_spec': self.aircraft_spec,
+                    'frequency_weekly': assignment['frequency_weekly'],
+                    'fare_economy': assignment['fare_economy'],
+                    'fare_business': assignment['fare_business']
+                }
+                for _, assignment in changed
+            ])
+            for (key, assignment), analysis in zip(changed, analyses):
+                if 'error' in analysis:
+                    print(f"Route analysis error for {assignment['route_id']}: {analysis['error']}")
+                    analysis = None
+                if key in self._entries:
+                    self._apply(self._entries[key][1], -1)
+                self._entries[key] = (inputs[key], analysis)
+                self._apply(analysis, 1)
+
+            self.recomputed += len(changed)
+            if not self._entries:
+                self._reset_totals()  # Drop accumulated rounding once nothing is left
+            self._version = version
+            self._stamp = stamp
+
+    def _apply(self, analysis: Optional[Dict], sign: int):
+        if analysis is None:
+            return
+        self.monthly_revenue += sign * analysis['revenue']['monthly_revenue']
+        self.monthly_costs += sign * analysis['costs']['monthly_total']
+        breakdown = analysis['costs']['breakdown']
+        for category in COST_CATEGORIES:
+            self.cost_breakdown[category] += sign * breakdown[category]
+
+    def get(self, assignment: Dict) -> Optional[Dict]:
+        """Cached analysis for an assignment (None if unknown or not computable)"""
+        entry = self._entries.get(self.assignment_key(assignment))
+        return entry[1] if entry else None
+
+    def totals(self) -> Dict:
+        with self._lock:
+            return {
+                'monthly_revenue': self.monthly_revenue,
+                'monthly_costs': self.monthly_costs,
+                'cost_breakdown': dict(self.cost_breakdown)
+            }
@@ -0,0 +1,26 @@
+# modules/schema_versions.py
+
+import sqlite3
+from datetime import datetime
+
+
+def applied_version(conn: sqlite3.Connection, component: str) -> int:
+    """Schema/seed version recorded for a component, 0 if it has never been applied"""
+    try:
+        row = conn.execute("SELECT version FROM schema_versions WHERE component = ?", (component,)).fetchone()
+    except sqlite3.OperationalError:
+        return 0  # No schema_versions table yet
+    return row[0] if row else 0
+
+
+def record_version(cursor: sqlite3.Cursor, component: str, version: int):
+    """Mark a component as applied at ``version``, inside the caller's transaction"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_versions (
+            component TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            applied_date TEXT NOT NULL
+        )
+    ''')
+    cursor.execute("INSERT OR REPLACE INTO schema_versions VALUES (?, ?, ?)",
+                   (component, version, datetime.now().isoformat()))
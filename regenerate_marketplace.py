@@ -1,37 +1,44 @@
 #!/usr/bin/env python3
 """
 Regenerate marketplace with our 13 available aircraft models
+
+Usage: regenerate_marketplace.py [listings] [seed]
 """
 
 import sys
 import os
+import sqlite3
+import time
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from modules.aircraft_marketplace import AircraftMarketplace
 
 def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50  # 50 aircraft for variety
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
     # Initialize marketplace
     marketplace = AircraftMarketplace("userdata.db")
-    
-    print("🔄 Regenerating marketplace with 13 available aircraft models...")
-    
-    # Generate market aircraft (this will only use our 13 defined models)
-    market_aircraft = marketplace.generate_market_aircraft(50)  # Generate 50 aircraft for variety
-    marketplace.save_market_aircraft(market_aircraft)
-    
-    print(f"✅ Generated {len(market_aircraft)} aircraft for marketplace")
-    
+
+    print(f"🔄 Regenerating marketplace with {count:,} aircraft...")
+
+    # Listings are generated in batches and swapped in once complete (only our 13 defined models)
+    start = time.perf_counter()
+    written = marketplace.regenerate_market(count, seed)
+
+    print(f"✅ Generated {written:,} aircraft for marketplace in {time.perf_counter() - start:.1f}s")
+
     # Show summary of generated aircraft
-    aircraft_counts = {}
-    for aircraft in market_aircraft:
-        model = aircraft.spec.model
-        aircraft_counts[model] = aircraft_counts.get(model, 0) + 1
-    
+    with sqlite3.connect(marketplace.db_path) as conn:
+        aircraft_counts = conn.execute(
+            "SELECT model, COUNT(*) FROM market_aircraft GROUP BY model ORDER BY model"
+        ).fetchall()
+
     print("\n📊 Aircraft distribution:")
-    for model, count in aircraft_counts.items():
-        print(f"  {model}: {count} aircraft")
-    
+    for model, model_count in aircraft_counts:
+        print(f"  {model}: {model_count:,} aircraft")
+
     print(f"\n🎯 All aircraft use our 13 available 3D models!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark the all-pairs great-circle distance matrix
+
+Builds the distance and bearing matrices for synthetic networks of 60, 1,000
+and 10,000 airports, in memory and memory-mapped on disk, and reports build
+time, memory, lookup cost and the float32 error against scalar haversine.
+"""
+
+import sys
+import os
+import math
+import random
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.distance_matrix import DistanceMatrix, EARTH_RADIUS_NM
+
+SIZES = (60, 1000, 10000)
+IN_MEMORY_LIMIT = 1000  # Larger networks are only built to a memory-mapped file
+SAMPLE_PAIRS = 20000
+
+
+def scalar_distance(lat1, lon1, lat2, lon2):
+    """The per-pair haversine the matrix replaces"""
+    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
+    a = math.sin((lat2 - lat1)/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1)/2)**2
+    return EARTH_RADIUS_NM * 2 * math.asin(math.sqrt(a))
+
+
+def synthetic_airports(count, seed=42):
+    rng = random.Random(seed)
+    codes = [f"X{i:05d}" for i in range(count)]
+    return codes, [rng.uniform(-60, 70) for _ in codes], [rng.uniform(-180, 180) for _ in codes]
+
+
+def report(label, matrix, build_seconds, codes, lat, lon):
+    rng = random.Random(7)
+    pairs = [(rng.randrange(len(codes)), rng.randrange(len(codes))) for _ in range(SAMPLE_PAIRS)]
+
+    start = time.perf_counter()
+    for i, j in pairs:
+        matrix.distance_nm(codes[i], codes[j])
+    lookup = (time.perf_counter() - start) / SAMPLE_PAIRS
+
+    start = time.perf_counter()
+    expected = [scalar_distance(lat[i], lon[i], lat[j], lon[j]) for i, j in pairs]
+    scalar = (time.perf_counter() - start) / SAMPLE_PAIRS
+
+    error = max(abs(e - float(matrix.distance[i, j])) for (i, j), e in zip(pairs, expected))
+    print(f"  {label:<10} build {build_seconds * 1000:>9.1f}ms | {matrix.nbytes / 2**20:>8.1f} MiB | "
+          f"lookup {lookup * 1e6:.2f}µs vs haversine {scalar * 1e6:.2f}µs | max error {error:.4f} nm")
+
+
+def main():
+    print("🌍 Distance matrix benchmark (float32 distance + bearing)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in SIZES:
+            codes, lat, lon = synthetic_airports(count)
+            print(f"\n{count:,} airports ({count * count:,} pairs)")
+
+            if count <= IN_MEMORY_LIMIT:
+                start = time.perf_counter()
+                matrix = DistanceMatrix.build(codes, lat, lon)
+                report("in memory", matrix, time.perf_counter() - start, codes, lat, lon)
+
+            path = os.path.join(tmp, f"airports_{count}")
+            start = time.perf_counter()
+            DistanceMatrix.build(codes, lat, lon, path=path)
+            build_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            matrix = DistanceMatrix.load(path)
+            print(f"  {'mmap open':<10} {(time.perf_counter() - start) * 1000:>15.1f}ms")
+            report("mmap", matrix, build_seconds, codes, lat, lon)
+            del matrix
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
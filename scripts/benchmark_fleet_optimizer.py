@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Benchmark the fleet-wide assignment optimizer against the per-aircraft search
+
+Builds a throwaway database with synthetic airports and routes, then times
+FleetOptimizer at full size (profit matrix, solve, incremental updates) and
+compares it with the old per-aircraft search on a slice small enough for
+that loop to finish.
+"""
+
+import sys
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.route_management import RouteEconomics, DemandLevel
+from modules.fleet_optimizer import FleetOptimizer, linear_sum_assignment
+
+AIRCRAFT = 500
+ROUTES = 5000
+AIRPORTS = 400
+LEGACY_AIRCRAFT = 10
+LEGACY_ROUTES = 50
+
+
+def build_database(path, seed=42):
+    """RouteEconomics tables plus synthetic airports and routes; returns (economics, route ids)"""
+    economics = RouteEconomics(path)
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS routes (
+            id TEXT PRIMARY KEY,
+            departure_airport TEXT NOT NULL,
+            arrival_airport TEXT NOT NULL,
+            distance_nm INTEGER NOT NULL,
+            demand_passengers INTEGER DEFAULT 0,
+            demand_cargo REAL DEFAULT 0,
+            competition_level INTEGER DEFAULT 1,
+            base_ticket_price REAL DEFAULT 200,
+            created_date TEXT NOT NULL
+        )
+    ''')
+    conn.execute("DELETE FROM airports")
+    codes = [f"X{i:03d}" for i in range(AIRPORTS)]
+    conn.executemany("INSERT INTO airports VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", [
+        (code, code, code, code, "Synthetic", rng.uniform(-60, 70), rng.uniform(-180, 180), 0,
+         rng.choice([6000, 9000, 12000]), "large", rng.uniform(300, 1000), rng.uniform(20, 60))
+        for code in codes
+    ])
+
+    route_ids = []
+    demand_levels = [level.value for level in DemandLevel]
+    for i in range(ROUTES):
+        dep, arr = rng.sample(codes, 2)
+        route_id = f"{dep}_{arr}_{i}"
+        distance = rng.randint(150, 7000)
+        fare = 80 + distance * 0.12
+        conn.execute("INSERT INTO routes VALUES (?, ?, ?, ?, 0, 0, ?, ?, ?)",
+                     (route_id, dep, arr, distance, rng.randint(0, 9), fare, datetime.now().isoformat()))
+        conn.execute("INSERT INTO route_extended_data VALUES (?, ?, ?, 1.0, 0.75, ?)",
+                     (route_id, "international", rng.choice(demand_levels), fare * 3.5))
+        route_ids.append(route_id)
+    conn.commit()
+    conn.close()
+    return economics, route_ids
+
+
+def legacy_optimize_aircraft_assignment(economics, available_aircraft, available_routes):
+    """Per-aircraft greedy reference (the pre-optimizer optimize_aircraft_assignment)"""
+    optimization_results = []
+
+    for aircraft in available_aircraft:
+        aircraft_id = aircraft['id']
+        aircraft_spec = aircraft['spec']
+        best_route = None
+        best_profit = -float('inf')
+        best_config = None
+
+        for route_id in available_routes:
+            # Try different frequency configurations
+            for frequency in [7, 14, 21]:  # Daily, twice daily, three times daily
+                # Get route market fare as starting point
+                conn = sqlite3.connect(economics.db_path)
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT r.base_ticket_price, e.market_fare_business
+                    FROM routes r
+                    LEFT JOIN route_extended_data e ON r.id = e.route_id
+                    WHERE r.id = ?
+                ''', (route_id,))
+                route_fares = cursor.fetchone()
+                conn.close()
+
+                if not route_fares:
+                    continue
+
+                market_fare_economy = route_fares[0]
+                market_fare_business = route_fares[1] if route_fares[1] else market_fare_economy * 3.5
+
+                # Try different pricing strategies
+                for price_factor in [0.85, 0.95, 1.05]:  # 15% below, 5% below, 5% above market
+                    fare_economy = market_fare_economy * price_factor
+                    fare_business = market_fare_business * price_factor
+
+                    profitability = economics.calculate_route_profitability(
+                        route_id, aircraft_spec, frequency, fare_economy, fare_business
+                    )
+
+                    if "error" not in profitability:
+                        monthly_profit = profitability['profitability']['monthly_profit']
+
+                        if monthly_profit > best_profit:
+                            best_profit = monthly_profit
+                            best_route = route_id
+                            best_config = {
+                                'frequency_weekly': frequency,
+                                'fare_economy': fare_economy,
+                                'fare_business': fare_business,
+                                'profitability': profitability
+                            }
+
+        if best_route and best_config:
+            optimization_results.append({
+                'aircraft_id': aircraft_id,
+                'recommended_route': best_route,
+                'configuration': best_config,
+                'monthly_profit': best_profit
+            })
+
+    # Sort by profitability
+    optimization_results.sort(key=lambda x: x['monthly_profit'], reverse=True)
+
+    return optimization_results
+
+
+def synthetic_fleet(count, seed=7):
+    rng = random.Random(seed)
+    models = [
+        {'passenger_capacity': 76, 'cruise_speed': 447, 'fuel_burn_per_hour': 450, 'crew_required': 2,
+         'base_price': 30, 'max_range': 2000, 'runway_length_required': 5500},
+        {'passenger_capacity': 180, 'cruise_speed': 470, 'fuel_burn_per_hour': 800, 'crew_required': 2,
+         'base_price': 110, 'max_range': 3500, 'runway_length_required': 7000},
+        {'passenger_capacity': 300, 'cruise_speed': 490, 'fuel_burn_per_hour': 1800, 'crew_required': 3,
+         'base_price': 320, 'max_range': 7500, 'runway_length_required': 9000},
+    ]
+    return [{'id': f"AC{i:04d}", 'spec': dict(rng.choice(models))} for i in range(count)]
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"  {label:<38} {(time.perf_counter() - start) * 1000:>10.1f}ms")
+    return result
+
+
+def main():
+    solver = "scipy linear_sum_assignment" if linear_sum_assignment else "NumPy shortest augmenting path"
+    print(f"✈️ Fleet optimizer benchmark ({solver})")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        economics, route_ids = build_database(os.path.join(tmp, "bench.db"))
+        fleet = synthetic_fleet(AIRCRAFT)
+
+        print(f"\n{AIRCRAFT} aircraft x {ROUTES} routes")
+        optimizer = timed("load routes + profit matrix", lambda: FleetOptimizer(economics, fleet, route_ids))
+        results = timed("solve", optimizer.solve)
+        assigned_routes = [r['recommended_route'] for r in results]
+        print(f"  assigned {len(results)} aircraft to {len(set(assigned_routes))} distinct routes, "
+              f"monthly profit ${sum(r['monthly_profit'] for r in results):,.0f}")
+
+        changed = dict(fleet[0], spec=dict(fleet[0]['spec'], fuel_burn_per_hour=fleet[0]['spec']['fuel_burn_per_hour'] * 1.3))
+        timed("update one aircraft (row)", lambda: optimizer.update_aircraft(changed))
+        timed("re-solve", optimizer.solve)
+        unused = next(r for r in route_ids if r not in set(assigned_routes))
+        timed("update one unused route (column)", lambda: optimizer.update_route(unused))
+        timed("re-solve (skipped if unchanged)", optimizer.solve)
+
+        print(f"\n{LEGACY_AIRCRAFT} aircraft x {LEGACY_ROUTES} routes vs the per-aircraft search")
+        fleet_slice, routes_slice = fleet[:LEGACY_AIRCRAFT], route_ids[:LEGACY_ROUTES]
+        legacy = timed("per-aircraft search", lambda: legacy_optimize_aircraft_assignment(economics, fleet_slice, routes_slice))
+        small = timed("FleetOptimizer", lambda: FleetOptimizer(economics, fleet_slice, routes_slice, min_profit=None).solve())
+        legacy_routes = [r['recommended_route'] for r in legacy]
+        print(f"  per-aircraft: {len(legacy_routes) - len(set(legacy_routes))} aircraft share a route, "
+              f"monthly profit ${sum(r['monthly_profit'] for r in legacy):,.0f}")
+        small_routes = [r['recommended_route'] for r in small]
+        print(f"  optimizer:    {len(small_routes) - len(set(small_routes))} aircraft share a route, "
+              f"monthly profit ${sum(r['monthly_profit'] for r in small):,.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
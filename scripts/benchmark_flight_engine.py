@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vectorized FlightEngine against the per-aircraft loop
+
+The engine derives phases from its discrete-event core and positions from the
+start of each aircraft's cycle instead of ``t mod round_trip``, so outputs are
+compared to within float rounding (altitudes are truncated to whole feet and
+may differ by one at the rounding edge).
+"""
+
+import sys
+import os
+import math
+import random
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.flight_engine import FlightEngine
+
+FLEET_SIZES = [100, 1000, 10000, 100000]
+TICKS = 5
+
+
+def calculate_curved_position(lat1, lon1, lat2, lon2, progress):
+    """Position along the curved 2D route path (the pre-engine scalar version of bezier_positions)"""
+
+    # Calculate distance and direction
+    delta_lat = lat2 - lat1
+    delta_lon = lon2 - lon1
+    distance = math.sqrt(delta_lat * delta_lat + delta_lon * delta_lon)
+
+    # For very short routes, use straight line
+    if distance < 5:
+        lat = lat1 + (lat2 - lat1) * progress
+        lon = lon1 + (lon2 - lon1) * progress
+        return lat, lon
+
+    # Calculate curve parameters for 2D map (same as frontend)
+    mid_lat = (lat1 + lat2) / 2
+    mid_lon = (lon1 + lon2) / 2
+
+    # Curve offset based on distance - smaller for 2D map
+    curve_offset = min(distance * 0.15, 15)  # Max 15 degree offset
+
+    # Calculate perpendicular direction for curve
+    perp_lat = -delta_lon * (curve_offset / distance)
+    perp_lon = delta_lat * (curve_offset / distance)
+
+    # Control point for curve
+    control_lat = mid_lat + perp_lat
+    control_lon = mid_lon + perp_lon
+
+    # Quadratic Bezier curve formula
+    t = progress
+    lat = (1 - t) * (1 - t) * lat1 + 2 * (1 - t) * t * control_lat + t * t * lat2
+    lon = (1 - t) * (1 - t) * lon1 + 2 * (1 - t) * t * control_lon + t * t * lon2
+
+    return lat, lon
+
+
+def legacy_generate_active_flights(assignments, airports, current_time, time_multiplier=1.0):
+    """Per-aircraft reference loop (the pre-engine generate_active_flights, without prints)"""
+    active_flights = []
+    for assignment in assignments:
+        dep_airport = airports.get(assignment['departure_airport'])
+        arr_airport = airports.get(assignment['arrival_airport'])
+        if not dep_airport or not arr_airport:
+            continue
+        dep_lat, dep_lon = dep_airport['lat'], dep_airport['lon']
+        arr_lat, arr_lon = arr_airport['lat'], arr_airport['lon']
+
+        distance = math.sqrt((arr_lat - dep_lat)**2 + (arr_lon - dep_lon)**2)
+        flight_time_hours = max(0.005, distance * 0.02)
+        rest_time_hours = 0.01
+        round_trip_duration_hours = (flight_time_hours + rest_time_hours) * 2
+        current_cycle_time = (current_time / 3600) % round_trip_duration_hours
+
+        first_leg_end = flight_time_hours
+        first_rest_end = first_leg_end + rest_time_hours
+        second_leg_end = first_rest_end + flight_time_hours
+
+        if current_cycle_time < first_leg_end or first_rest_end <= current_cycle_time < second_leg_end:
+            is_return_flight = current_cycle_time >= first_leg_end
+            elapsed = current_cycle_time - first_rest_end if is_return_flight else current_cycle_time
+            raw_progress = elapsed / flight_time_hours
+            if raw_progress >= 0.90:
+                landing_phase = (raw_progress - 0.90) / 0.10
+                slowed_landing = landing_phase * 0.5
+                progress = 0.90 + (slowed_landing * 0.10)
+                if progress > 1.0:
+                    progress = 1.0
+            else:
+                progress = raw_progress
+            if is_return_flight:
+                flight_lat, flight_lon = calculate_curved_position(arr_lat, arr_lon, dep_lat, dep_lon, progress)
+                lat_diff, lon_diff = dep_lat - arr_lat, dep_lon - arr_lon
+                route_direction = f"{assignment['arrival_airport']} → {assignment['departure_airport']}"
+                current_dep, current_arr = assignment['arrival_airport'], assignment['departure_airport']
+            else:
+                flight_lat, flight_lon = calculate_curved_position(dep_lat, dep_lon, arr_lat, arr_lon, progress)
+                lat_diff, lon_diff = arr_lat - dep_lat, arr_lon - dep_lon
+                route_direction = f"{assignment['departure_airport']} → {assignment['arrival_airport']}"
+                current_dep, current_arr = assignment['departure_airport'], assignment['arrival_airport']
+        elif current_cycle_time < first_rest_end:
+            flight_lat, flight_lon = arr_lat, arr_lon
+            lat_diff = lon_diff = 0
+            route_direction = f"PARKED at {assignment['arrival_airport']}"
+            current_dep, current_arr = assignment['arrival_airport'], assignment['departure_airport']
+            is_return_flight = False
+            progress = 0
+        else:
+            flight_lat, flight_lon = dep_lat, dep_lon
+            lat_diff = lon_diff = 0
+            route_direction = f"PARKED at {assignment['departure_airport']}"
+            current_dep, current_arr = assignment['departure_airport'], assignment['arrival_airport']
+            is_return_flight = False
+            progress = 0
+
+        heading = math.degrees(math.atan2(lon_diff, lat_diff))
+        if heading < 0:
+            heading += 360
+
+        cruise_altitude = 35000
+        if progress == 0:
+            altitude, status, color = 0, 'parked', '#FFC107'
+        elif progress <= 0.05:
+            altitude, status, color = int(progress / 0.05 * cruise_altitude), 'departing', 'green'
+        elif progress >= 0.90:
+            altitude, status, color = int((1.0 - progress) / 0.10 * cruise_altitude), 'arriving', 'orange'
+        else:
+            altitude, status, color = cruise_altitude, 'en_route', 'red'
+
+        active_flights.append({
+            'id': f"{assignment['aircraft_id']}",
+            'name': f"Flight {assignment['aircraft_id']}",
+            'lat': flight_lat,
+            'lon': flight_lon,
+            'heading': heading,
+            'aircraft_id': assignment['aircraft_id'],
+            'route': route_direction,
+            'progress': progress * 100,
+            'dep_airport': current_dep,
+            'arr_airport': current_arr,
+            'status': status,
+            'color': color,
+            'speed': f"{time_multiplier}x",
+            'altitude': altitude,
+            'altitude_meters': altitude * 0.3048,
+            'ground_speed': 450 + (progress * 50),
+            'is_return_flight': is_return_flight,
+            'cycle_time_remaining': round_trip_duration_hours - current_cycle_time,
+            'rest_time_remaining': 0,
+            'debug_info': {
+                'current_cycle_time': current_cycle_time,
+                'flight_time_hours': flight_time_hours,
+                'round_trip_duration_hours': round_trip_duration_hours,
+                'time_multiplier': time_multiplier,
+                'phase': 'outbound' if not is_return_flight else 'return'
+            }
+        })
+    return active_flights
+
+
+def values_match(expected, actual, tolerance=1e-6):
+    """Recursive comparison with a relative tolerance for floats"""
+    if isinstance(expected, dict):
+        return expected.keys() == actual.keys() and all(
+            values_match(expected[key], actual[key], tolerance) for key in expected)
+    if isinstance(expected, float) or isinstance(actual, float):
+        return math.isclose(expected, actual, rel_tol=tolerance, abs_tol=tolerance)
+    return expected == actual
+
+
+def flights_match(expected, actual):
+    """Engine output equals the reference loop up to float rounding"""
+    if len(expected) != len(actual):
+        return False
+    for want, got in zip(expected, actual):
+        want, got = dict(want), dict(got)
+        if abs(want.pop('altitude') - got.pop('altitude')) > 1:
+            return False
+        want.pop('altitude_meters')
+        got.pop('altitude_meters')
+        if not values_match(want, got):
+            return False
+    return True
+
+
+def synthetic_network(aircraft_count, airport_count=200, seed=42):
+    """Random airports and one assignment per aircraft"""
+    rng = random.Random(seed)
+    airports = {
+        f"A{i:04d}": {'lat': rng.uniform(-60, 70), 'lon': rng.uniform(-180, 180)}
+        for i in range(airport_count)
+    }
+    codes = list(airports)
+    assignments = []
+    for aircraft_id in range(aircraft_count):
+        dep, arr = rng.sample(codes, 2)
+        assignments.append({
+            'aircraft_id': str(aircraft_id),
+            'route_id': f"{dep}_{arr}",
+            'frequency_weekly': 7,
+            'departure_airport': dep,
+            'arrival_airport': arr,
+        })
+    return airports, assignments
+
+
+def main():
+    print("✈️ FlightEngine benchmark (per tick, best of %d)" % TICKS)
+    print(f"{'aircraft':>10} {'legacy':>12} {'simulate':>12} {'simulate+dicts':>16} {'speedup':>9} "
+          f"{'events/tick':>12}")
+
+    for size in FLEET_SIZES:
+        airports, assignments = synthetic_network(size)
+        engine = FlightEngine(airports)
+        engine.load(assignments)
+
+        legacy_times, simulate_times, total_times = [], [], []
+        events_before = engine.events.events_processed
+        for tick in range(TICKS):
+            current_time = time.time() + tick * 37.3
+
+            start = time.perf_counter()
+            expected = legacy_generate_active_flights(assignments, airports, current_time)
+            legacy_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            state = engine.simulate(current_time)
+            simulate_times.append(time.perf_counter() - start)
+            flights = engine.build_flights(state)
+            total_times.append(time.perf_counter() - start)
+
+            if not flights_match(expected, flights):
+                print(f"❌ Output mismatch at {size} aircraft")
+                return 1
+
+        legacy, simulate, total = min(legacy_times), min(simulate_times), min(total_times)
+        events = (engine.events.events_processed - events_before) / (TICKS - 1)
+        print(f"{size:>10} {legacy * 1000:>10.2f}ms {simulate * 1000:>10.2f}ms "
+              f"{total * 1000:>14.2f}ms {legacy / total:>8.1f}x {events:>12.0f}")
+
+    print("✅ Engine output matches the per-aircraft loop at every size")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
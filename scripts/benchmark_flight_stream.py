@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Compare aircraft stream payload sizes: full flight list vs delta stream vs flight plans
+"""
+
+import sys
+import os
+import json
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.flight_engine import FlightEngine
+from modules.flight_stream import DeltaEncoder, pack_frame
+from modules.flight_tiles import viewport_tiles, bucket_by_tile, lod_priority
+from benchmark_flight_engine import synthetic_network
+
+FLEET_SIZES = [100, 1000, 10000]
+TICKS = 50
+TICK_INTERVAL = 0.2  # seconds between broadcasts
+TIME_SPEED = 10.0
+
+# (label, south, west, north, east, zoom) map views for the viewport stream
+VIEWPORTS = [
+    ('world z2', -85, -180, 85, 180, 2),
+    ('Europe z5', 35, -10, 60, 30, 5),
+    ('Alps z7', 44, 5, 48, 12, 7),
+]
+
+
+def payload_bytes(payload):
+    """Size of a payload as Socket.IO would serialize it"""
+    return len(json.dumps(payload).encode('utf-8'))
+
+
+def binary_vs_json():
+    """Per-tick size and encode time: JSON aircraft_update vs packed binary frame"""
+    print()
+    print("🧱 binary aircraft_frame vs JSON aircraft_update (per tick, best of 5)")
+    print(f"{'aircraft':>10} {'json':>12} {'binary':>12} {'smaller':>9} "
+          f"{'build+dumps':>12} {'pack':>10} {'faster':>8}")
+    for size in FLEET_SIZES:
+        airports, assignments = synthetic_network(size)
+        engine = FlightEngine(airports)
+        engine.load(assignments)
+        state = engine.simulate(time.time())
+
+        json_times, binary_times = [], []
+        for _ in range(5):
+            start = time.perf_counter()
+            encoded = json.dumps({'flights': engine.build_flights(state, TIME_SPEED)})
+            json_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            frame = pack_frame(state)
+            binary_times.append(time.perf_counter() - start)
+
+        json_bytes, binary_bytes = len(encoded.encode('utf-8')), len(frame)
+        json_time, binary_time = min(json_times), min(binary_times)
+        print(f"{size:>10} {json_bytes / 1024:>10.1f}KB {binary_bytes / 1024:>10.1f}KB "
+              f"{json_bytes / binary_bytes:>8.1f}x {json_time * 1000:>10.2f}ms "
+              f"{binary_time * 1000:>8.2f}ms {json_time / binary_time:>7.0f}x")
+
+
+def main():
+    print(f"📦 aircraft_update bytes per tick ({TICKS} ticks, {TICK_INTERVAL}s apart, {TIME_SPEED}x speed)")
+    print(f"{'aircraft':>10} {'full':>12} {'keyframe':>12} {'delta avg':>12} {'reduction':>10} {'plans once':>12}")
+
+    for size in FLEET_SIZES:
+        airports, assignments = synthetic_network(size)
+        engine = FlightEngine(airports)
+        engine.load(assignments)
+        encoder = DeltaEncoder()
+
+        start_time = time.time()
+        full_total = delta_total = 0
+        for tick in range(TICKS):
+            current_time = start_time + tick * TICK_INTERVAL * TIME_SPEED
+            flights = engine.build_flights(engine.simulate(current_time), TIME_SPEED)
+            stamp = {'timestamp': '2025-01-01T00:00:00.000000', 'time_speed': TIME_SPEED}
+
+            full_total += payload_bytes({'flights': flights, **stamp})
+            frame = encoder.encode(flights)
+            if tick == 0:
+                # The first frame re-adds everything; clients get it as the connect keyframe
+                keyframe_size = payload_bytes({**encoder.keyframe(), **stamp})
+                continue
+            delta_total += payload_bytes({**frame, **stamp})
+
+        full_avg = full_total / TICKS
+        delta_avg = delta_total / (TICKS - 1)
+        # Dead-reckoning clients get the plans once and then nothing per tick
+        plans_size = payload_bytes({'plans': engine.flight_plans(), 'clock': {'sim_time': start_time, 'time_speed': TIME_SPEED}})
+        print(f"{size:>10} {full_avg / 1024:>10.1f}KB {keyframe_size / 1024:>10.1f}KB "
+              f"{delta_avg / 1024:>10.1f}KB {full_avg / delta_avg:>9.1f}x {plans_size / 1024:>10.1f}KB")
+
+    print()
+    print("🗺️ viewport stream bytes per tick (one event for the tiles in view, LOD-thinned when zoomed out)")
+    print(f"{'aircraft':>10} {'full':>12} " + " ".join(f"{label:>12}" for label, *_ in VIEWPORTS))
+    for size in FLEET_SIZES:
+        airports, assignments = synthetic_network(size)
+        engine = FlightEngine(airports)
+        engine.load(assignments)
+        flights = engine.build_flights(engine.simulate(time.time()), TIME_SPEED)
+        stamp = {'timestamp': '2025-01-01T00:00:00.000000', 'time_speed': TIME_SPEED}
+
+        lat = np.array([flight['lat'] for flight in flights])
+        lon = np.array([flight['lon'] for flight in flights])
+        priority = lod_priority([flight['id'] for flight in flights])
+
+        columns = [f"{payload_bytes({'flights': flights, **stamp}) / 1024:>10.1f}KB"]
+        for _, south, west, north, east, zoom in VIEWPORTS:
+            level, tiles = viewport_tiles(south, west, north, east, zoom)
+            buckets = bucket_by_tile(lat, lon, priority, level)
+            # One aircraft_tile_update per tick, occupied tiles only
+            frame = {'level': level,
+                     'tiles': {tile: [flights[i] for i in buckets[tile]] for tile in sorted(tiles) if tile in buckets},
+                     **stamp}
+            columns.append(f"{payload_bytes(frame) / 1024:>10.1f}KB")
+        print(f"{size:>10} " + " ".join(columns))
+
+    binary_vs_json()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark incremental marketplace churn
+
+Regenerates a throwaway market of 100,000 and then 1,000,000 listings and
+runs MarketMaker through two simulated weeks at a steady-state arrival rate
+(market size / mean listing days). Each day's expiries, markdowns and new
+listings are timed against regenerating the whole market.
+"""
+
+import sys
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.aircraft_marketplace import AircraftMarketplace, LISTING_DAYS
+from modules.market_maker import MarketMaker
+
+SIZES = (100_000, 1_000_000)
+DAYS = 14
+
+
+def main():
+    print("🏪 Market maker benchmark")
+    mean_days = (LISTING_DAYS[0] + LISTING_DAYS[1]) / 2
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        marketplace = AircraftMarketplace(path)
+
+        for size in SIZES:
+            start = time.perf_counter()
+            marketplace.regenerate_market(size, seed=1)
+            regenerate = time.perf_counter() - start
+
+            market_maker = MarketMaker(marketplace, daily_listings=size / mean_days, seed=1)
+            today = datetime.now()
+            market_maker.advance(today)
+            samples, changes = [], []
+            for day in range(1, DAYS + 1):
+                start = time.perf_counter()
+                delta = market_maker.advance(today + timedelta(days=day))
+                samples.append(time.perf_counter() - start)
+                changes.append(len(delta['added']) + len(delta['removed']) + len(delta['repriced']))
+
+            stats = market_maker.stats()
+            print(f"\n{size:,} listings, {size / mean_days:,.0f} new listings/day")
+            print(f"  regenerate_market         {regenerate * 1000:>9.1f}ms")
+            print(f"  market day (median)       {np.median(samples) * 1000:>9.1f}ms  "
+                  f"({np.median(changes):,.0f} changes)")
+            print(f"  per change                {np.sum(samples) / np.sum(changes) * 1e6:>9.1f}us")
+            print(f"  over {DAYS} days              {stats['listed']:,} listed, {stats['expired']:,} expired, "
+                  f"{stats['repriced']:,} marked down")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark marketplace regeneration
+
+Regenerates the market of a throwaway database with
+AircraftMarketplace.regenerate_market at 100,000 and 1,000,000 listings,
+timing generation, the shadow-table writes and index builds separately and
+reporting peak Python memory (tracemalloc), which should not grow with the
+listing count. A smaller market is also generated with per-listing random
+calls and saved row by row into the indexed table, as before.
+"""
+
+import sys
+import os
+import json
+import random
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.aircraft_marketplace import (
+    AircraftMarketplace, MARKET_AIRCRAFT_COLUMNS, MARKET_LOCATIONS, SELLER_TYPES, LISTING_CONDITIONS
+)
+
+COUNTS = (100_000, 1_000_000)
+LEGACY_LISTINGS = 100_000
+
+
+def legacy_regenerate(marketplace, count):
+    """Per-listing random calls, then DELETE and one INSERT per row into the indexed table"""
+    specs = list(marketplace.aircraft_db.aircraft_specs.values())
+    rows = []
+    for i in range(count):
+        spec = random.choice(specs)
+        age = random.uniform(0, 25)
+        hours = int(age * random.uniform(2000, 4000))
+        price = round(spec.base_price * 0.96 ** age * random.uniform(0.9, 1.1), 2)
+        seller = random.choice(SELLER_TYPES)
+        rows.append((f"{spec.model}_{i}", spec.model, spec.category.value, random.choice(LISTING_CONDITIONS).value,
+                     age, hours, hours // 2, price, price * random.uniform(0.008, 0.012), seller,
+                     random.choice(MARKET_LOCATIONS),
+                     (datetime.now() + timedelta(days=random.randint(7, 90))).isoformat(),
+                     random.randint(100, 2000), json.dumps(["cash"])))
+    conn = sqlite3.connect(marketplace.db_path)
+    conn.execute("DELETE FROM market_aircraft")
+    for row in rows:
+        conn.execute(f"INSERT INTO market_aircraft ({', '.join(MARKET_AIRCRAFT_COLUMNS)}) "
+                     f"VALUES ({', '.join('?' * len(MARKET_AIRCRAFT_COLUMNS))})", row)
+    conn.commit()
+    conn.close()
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    print("🏭 Marketplace regeneration benchmark")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        marketplace = AircraftMarketplace(path)
+
+        for count in COUNTS:
+            print(f"\n{count:,} listings")
+            _, generate = timed(lambda: sum(len(batch['id']) for batch in marketplace.generate_listing_batches(count, 1)))
+            written, total = timed(lambda: marketplace.regenerate_market(count, seed=1))
+            print(f"  generate batches          {generate:>8.2f}s")
+            print(f"  regenerate_market         {total:>8.2f}s  ({written:,} listings, "
+                  f"{written / total:,.0f}/s)")
+
+            tracemalloc.start()
+            marketplace.regenerate_market(count, seed=2)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"  peak Python memory        {peak / 2**20:>8.1f} MiB")
+
+        print(f"\n{LEGACY_LISTINGS:,} listings, per-listing random + row-by-row save (old)")
+        _, elapsed = timed(lambda: legacy_regenerate(marketplace, LEGACY_LISTINGS))
+        print(f"  generate + save           {elapsed:>8.2f}s  ({LEGACY_LISTINGS / elapsed:,.0f}/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
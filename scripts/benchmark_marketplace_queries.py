@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark filtered marketplace queries at a million listings
+
+Builds a throwaway database with the normalized marketplace schema, one
+synthetic model per aircraft category and 1,000,000 listings, then times
+AircraftMarketplace.get_market_aircraft with typical filter combinations
+(first page of 50, cheapest first) and pages deep into the market with a
+keyset cursor against OFFSET. A smaller table in the old layout, with the
+spec as JSON in spec_data, is timed with the LIKE filter it replaces.
+"""
+
+import sys
+import os
+import json
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.aircraft_marketplace import (
+    AircraftMarketplace, AircraftCategory, AircraftSpec, MARKET_AIRCRAFT_COLUMNS, MARKET_AIRCRAFT_QUERY
+)
+
+LISTINGS = 1_000_000
+LEGACY_LISTINGS = 100_000
+PAGE = 50
+REPEATS = 50
+PAGE_DEPTHS = (0, 10_000, 500_000)
+LOCATIONS = ["JFK", "LAX", "LHR", "CDG", "FRA", "NRT", "SIN", "DXB"]
+
+QUERIES = (
+    ("no filter", {}),
+    ("category", {'category': AircraftCategory.WIDE_BODY}),
+    ("category + max price", {'category': AircraftCategory.NARROW_BODY, 'max_price': 40}),
+    ("category + max age", {'category': AircraftCategory.REGIONAL, 'max_age': 3}),
+    ("location + price range", {'location': 'LHR', 'min_price': 20, 'max_price': 60}),
+    ("category + location + age", {'category': AircraftCategory.CARGO, 'location': 'SIN', 'max_age': 10}),
+)
+
+
+def synthetic_specs():
+    return [
+        AircraftSpec(f"BENCH-{category.name}", "Bench", category, 50 + 60 * i, 10.0 + i, 2000 + 1500 * i,
+                     420 + 10 * i, 5000.0 + 3000 * i, 500.0 + 300 * i, 40.0 + 60 * i, 5000 + 1000 * i,
+                     30.0 + 40 * i, 2.0, 2, 2000)
+        for i, category in enumerate(AircraftCategory)
+    ]
+
+
+def listing_rows(specs, count, seed=42):
+    """Listing tuples in MARKET_AIRCRAFT_COLUMNS order"""
+    rng = np.random.default_rng(seed)
+    model = rng.integers(0, len(specs), count)
+    age = rng.uniform(0, 25, count)
+    base_price = np.array([spec.base_price for spec in specs])[model]
+    price = np.round(base_price * 0.96 ** age * rng.uniform(0.9, 1.1, count), 2)
+    hours = (age * rng.uniform(2000, 4000, count)).astype(np.int64)
+    location = rng.integers(0, len(LOCATIONS), count)
+    days = rng.integers(7, 91, count)
+    now = datetime.now()
+    until = [(now + timedelta(days=int(d))).isoformat() for d in range(91)]
+    financing = json.dumps(["cash", "lease", "loan"])
+
+    for i in range(count):
+        spec = specs[model[i]]
+        yield (f"BENCH_{i:07d}", spec.model, spec.category.value, "good", float(age[i]), int(hours[i]),
+               int(hours[i] // 2), float(price[i]), float(price[i]) * 0.01, "leasing_company",
+               LOCATIONS[location[i]], until[days[i]], 500, financing)
+
+
+def build_database(path, specs, count):
+    marketplace = AircraftMarketplace(path)
+    conn = sqlite3.connect(path)
+    conn.executemany(f"INSERT INTO aircraft_specs VALUES ({', '.join('?' * 15)})",
+                     [tuple(marketplace._spec_to_dict(spec).values()) for spec in specs])
+    conn.executemany(
+        f"INSERT INTO market_aircraft ({', '.join(MARKET_AIRCRAFT_COLUMNS)}) "
+        f"VALUES ({', '.join('?' * len(MARKET_AIRCRAFT_COLUMNS))})", listing_rows(specs, count))
+    conn.commit()
+    conn.close()
+    return marketplace
+
+
+def build_legacy_table(path, marketplace, specs, count):
+    """The pre-normalization layout: spec JSON per listing, filtered with LIKE"""
+    spec_json = {spec.model: json.dumps(marketplace._spec_to_dict(spec)) for spec in specs}
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE legacy_market_aircraft AS SELECT * FROM market_aircraft WHERE 0")
+    conn.execute("ALTER TABLE legacy_market_aircraft ADD COLUMN spec_data TEXT")
+    conn.executemany("INSERT INTO legacy_market_aircraft VALUES (" + ", ".join('?' * 15) + ")",
+                     (row + (spec_json[row[1]],) for row in listing_rows(specs, count)))
+    conn.execute("CREATE INDEX idx_legacy_category ON legacy_market_aircraft(spec_data)")
+    conn.commit()
+    return conn
+
+
+def timed(func, repeats=REPEATS):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - start)
+    return result, float(np.median(samples))
+
+
+def main():
+    print("🛩️  Marketplace query benchmark")
+    specs = synthetic_specs()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        start = time.perf_counter()
+        marketplace = build_database(path, specs, LISTINGS)
+        print(f"\n{LISTINGS:,} listings built in {time.perf_counter() - start:.1f}s; "
+              f"first {PAGE} matches, median of {REPEATS} runs")
+
+        for label, filters in QUERIES:
+            result, elapsed = timed(lambda: marketplace.get_market_aircraft(filters, limit=PAGE))
+            print(f"  {label:<28} {elapsed * 1000:>8.3f}ms  ({len(result)} listings)")
+
+        print(f"\nPage of {PAGE} at depth, cheapest first: keyset cursor vs OFFSET")
+        conn = sqlite3.connect(path)
+        now = datetime.now().isoformat()
+        for depth in PAGE_DEPTHS:
+            after = conn.execute("SELECT asking_price, id FROM market_aircraft WHERE available_until > ? "
+                                 "ORDER BY asking_price, id LIMIT 1 OFFSET ?", (now, depth)).fetchone()
+            _, keyset = timed(lambda: marketplace.get_market_aircraft(limit=PAGE, after=after), repeats=10)
+            offset_query = MARKET_AIRCRAFT_QUERY + (" WHERE m.available_until > ? "
+                                                    "ORDER BY m.asking_price, m.id LIMIT ? OFFSET ?")
+            _, offset = timed(lambda: conn.execute(offset_query, (now, PAGE, depth + 1)).fetchall(), repeats=10)
+            print(f"  after {depth:>9,} listings  cursor {keyset * 1000:>8.3f}ms   OFFSET {offset * 1000:>8.3f}ms")
+        conn.close()
+
+        conn = build_legacy_table(path, marketplace, specs, LEGACY_LISTINGS)
+        print(f"\nOld layout, {LEGACY_LISTINGS:,} listings: spec_data LIKE category filter")
+        query = ("SELECT * FROM legacy_market_aircraft WHERE available_until > ? AND spec_data LIKE ? "
+                 "AND asking_price <= ? ORDER BY asking_price, id LIMIT ?")
+        params = (datetime.now().isoformat(), '%"category": "narrow_body"%', 40, PAGE)
+        (_, elapsed) = timed(lambda: conn.execute(query, params).fetchall(), repeats=5)
+        print(f"  {'category + max price':<28} {elapsed * 1000:>8.3f}ms")
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
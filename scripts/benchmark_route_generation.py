@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark bulk route generation and persistence
+
+Builds a throwaway database with synthetic airports, generates a route from
+every airport to every other one with RouteEconomics.generate_route_batch
+and saves them with save_route_batch, reporting throughput. A slice is also
+saved with the old one-statement-per-row loop for comparison.
+"""
+
+import sys
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.route_management import RouteEconomics
+
+AIRPORTS = 400  # 400 x 399 = 159,600 routes
+LEGACY_ROUTES = 10000
+
+
+def build_database(path, seed=42):
+    """RouteEconomics tables, an empty routes table and synthetic airports"""
+    economics = RouteEconomics(path)
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS routes (
+            id TEXT PRIMARY KEY,
+            departure_airport TEXT NOT NULL,
+            arrival_airport TEXT NOT NULL,
+            distance_nm INTEGER NOT NULL,
+            demand_passengers INTEGER DEFAULT 0,
+            demand_cargo REAL DEFAULT 0,
+            competition_level INTEGER DEFAULT 1,
+            base_ticket_price REAL DEFAULT 200,
+            created_date TEXT NOT NULL
+        )
+    ''')
+    conn.execute("DELETE FROM airports")
+    conn.executemany("INSERT INTO airports VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", [
+        (f"X{i:03d}", f"X{i:03d}", f"X{i:03d}", f"X{i:03d}", "Synthetic", rng.uniform(-60, 70),
+         rng.uniform(-180, 180), 0, 10000, "large", 500, 40)
+        for i in range(AIRPORTS)
+    ])
+    conn.commit()
+    conn.close()
+    return economics
+
+
+def legacy_save_routes(db_path, routes):
+    """One execute per table per route (the pre-batch save_routes)"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    for route in routes:
+        cursor.execute('''
+            INSERT OR REPLACE INTO routes
+            (id, departure_airport, arrival_airport, distance_nm, demand_passengers,
+             demand_cargo, competition_level, base_ticket_price, created_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (route.id, route.origin_icao, route.destination_icao, route.distance_nm, 200, 5.0,
+              route.competition_level, route.market_fare_economy, route.created_date.isoformat()))
+        cursor.execute('''
+            INSERT OR REPLACE INTO route_extended_data
+            (route_id, route_type, base_demand, seasonal_factor, historical_load_factor, market_fare_business)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (route.id, route.route_type.value, route.base_demand.value,
+              route.seasonal_factor, route.historical_load_factor, route.market_fare_business))
+    conn.commit()
+    conn.close()
+
+
+def timed(label, func, count=None):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    throughput = f"{count / elapsed:>12,.0f} routes/s" if count else ""
+    print(f"  {label:<34} {elapsed * 1000:>9.1f}ms  {throughput}")
+    return result
+
+
+def main():
+    print("🛫 Route generation benchmark")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        economics = build_database(path)
+        timed("distance matrix", lambda: economics.distances)
+
+        total = AIRPORTS * (AIRPORTS - 1)
+        print(f"\n{AIRPORTS} airports, every airport as a hub ({total:,} routes)")
+        batch = timed("generate_route_batch", lambda: economics.generate_route_batch(seed=1), total)
+        saved = timed("save_route_batch (one transaction)", lambda: economics.save_route_batch(batch), total)
+        with sqlite3.connect(path) as conn:
+            stored = conn.execute("SELECT COUNT(*) FROM routes").fetchone()[0]
+        print(f"  saved {saved:,} routes, {stored:,} in the routes table")
+
+        print(f"\n{LEGACY_ROUTES:,} routes as RouteData")
+        hubs = economics.distances.codes[:LEGACY_ROUTES // (AIRPORTS - 1) + 1]
+        routes = [route for hub in hubs for route in economics.generate_routes(hub, AIRPORTS)][:LEGACY_ROUTES]
+        timed("save_routes (executemany)", lambda: economics.save_routes(routes), len(routes))
+        timed("per-row execute loop", lambda: legacy_save_routes(path, routes), len(routes))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark marketplace row hydration
+
+Loads 100,000 listings and turns them into MarketAircraft records twice: the
+old way (spec JSON parsed into a fresh AircraftSpec for every row, dict-based
+records) and through AircraftMarketplace's interned SpecRegistry with
+__slots__ records. Reports hydration time, memory held by the resulting
+list (tracemalloc) and the number of distinct spec objects.
+"""
+
+import sys
+import os
+import json
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from dataclasses import fields, make_dataclass
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.aircraft_marketplace import (
+    AircraftCategory, AircraftCondition, FinancingType, MarketAircraft, AircraftSpec, MARKET_AIRCRAFT_QUERY
+)
+from scripts.benchmark_marketplace_queries import synthetic_specs, build_database
+
+LISTINGS = 100_000
+
+# Record classes as they were before interning: mutable spec, __dict__ per record
+LegacyAircraftSpec = make_dataclass('LegacyAircraftSpec', [(f.name, f.type) for f in fields(AircraftSpec)])
+LegacyMarketAircraft = make_dataclass('LegacyMarketAircraft', [(f.name, f.type) for f in fields(MarketAircraft)])
+
+
+def legacy_hydrate(rows, spec_json):
+    """Per row: json.loads of the spec, a new spec object and a dict-based record"""
+    aircraft = []
+    for row in rows:
+        spec_data = json.loads(spec_json[row[1]])
+        spec_data['category'] = AircraftCategory(spec_data['category'])
+        aircraft.append(LegacyMarketAircraft(
+            id=row[0], spec=LegacyAircraftSpec(**spec_data), condition=AircraftCondition(row[3]),
+            age_years=row[4], total_flight_hours=row[5], cycles=row[6], asking_price=row[7],
+            lease_rate_monthly=row[8], seller_type=row[9], location=row[10],
+            available_until=datetime.fromisoformat(row[11]), maintenance_due_hours=row[12],
+            financing_available=[FinancingType(f) for f in json.loads(row[13])]
+        ))
+    return aircraft
+
+
+def measure(label, hydrate):
+    """Time one run, then count memory on a second (tracemalloc slows allocation down)"""
+    start = time.perf_counter()
+    aircraft = hydrate()
+    elapsed = time.perf_counter() - start
+    del aircraft
+
+    tracemalloc.start()
+    aircraft = hydrate()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    specs = len({id(a.spec) for a in aircraft})
+    print(f"  {label:<22} {elapsed * 1000:>8.1f}ms  {held / 2**20:>7.1f} MiB  "
+          f"{held / len(aircraft):>6.0f} B/listing  {specs:,} spec objects")
+    return aircraft
+
+
+def main():
+    print("🧩 Marketplace hydration benchmark")
+    specs = synthetic_specs()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        marketplace = build_database(path, specs, LISTINGS)
+        with sqlite3.connect(path) as conn:
+            rows = conn.execute(MARKET_AIRCRAFT_QUERY).fetchall()
+        spec_json = {spec.model: json.dumps(marketplace._spec_to_dict(spec)) for spec in specs}
+        marketplace.specs.reload()
+
+        print(f"\n{len(rows):,} listings, {len(specs)} models")
+        legacy = measure("per-row spec (old)", lambda: legacy_hydrate(rows, spec_json))
+        del legacy
+        interned = measure("interned + __slots__", lambda: [marketplace._row_to_market_aircraft(row) for row in rows])
+        del interned
+
+        start = time.perf_counter()
+        count = len(marketplace.get_market_aircraft())
+        print(f"\n  get_market_aircraft()  {(time.perf_counter() - start) * 1000:>8.1f}ms  ({count:,} listings)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
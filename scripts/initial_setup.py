@@ -310,12 +310,12 @@ def create_initial_market_data(db_path: str):
     print("🛩️  Creating initial aircraft market...")
     
     try:
-        # Add the modules directory to Python path
-        modules_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'modules')
-        if modules_path not in sys.path:
-            sys.path.insert(0, modules_path)
+        # Add the project root to Python path (modules import each other as modules.*)
+        project_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        if project_path not in sys.path:
+            sys.path.insert(0, project_path)
         
-        from aircraft_marketplace import AircraftMarketplace
+        from modules.aircraft_marketplace import AircraftMarketplace
         
         marketplace = AircraftMarketplace(db_path)
         
@@ -326,7 +326,7 @@ def create_initial_market_data(db_path: str):
         print(f"✅ Created {len(market_aircraft)} aircraft in marketplace")
         
         # Show sample aircraft by category
-        from aircraft_marketplace import AircraftCategory
+        from modules.aircraft_marketplace import AircraftCategory
         
         for category in AircraftCategory:
             category_aircraft = [a for a in market_aircraft if a.spec.category == category]
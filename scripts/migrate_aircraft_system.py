@@ -5,6 +5,10 @@ import os
 import sys
 from datetime import datetime
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.aircraft_marketplace import create_marketplace_tables, migrate_market_aircraft
+
 def migrate_database(db_path: str):
     """Migrate existing database to support new aircraft marketplace system"""
     
@@ -37,27 +41,6 @@ def migrate_database(db_path: str):
             tables_to_create.append('aircraft_transactions')
         
         # Create new tables
-        if 'market_aircraft' in tables_to_create:
-            print("Creating market_aircraft table...")
-            cursor.execute('''
-                CREATE TABLE market_aircraft (
-                    id TEXT PRIMARY KEY,
-                    model TEXT NOT NULL,
-                    condition TEXT NOT NULL,
-                    age_years REAL NOT NULL,
-                    total_flight_hours INTEGER NOT NULL,
-                    cycles INTEGER NOT NULL,
-                    asking_price REAL NOT NULL,
-                    lease_rate_monthly REAL NOT NULL,
-                    seller_type TEXT NOT NULL,
-                    location TEXT NOT NULL,
-                    available_until TEXT NOT NULL,
-                    maintenance_due_hours INTEGER NOT NULL,
-                    financing_available TEXT NOT NULL,
-                    spec_data TEXT NOT NULL
-                )
-            ''')
-        
         if 'owned_aircraft' in tables_to_create:
             print("Creating owned_aircraft table...")
             cursor.execute('''
@@ -95,6 +78,15 @@ def migrate_database(db_path: str):
                 )
             ''')
         
+        # Market aircraft: create the normalized layout, or move an old one
+        # (spec JSON in spec_data) to it
+        if 'market_aircraft' in tables_to_create:
+            print("Creating market_aircraft and aircraft_specs tables...")
+        else:
+            dropped = migrate_market_aircraft(cursor)
+            print(f"Normalized market_aircraft ({dropped} listings without a readable spec dropped)")
+        create_marketplace_tables(cursor)
+        
         # Migrate existing fleet data if it exists
         if 'fleet' in existing_tables and 'owned_aircraft' in tables_to_create:
             print("Migrating existing fleet data...")
@@ -127,8 +119,7 @@ def migrate_database(db_path: str):
         
         # Create indexes for performance
         print("Creating database indexes...")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_market_aircraft_model ON market_aircraft(model)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_market_aircraft_category ON market_aircraft(spec_data)")
+        # market_aircraft indexes come from create_marketplace_tables
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_owned_aircraft_model ON owned_aircraft(model)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_transactions_aircraft ON aircraft_transactions(aircraft_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_transactions_date ON aircraft_transactions(transaction_date)")
@@ -193,7 +184,6 @@ def create_initial_market_data(db_path: str):
     
     try:
         # Import marketplace after ensuring database is migrated
-        sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
         from modules.aircraft_marketplace import AircraftMarketplace
         
         marketplace = AircraftMarketplace(db_path)
@@ -227,7 +217,7 @@ def verify_migration(db_path: str):
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
         tables = [row[0] for row in cursor.fetchall()]
         
-        required_tables = ['market_aircraft', 'owned_aircraft', 'aircraft_transactions']
+        required_tables = ['aircraft_specs', 'market_aircraft', 'owned_aircraft', 'aircraft_transactions']
         missing_tables = [table for table in required_tables if table not in tables]
         
         if missing_tables:
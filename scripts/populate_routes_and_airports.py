@@ -3,11 +3,18 @@
 Populate Routes and Expand Airports Database
 """
 
+import sys
+import os
 import sqlite3
-import math
 import itertools
 from datetime import datetime
 
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.distance_matrix import DistanceMatrix
+
 # Expanded airport database - 63 major world airports
 AIRPORTS = {
     # North America
@@ -89,18 +96,12 @@ AIRPORTS = {
     'SBBR': {'lat': -15.8711, 'lon': -47.9172, 'name': 'Brasília Intl', 'city': 'Brasília', 'country': 'Brazil'},
 }
 
-def calculate_distance(lat1, lon1, lat2, lon2):
-    """Calculate distance in nautical miles using Haversine formula"""
-    R = 3440.065  # Earth radius in nautical miles
-    
-    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-    
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-    c = 2 * math.asin(math.sqrt(a))
-    
-    return R * c
+def build_distance_matrix():
+    """Great circle distances between every pair of AIRPORTS, computed in one vectorized pass"""
+    codes = list(AIRPORTS)
+    # float64, so int(distance) matches the scalar haversine (the matrix is tiny)
+    return DistanceMatrix.build(codes, [AIRPORTS[c]['lat'] for c in codes], [AIRPORTS[c]['lon'] for c in codes],
+                                dtype=np.float64)
 
 def create_airports_table(conn):
     """Create and populate airports table"""
@@ -133,6 +134,7 @@ def create_airports_table(conn):
 def populate_routes(conn):
     """Generate and populate route combinations"""
     cursor = conn.cursor()
+    distances = build_distance_matrix()
     
     # Clear existing routes
     cursor.execute("DELETE FROM routes")
@@ -151,13 +153,7 @@ def populate_routes(conn):
     # Generate routes between major hubs (long-haul)
     for origin, destination in itertools.combinations(major_hubs, 2):
         if origin in AIRPORTS and destination in AIRPORTS:
-            origin_data = AIRPORTS[origin]
-            dest_data = AIRPORTS[destination]
-            
-            distance = calculate_distance(
-                origin_data['lat'], origin_data['lon'],
-                dest_data['lat'], dest_data['lon']
-            )
+            distance = distances.distance_nm(origin, destination)
             
             # Calculate base pricing based on distance
             base_price = max(150, min(800, 150 + (distance * 0.3)))
@@ -197,13 +193,7 @@ def populate_routes(conn):
         if cursor.fetchone()[0] > 0:
             continue
         
-        origin_data = AIRPORTS[origin]
-        dest_data = AIRPORTS[destination]
-        
-        distance = calculate_distance(
-            origin_data['lat'], origin_data['lon'],
-            dest_data['lat'], dest_data['lon']
-        )
+        distance = distances.distance_nm(origin, destination)
         
         # Skip very long regional routes
         if distance > 4000:
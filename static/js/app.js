@@ -13,6 +13,26 @@ class AircraftTracker {
         this.aircraft3DModels = new Map();
         this.currentFlights = [];
         this.timeSpeed = 1;
+        
+        // Aircraft stream protocol: 'plans' = flight plans, positions computed locally,
+        // 'delta' = keyframe + per-aircraft changes, 'full' = whole list every tick,
+        // 'viewport' = whole list every tick, but only for the map tiles in view,
+        // 'binary' = packed fixed-width position records every tick
+        this.streamMode = 'plans';
+        this.streamRate = null; // frames per second to ask for (null = server default for the time speed)
+        this.flightState = new Map(); // flight id -> latest flight object (delta mode)
+        this.streamSeq = null;
+        this.awaitingKeyframe = true;
+        this.pendingDeltas = [];
+        this.flightPlans = []; // per-assignment cycle parameters (plans mode)
+        this.cycleEpoch = 0;
+        this.simClock = null; // { simTime, speed, receivedAt } anchor for local simulation
+        this.deadReckoningFrame = null;
+        this.lastDeadReckoningRender = 0;
+        this.viewportTiles = new Set(); // tiles subscribed to (viewport mode)
+        this.tileFrame = null; // latest aircraft_tile_update frame (viewport mode)
+        this.frameIndex = null; // aircraft table that binary frame records point into
+        this.routePaths = new Map(); // "DEP-ARR" -> server polyline (the curve aircraft fly along)
         this.is3DMode = false;
         this.isGlobeMode = false;
         this.globeMap = null;
@@ -167,6 +187,9 @@ class AircraftTracker {
                 
                 tileLayer.addTo(this.map);
 
+                // Viewport stream mode follows the visible area (fires after zooms too)
+                this.map.on('moveend', () => this.sendViewport());
+
                 // Force map to invalidate size after initialization (Mac fix)
                 setTimeout(() => {
                     this.map.invalidateSize();
@@ -191,6 +214,12 @@ class AircraftTracker {
         this.socket.on('connect', () => {
             console.log('🔌 Connected to server');
             this.updateConnectionStatus(true);
+            this.awaitingKeyframe = true;
+            // Acknowledging frames lets the server skip frames while we are still rendering
+            this.socket.emit('aircraft_stream', { mode: this.streamMode, rate: this.streamRate, ack: true });
+            if (this.streamMode === 'viewport') {
+                this.sendViewport();
+            }
         });
 
         this.socket.on('disconnect', () => {
@@ -198,13 +227,50 @@ class AircraftTracker {
             this.updateConnectionStatus(false);
         });
 
-        this.socket.on('aircraft_update', (data) => {
+        this.socket.on('aircraft_update', (data, ack) => {
             this.updateAircraft(data);
+            if (ack) ack();
+        });
+
+        this.socket.on('aircraft_keyframe', (frame) => {
+            this.applyKeyframe(frame);
+        });
+
+        this.socket.on('aircraft_delta', (frame, ack) => {
+            this.applyDelta(frame);
+            if (ack) ack();
+        });
+
+        this.socket.on('flight_plans', (data) => {
+            this.applyFlightPlans(data);
+        });
+
+        this.socket.on('aircraft_frame_index', (index) => {
+            this.frameIndex = index;
+        });
+
+        this.socket.on('aircraft_frame', (frame, ack) => {
+            this.applyBinaryFrame(frame);
+            if (ack) ack();
+        });
+
+        this.socket.on('aircraft_viewport_tiles', (data) => {
+            this.applyViewportTiles(data);
+        });
+
+        this.socket.on('aircraft_tile_update', (frame, ack) => {
+            this.applyTileFrame(frame);
+            if (ack) ack();
+        });
+
+        this.socket.on('marketplace_delta', (delta) => {
+            this.applyMarketplaceDelta(delta);
         });
 
         this.socket.on('time_speed_update', (data) => {
             console.log(`⚡ Time speed updated to ${data.speed}x via WebSocket`);
             this.timeSpeed = data.speed;
+            this.setSimClock(data.clock);
             // Update the dropdown to reflect the new speed
             const speedSelect = document.getElementById('time-speed');
             if (speedSelect) {
@@ -237,6 +303,15 @@ class AircraftTracker {
         document.getElementById('load-marketplace').addEventListener('click', () => {
             this.loadMarketplace();
         });
+        document.getElementById('marketplace-category').addEventListener('change', () => {
+            this.loadMarketplace();
+        });
+        document.getElementById('marketplace-sort').addEventListener('change', () => {
+            this.loadMarketplace();
+        });
+        document.getElementById('marketplace-more').addEventListener('click', () => {
+            this.loadMarketplace(true);
+        });
 
         // AI Competition
         document.getElementById('load-competition').addEventListener('click', () => {
@@ -296,6 +371,9 @@ class AircraftTracker {
             const airports = await this.fetchAPI('/api/airports');
             this.addAirports(airports);
 
+            // Route line geometry, shared with the server-side flight engine
+            this.loadRoutePaths();
+
             // Load economics data
             this.loadEconomics();
 
@@ -556,27 +634,64 @@ class AircraftTracker {
         }
     }
 
-    async loadMarketplace() {
+    async loadMarketplace(more = false) {
+        // The server filters, sorts and pages; "Load More" continues from the last cursor
         try {
-            const aircraft = await this.fetchAPI('/api/marketplace');
-            console.log('📊 Marketplace data received:', aircraft);
-            this.updateMarketplaceList(aircraft);
+            const [sort, order] = document.getElementById('marketplace-sort').value.split(':');
+            const params = new URLSearchParams({ sort, order });
+            const category = document.getElementById('marketplace-category').value;
+            if (category) params.set('category', category);
+            if (more && this.marketplaceCursor) params.set('cursor', this.marketplaceCursor);
+
+            const page = await this.fetchAPI(`/api/marketplace?${params}`);
+            console.log(`📊 Marketplace page received: ${page.aircraft.length} aircraft`);
+            this.marketplaceCursor = page.next_cursor;
+            this.marketplaceView = { sort, order, category };
+            this.marketplaceListings = more ? this.marketplaceListings.concat(page.aircraft) : page.aircraft;
+            this.updateMarketplaceList(page.aircraft, more);
+            document.getElementById('marketplace-more').style.display = page.next_cursor ? '' : 'none';
         } catch (error) {
             console.error('❌ Error loading marketplace:', error);
         }
     }
 
-    updateMarketplaceList(aircraft) {
+    applyMarketplaceDelta(delta) {
+        // Patch the loaded listings in place instead of re-fetching the market
+        if (!this.marketplaceListings) return;
+        const { sort, order, category } = this.marketplaceView;
+        const key = sort === 'age' ? 'age' : 'price';
+        const direction = order === 'desc' ? -1 : 1;
+        const compare = (a, b) => direction * (a[key] - b[key] || (a.id < b.id ? -1 : a.id > b.id ? 1 : 0));
+
+        const removed = new Set(delta.removed);
+        const repriced = new Map(delta.repriced.map(change => [change.id, change]));
+        let listings = this.marketplaceListings
+            .filter(plane => !removed.has(plane.id))
+            .map(plane => repriced.has(plane.id) ? { ...plane, ...repriced.get(plane.id) } : plane);
+
+        // New listings only belong here if they sort before the last loaded one (or everything is loaded)
+        const last = listings[listings.length - 1];
+        const added = delta.added.filter(plane =>
+            (!category || plane.category === category) &&
+            (!this.marketplaceCursor || !last || compare(plane, last) < 0));
+        listings = listings.concat(added).sort(compare);
+
+        if (removed.size || repriced.size || added.length) {
+            this.marketplaceListings = listings;
+            this.updateMarketplaceList(listings);
+        }
+    }
+
+    updateMarketplaceList(aircraft, append = false) {
         const container = document.getElementById('marketplace-list');
         
-        if (aircraft.length === 0) {
+        if (aircraft.length === 0 && !append) {
             container.innerHTML = '<div class="no-data">No aircraft available</div>';
             return;
         }
 
-        container.innerHTML = aircraft.slice(0, 10).map((plane, index) => {
+        const html = aircraft.map((plane, index) => {
             const aircraftId = plane.id || `aircraft_${index}_${Date.now()}`;
-            console.log(`🛩️ Aircraft ${index}:`, plane);
             return `
             <div class="aircraft-item">
                 <h5>${plane.model || 'A321'}</h5>
@@ -598,6 +713,11 @@ class AircraftTracker {
             </div>
         `;
         }).join('');
+        if (append) {
+            container.insertAdjacentHTML('beforeend', html);
+        } else {
+            container.innerHTML = html;
+        }
     }
 
     show3DModel(aircraftModel, aircraftData) {
@@ -735,6 +855,308 @@ class AircraftTracker {
         }
     }
 
+    applyKeyframe(frame) {
+        this.flightState = new Map(frame.flights.map(flight => [flight.id, flight]));
+        this.streamSeq = frame.seq;
+        this.awaitingKeyframe = false;
+        
+        // Replay deltas that arrived while we were waiting for this keyframe
+        const pending = this.pendingDeltas
+            .filter(delta => delta.seq > frame.seq)
+            .sort((a, b) => a.seq - b.seq);
+        this.pendingDeltas = [];
+        
+        let latest = frame;
+        for (const delta of pending) {
+            if (delta.seq !== this.streamSeq + 1) {
+                this.requestResync();
+                break;
+            }
+            this.mergeDelta(delta);
+            latest = delta;
+        }
+        this.renderFlightState(latest);
+    }
+
+    applyDelta(frame) {
+        if (this.awaitingKeyframe) {
+            this.pendingDeltas.push(frame);
+            return;
+        }
+        if (frame.seq <= this.streamSeq) {
+            return; // Already applied
+        }
+        if (frame.seq !== this.streamSeq + 1) {
+            console.warn(`📉 Aircraft stream gap: expected ${this.streamSeq + 1}, got ${frame.seq} - resyncing`);
+            this.pendingDeltas.push(frame);
+            this.requestResync();
+            return;
+        }
+        this.mergeDelta(frame);
+        this.renderFlightState(frame);
+    }
+
+    mergeDelta(frame) {
+        frame.removed.forEach(id => this.flightState.delete(id));
+        frame.added.forEach(flight => this.flightState.set(flight.id, flight));
+        Object.entries(frame.changed).forEach(([id, fields]) => {
+            const flight = this.flightState.get(id);
+            if (!flight) return;
+            Object.entries(fields).forEach(([key, value]) => {
+                // Nested objects (debug_info) only carry their changed keys
+                if (value && typeof value === 'object' && !Array.isArray(value) && flight[key]) {
+                    Object.assign(flight[key], value);
+                } else {
+                    flight[key] = value;
+                }
+            });
+        });
+        this.streamSeq = frame.seq;
+    }
+
+    requestResync() {
+        this.awaitingKeyframe = true;
+        this.socket.emit('aircraft_resync');
+    }
+
+    renderFlightState(frame) {
+        this.updateAircraft({
+            flights: Array.from(this.flightState.values()),
+            timestamp: frame.timestamp,
+            time_speed: frame.time_speed
+        });
+    }
+
+    applyFlightPlans(data) {
+        this.flightPlans = data.plans;
+        this.cycleEpoch = data.cycle_epoch || 0;
+        this.setSimClock(data.clock);
+        console.log(`🧭 Flight plans received: ${data.plans.length} aircraft (version ${data.version})`);
+        this.lastDeadReckoningRender = 0; // Render the new plans right away
+        this.startDeadReckoning();
+    }
+
+    setSimClock(clock) {
+        if (!clock) return;
+        // Anchor on the local monotonic clock so wall-clock skew with the server doesn't matter
+        this.simClock = {
+            simTime: clock.sim_time,
+            speed: clock.time_speed,
+            receivedAt: performance.now()
+        };
+    }
+
+    currentSimTime() {
+        const elapsed = (performance.now() - this.simClock.receivedAt) / 1000;
+        return this.simClock.simTime + elapsed * this.simClock.speed;
+    }
+
+    deadReckoningInterval() {
+        // Same cadence the server used to broadcast positions - each render rebuilds every marker
+        if (this.timeSpeed <= 10) return 1000;
+        if (this.timeSpeed <= 50) return 500;
+        return 200;
+    }
+
+    startDeadReckoning() {
+        if (this.deadReckoningFrame !== null) return;
+        const step = (now) => {
+            this.deadReckoningFrame = requestAnimationFrame(step);
+            if (this.streamMode !== 'plans' || !this.simClock) return;
+            if (now - this.lastDeadReckoningRender < this.deadReckoningInterval()) return;
+            this.lastDeadReckoningRender = now;
+            
+            const simTime = this.currentSimTime();
+            this.updateAircraft({
+                flights: this.flightPlans.map(plan => this.computePlannedFlight(plan, simTime)),
+                timestamp: new Date().toISOString(),
+                time_speed: this.simClock.speed
+            });
+        };
+        this.deadReckoningFrame = requestAnimationFrame(step);
+    }
+
+    computePlannedFlight(plan, simTime) {
+        // Client-side port of FlightEngine.simulate/build_flights for a single plan
+        const flightTime = plan.flight_time_hours;
+        const roundTrip = plan.round_trip_hours;
+        const hours = (simTime - this.cycleEpoch) / 3600;
+        const cycleTime = ((hours % roundTrip) + roundTrip) % roundTrip;
+        const firstRestEnd = flightTime + plan.rest_time_hours;
+        const secondLegEnd = firstRestEnd + flightTime;
+        
+        const isReturnFlight = cycleTime >= firstRestEnd && cycleTime < secondLegEnd;
+        const flying = cycleTime < flightTime || isReturnFlight;
+        
+        let progress = 0;
+        if (flying) {
+            const rawProgress = (isReturnFlight ? cycleTime - firstRestEnd : cycleTime) / flightTime;
+            // Past 90% the remaining distance is flown at half speed
+            progress = rawProgress >= 0.90
+                ? Math.min(0.90 + ((rawProgress - 0.90) / 0.10 * 0.5) * 0.10, 1.0)
+                : rawProgress;
+        }
+        
+        let lat, lon, heading = 0, route, depAirport, arrAirport;
+        if (isReturnFlight) {
+            [lat, lon] = this.planPosition(plan.arr, plan.dep, plan.return_control, progress);
+            heading = plan.return_heading;
+            route = `${plan.arr_airport} → ${plan.dep_airport}`;
+            [depAirport, arrAirport] = [plan.arr_airport, plan.dep_airport];
+        } else if (flying) {
+            [lat, lon] = this.planPosition(plan.dep, plan.arr, plan.outbound_control, progress);
+            heading = plan.outbound_heading;
+            route = `${plan.dep_airport} → ${plan.arr_airport}`;
+            [depAirport, arrAirport] = [plan.dep_airport, plan.arr_airport];
+        } else if (cycleTime < firstRestEnd) {
+            [lat, lon] = plan.arr;
+            route = `PARKED at ${plan.arr_airport}`;
+            [depAirport, arrAirport] = [plan.arr_airport, plan.dep_airport];
+        } else {
+            [lat, lon] = plan.dep;
+            route = `PARKED at ${plan.dep_airport}`;
+            [depAirport, arrAirport] = [plan.dep_airport, plan.arr_airport];
+        }
+        
+        const cruiseAltitude = 35000;
+        let altitude = cruiseAltitude, status = 'en_route', color = 'red';
+        if (progress === 0) {
+            altitude = 0; status = 'parked'; color = '#FFC107';
+        } else if (progress <= 0.05) {
+            altitude = Math.trunc(progress / 0.05 * cruiseAltitude); status = 'departing'; color = 'green';
+        } else if (progress >= 0.90) {
+            altitude = Math.trunc((1.0 - progress) / 0.10 * cruiseAltitude); status = 'arriving'; color = 'orange';
+        }
+        
+        return {
+            id: plan.id,
+            name: plan.name,
+            lat: lat,
+            lon: lon,
+            heading: heading,
+            aircraft_id: plan.aircraft_id,
+            route: route,
+            progress: progress * 100,
+            dep_airport: depAirport,
+            arr_airport: arrAirport,
+            status: status,
+            color: color,
+            speed: `${this.simClock.speed}x`,
+            altitude: altitude,
+            altitude_meters: altitude * 0.3048,
+            ground_speed: 450 + (progress * 50),
+            is_return_flight: isReturnFlight,
+            cycle_time_remaining: roundTrip - cycleTime,
+            rest_time_remaining: 0
+        };
+    }
+
+    planPosition(from, to, control, t) {
+        // Quadratic Bezier along the route curve; short routes fly a straight line
+        if (!control) {
+            return [from[0] + (to[0] - from[0]) * t, from[1] + (to[1] - from[1]) * t];
+        }
+        return [
+            (1 - t) * (1 - t) * from[0] + 2 * (1 - t) * t * control[0] + t * t * to[0],
+            (1 - t) * (1 - t) * from[1] + 2 * (1 - t) * t * control[1] + t * t * to[1]
+        ];
+    }
+
+    applyBinaryFrame(frame) {
+        // Frames from before an assignment change point into the old table - skip them
+        if (!this.frameIndex || frame.version !== this.frameIndex.version) return;
+        this.updateAircraft({
+            flights: this.decodeBinaryFrame(frame.frame),
+            timestamp: frame.timestamp,
+            time_speed: frame.time_speed
+        });
+    }
+
+    decodeBinaryFrame(buffer) {
+        // Record layout mirrors FRAME_DTYPE in modules/flight_stream.py (little-endian, unpadded):
+        // uint32 index, float32 lat, float32 lon, float32 heading, uint16 altitude,
+        // uint8 status, uint8 phase, uint8 progress (0-255)
+        const statusNames = ['parked', 'departing', 'en_route', 'arriving'];
+        const statusColors = ['#FFC107', 'green', 'red', 'orange'];
+        const recordSize = this.frameIndex.record_size;
+        const view = new DataView(buffer);
+        const flights = [];
+        
+        for (let offset = 0; offset + recordSize <= view.byteLength; offset += recordSize) {
+            const aircraft = this.frameIndex.aircraft[view.getUint32(offset, true)];
+            if (!aircraft) continue;
+            const altitude = view.getUint16(offset + 16, true);
+            const status = view.getUint8(offset + 18);
+            const phase = view.getUint8(offset + 19);
+            const progress = view.getUint8(offset + 20) / 255;
+            
+            // Phases: 0 outbound, 1 parked at arrival, 2 return, 3 parked at departure
+            const reversed = phase === 1 || phase === 2;
+            const depAirport = reversed ? aircraft.arr_airport : aircraft.dep_airport;
+            const arrAirport = reversed ? aircraft.dep_airport : aircraft.arr_airport;
+            const route = phase === 1 || phase === 3
+                ? `PARKED at ${phase === 1 ? aircraft.arr_airport : aircraft.dep_airport}`
+                : `${depAirport} → ${arrAirport}`;
+            
+            flights.push({
+                id: aircraft.id,
+                name: aircraft.name,
+                lat: view.getFloat32(offset + 4, true),
+                lon: view.getFloat32(offset + 8, true),
+                heading: view.getFloat32(offset + 12, true),
+                aircraft_id: aircraft.aircraft_id,
+                route: route,
+                progress: progress * 100,
+                dep_airport: depAirport,
+                arr_airport: arrAirport,
+                status: statusNames[status],
+                color: statusColors[status],
+                altitude: altitude,
+                altitude_meters: altitude * 0.3048,
+                ground_speed: 450 + (progress * 50),
+                is_return_flight: phase === 2
+            });
+        }
+        return flights;
+    }
+
+    sendViewport() {
+        if (this.streamMode !== 'viewport' || !this.socket || !this.socket.connected) return;
+        
+        // The 3D and globe views can swing anywhere - subscribe them to the whole world
+        if (!this.map || this.is3DMode || this.isGlobeMode) {
+            this.socket.emit('aircraft_viewport', { south: -90, west: -180, north: 90, east: 180, zoom: 0 });
+            return;
+        }
+        const bounds = this.map.getBounds();
+        this.socket.emit('aircraft_viewport', {
+            south: bounds.getSouth(),
+            west: bounds.getWest(),
+            north: bounds.getNorth(),
+            east: bounds.getEast(),
+            zoom: this.map.getZoom()
+        });
+    }
+
+    applyViewportTiles(data) {
+        if (data.error) {
+            console.error('❌ Viewport subscription failed:', data.error);
+            return;
+        }
+        this.viewportTiles = new Set(data.tiles);
+        // Forget aircraft in tiles that scrolled out of view
+        if (this.tileFrame) this.applyTileFrame(this.tileFrame);
+    }
+
+    applyTileFrame(frame) {
+        // One frame holds every occupied subscribed tile; tiles it leaves out are empty
+        this.tileFrame = frame;
+        const flights = Object.entries(frame.tiles)
+            .filter(([tile]) => this.viewportTiles.has(tile)) // Not tiles we just scrolled away from
+            .flatMap(([, tileFlights]) => tileFlights);
+        this.updateAircraft({ flights, timestamp: frame.timestamp, time_speed: frame.time_speed });
+    }
+
     updateAircraft(data) {
         // Always store current flights regardless of mode
         if (data.flights) {
@@ -1019,6 +1441,7 @@ class AircraftTracker {
         }
         
         this.is3DMode = true;
+        this.sendViewport();
         
         // Hide 2D map and legend, show 3D viewer
         document.getElementById('map').style.display = 'none';
@@ -1058,6 +1481,7 @@ class AircraftTracker {
         
         this.is3DMode = false;
         this.isGlobeMode = false;
+        this.sendViewport();
         
         // Show 2D map and legend, hide 3D and globe viewers
         document.getElementById('map').style.display = 'block';
@@ -1080,6 +1504,7 @@ class AircraftTracker {
         // Set mode flags first
         this.isGlobeMode = true;
         this.is3DMode = false;
+        this.sendViewport();
         
         // Always update UI regardless of globe initialization success
         // Hide 2D map, 3D viewer, and legend; show globe viewer
@@ -2553,7 +2978,8 @@ class AircraftTracker {
                             weight: 2,
                             opacity: 0.6,
                             interactive: true
-                        }
+                        },
+                        this.routePaths.get(`${route.departure_airport}-${route.arrival_airport}`)
                     );
                     
                     // Add popup with route information
@@ -2604,13 +3030,31 @@ class AircraftTracker {
             weight: 2,
             opacity: 0.7,
             interactive: false
-        }).addTo(this.map);
+        }, this.routePaths.get(`${depAirport}-${arrAirport}`)).addTo(this.map);
         
         // Store the route line
         this.routeLines.set(flight.id, routeLine);
     }
 
-    createCurvedRoute(start, end, options) {
+    async loadRoutePaths() {
+        try {
+            const paths = await this.fetchAPI('/api/route_paths');
+            this.routePaths = new Map(Object.entries(paths));
+            console.log(`🛣️ Loaded ${this.routePaths.size} route paths`);
+        } catch (error) {
+            console.error('❌ Error loading route paths:', error);
+        }
+    }
+
+    createCurvedRoute(start, end, options, pathPoints = null) {
+        // Server polylines come from the same path table the flight engine uses
+        if (pathPoints) {
+            return L.polyline(pathPoints, {
+                ...options,
+                smoothFactor: 0.5
+            });
+        }
+        
         // Create curved route optimized for 2D flat map projection
         const [lat1, lon1] = start;
         const [lat2, lon2] = end;
@@ -2685,7 +3129,8 @@ class AircraftTracker {
                         weight: 1.5,
                         opacity: 0.6,
                         interactive: true
-                    }
+                    },
+                    this.routePaths.get(`${route.departure_airport}-${route.arrival_airport}`)
                 );
                 
                 // Add popup with route information
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Fleet optimizer checks against brute force
+
+The NumPy shortest augmenting path solver (used when SciPy is missing) and
+FleetOptimizer's pruned assignment are compared with exhaustive search on
+small random instances, including an incremental update/remove sequence.
+Run with pytest.
+"""
+
+import sys
+import os
+import itertools
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.fleet_optimizer import FleetOptimizer, _shortest_augmenting_path
+
+
+def brute_force_cost(cost):
+    """Lowest total cost of giving every row a distinct column"""
+    n, m = cost.shape
+    return min(sum(cost[row, col] for row, col in enumerate(cols))
+               for cols in itertools.permutations(range(m), n))
+
+
+def check_assignment(cost, rows, cols):
+    assert sorted(rows.tolist()) == list(range(cost.shape[0]))
+    assert len(set(cols.tolist())) == len(cols)
+    assert cost[rows, cols].sum() == pytest.approx(brute_force_cost(cost))
+
+
+@pytest.mark.parametrize("shape", [(1, 1), (3, 3), (5, 5), (2, 6), (4, 7), (6, 6)])
+def test_fallback_solver_matches_brute_force(shape):
+    rng = np.random.default_rng(sum(shape))
+    for _ in range(30):
+        cost = rng.uniform(-100, 100, shape)
+        check_assignment(cost, *_shortest_augmenting_path(cost))
+
+
+@pytest.mark.parametrize("shape", [(4, 4), (3, 6)])
+def test_fallback_solver_all_negative_and_ties(shape):
+    rng = np.random.default_rng(7)
+    for _ in range(30):
+        cost = -rng.uniform(1, 1e6, shape)
+        check_assignment(cost, *_shortest_augmenting_path(cost))
+        ties = rng.integers(-3, 0, shape).astype(np.float64)
+        check_assignment(ties, *_shortest_augmenting_path(ties))
+
+
+def test_fallback_solver_rejects_more_rows_than_columns():
+    with pytest.raises(ValueError):
+        _shortest_augmenting_path(np.zeros((3, 2)))
+
+
+class RouteData:
+    """Route economics data source for FleetOptimizer, without a database"""
+
+    def __init__(self, routes):
+        self.routes = routes
+
+    def load_route_economics_data(self, route_ids):
+        return {route_id: dict(self.routes[route_id]) for route_id in route_ids if route_id in self.routes}
+
+
+def random_route(rng):
+    return {
+        'distance_nm': float(rng.uniform(200, 4000)),
+        'competition_level': int(rng.integers(1, 6)),
+        'market_fare_economy': float(rng.uniform(80, 600)),
+        'market_fare_business': float(rng.uniform(300, 2000)),
+        'demand_multiplier': float(rng.choice([0.3, 0.5, 0.7, 0.85, 1.0])),
+        'seasonal_factor': 1.0,
+        'airport_fees': float(rng.uniform(500, 8000)),
+        'min_runway_length': float(rng.uniform(5000, 12000))
+    }
+
+
+def random_aircraft(rng, aircraft_id):
+    return {'id': aircraft_id, 'spec': {
+        'passenger_capacity': int(rng.integers(50, 350)),
+        'cruise_speed': float(rng.uniform(350, 500)),
+        'fuel_burn_per_hour': float(rng.uniform(300, 2500)),
+        'crew_required': 2,
+        'base_price': float(rng.uniform(20, 300)),
+        'max_range': float(rng.uniform(1000, 6000)),
+        'runway_length_required': float(rng.uniform(4000, 10000))
+    }}
+
+
+def solution_profit(optimizer, solution):
+    return sum(optimizer.profit[row, slot // optimizer.route_capacity] for row, slot in solution.items())
+
+
+def brute_force_profit(optimizer):
+    """Best (aircraft assigned, total profit) over every aircraft -> route-or-idle choice"""
+    n, routes = optimizer.profit.shape
+    best = None
+    for choice in itertools.product(range(-1, routes), repeat=n):
+        counts = np.bincount([c for c in choice if c >= 0], minlength=routes)
+        if np.any(counts > optimizer.route_capacity):
+            continue
+        profits = [optimizer.profit[row, col] for row, col in enumerate(choice) if col >= 0]
+        if not all(np.isfinite(profits)):
+            continue
+        if optimizer.min_profit is not None and any(p <= optimizer.min_profit for p in profits):
+            continue
+        score = (len(profits) if optimizer.min_profit is None else 0, sum(profits))
+        if best is None or score[0] > best[0] or (score[0] == best[0] and score[1] > best[1]):
+            best = score
+    return best[1]
+
+
+@pytest.mark.parametrize("aircraft,routes,capacity,min_profit", [
+    (3, 4, 2, 0.0),   # More slots than aircraft: pruned to each aircraft's best slots
+    (4, 2, 1, 0.0),   # More aircraft than routes
+    (3, 3, 1, None),  # Always assign a feasible route
+    (4, 5, 1, 50000.0),
+])
+def test_optimizer_matches_brute_force(aircraft, routes, capacity, min_profit):
+    rng = np.random.default_rng(aircraft * 100 + routes * 10 + capacity)
+    for _ in range(20):
+        data = RouteData({f"R{i}": random_route(rng) for i in range(routes)})
+        optimizer = FleetOptimizer(data, [random_aircraft(rng, f"A{i}") for i in range(aircraft)],
+                                   list(data.routes), route_capacity=capacity, min_profit=min_profit)
+        solution = optimizer._solve()
+        assert all(np.isfinite(optimizer.profit[row, slot // capacity]) for row, slot in solution.items())
+        if min_profit is not None:
+            assert all(optimizer.profit[row, slot // capacity] > min_profit for row, slot in solution.items())
+        assert solution_profit(optimizer, solution) == pytest.approx(brute_force_profit(optimizer))
+
+
+def test_incremental_updates_match_a_fresh_optimizer():
+    rng = np.random.default_rng(11)
+    data = RouteData({f"R{i}": random_route(rng) for i in range(4)})
+    fleet = [random_aircraft(rng, f"A{i}") for i in range(4)]
+    optimizer = FleetOptimizer(data, fleet, list(data.routes), route_capacity=1)
+    optimizer._solution = optimizer._solve()
+
+    # Respec one aircraft, add one, retire one, then edit and add routes
+    changed = random_aircraft(rng, "A1")
+    added = random_aircraft(rng, "A9")
+    optimizer.update_aircraft(changed)
+    optimizer.update_aircraft(added)
+    optimizer.remove_aircraft("A2")
+    data.routes["R0"] = random_route(rng)
+    optimizer.update_route("R0")
+    data.routes["R7"] = random_route(rng)
+    optimizer.update_route("R7")
+    if optimizer._solution is None:
+        optimizer._solution = optimizer._solve()
+
+    fleet = [fleet[0], changed, fleet[3], added]
+    fresh = FleetOptimizer(data, fleet, ["R0", "R1", "R2", "R3", "R7"], route_capacity=1)
+    assert [a['id'] for a in optimizer.aircraft] == [a['id'] for a in fresh.aircraft]
+    np.testing.assert_allclose(optimizer.profit, fresh.profit)
+    assert solution_profit(optimizer, optimizer._solution) == pytest.approx(
+        solution_profit(fresh, fresh._solve()))
+    assert solution_profit(optimizer, optimizer._solution) == pytest.approx(brute_force_profit(fresh))
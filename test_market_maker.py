@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+MarketMaker day-by-day churn: expiries, markdowns and new listings
+
+Each test stocks a temporary marketplace with listings expiring at known
+offsets from a fixed start date and advances the market by hand. Run with
+pytest.
+"""
+
+import sys
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.aircraft_marketplace import AircraftMarketplace, LISTING_DAYS
+from modules.market_maker import MarketMaker, REPRICE_STEPS
+
+START = datetime(2030, 1, 1, 12, 0)
+
+
+def listing_row(aircraft_id, days_left, price=1000.0):
+    """A market_aircraft row expiring ``days_left`` days after START"""
+    return (aircraft_id, 'A321', 'narrow_body', 'good', 4.0, 12000, 6000, price, price * 0.01,
+            'leasing_company', 'JFK', (START + timedelta(days=days_left)).isoformat(), 500, '["cash"]')
+
+
+@pytest.fixture
+def marketplace(tmp_path):
+    return AircraftMarketplace(str(tmp_path / "market.db"))
+
+
+def stock(marketplace, *listings):
+    marketplace.replace_market([[listing_row(*listing) for listing in listings]])
+
+
+def market(marketplace):
+    """{id: (asking_price, lease_rate_monthly)} of every listing, expired or not"""
+    with sqlite3.connect(marketplace.db_path) as conn:
+        return {aircraft_id: (price, lease_rate) for aircraft_id, price, lease_rate in
+                conn.execute("SELECT id, asking_price, lease_rate_monthly FROM market_aircraft")}
+
+
+def test_first_advance_only_sweeps_out_expired_listings(marketplace):
+    stock(marketplace, ('A321_1', -3), ('A321_2', 0), ('A321_3', 5), ('A321_4', 29), ('A321_5', 80))
+    maker = MarketMaker(marketplace, daily_listings=50, seed=1)
+
+    delta = maker.advance(START)
+    assert sorted(delta['removed']) == ['A321_1', 'A321_2']  # available_until <= now
+    assert delta['added'] == [] and delta['repriced'] == []
+    # Listings already inside a markdown window are not marked down retroactively
+    assert market(marketplace) == {aircraft_id: (1000.0, 10.0) for aircraft_id in ('A321_3', 'A321_4', 'A321_5')}
+    assert maker.market_date == START
+
+
+def test_less_than_a_day_later_nothing_happens(marketplace):
+    stock(marketplace, ('A321_1', 1))
+    maker = MarketMaker(marketplace, daily_listings=50, seed=1)
+    maker.advance(START)
+    assert maker.advance(START + timedelta(hours=23)) is None
+    assert maker.market_date == START and list(market(marketplace)) == ['A321_1']
+
+
+def test_markdowns_follow_the_threshold_windows(marketplace):
+    (long_days, long_factor), (short_days, short_factor) = REPRICE_STEPS
+    assert (long_days, short_days) == (30, 10)  # The expiry offsets below are chosen around these
+    stock(marketplace,
+          ('A321_both', 35),      # crosses 30 and then 10 days left during the jump
+          ('A321_short', 30),     # 30 days left at the start (step already due): only the 10-day step
+          ('A321_edge', 56),      # exactly 30 days left at the new date: crosses 30
+          ('A321_later', 57),     # still 31 days left: untouched
+          ('A321_expired', 5))    # expires during the jump: removed, never repriced
+    maker = MarketMaker(marketplace, daily_listings=0, seed=1)
+    maker.advance(START)
+
+    delta = maker.advance(START + timedelta(days=26, hours=7))  # Whole days only
+    assert maker.market_date == START + timedelta(days=26)
+    assert delta['removed'] == ['A321_expired'] and delta['added'] == []
+
+    both = round(round(1000.0 * long_factor, 2) * short_factor, 2)
+    expected = {
+        'A321_both': (both, 10.0 * long_factor * short_factor),
+        'A321_short': (round(1000.0 * short_factor, 2), 10.0 * short_factor),
+        'A321_edge': (round(1000.0 * long_factor, 2), 10.0 * long_factor),
+    }
+    repriced = {record['id']: (record['price'], record['lease_rate']) for record in delta['repriced']}
+    assert len(delta['repriced']) == len(expected)  # A listing crossing both steps is reported once
+    assert repriced.keys() == expected.keys()
+    stored = market(marketplace)
+    for aircraft_id, (price, lease_rate) in expected.items():
+        assert repriced[aircraft_id] == stored[aircraft_id]
+        assert stored[aircraft_id] == (pytest.approx(price), pytest.approx(lease_rate))
+    assert stored['A321_later'] == (1000.0, 10.0)
+
+    # A day later only A321_later reaches 30 days left; nothing is marked down twice
+    delta = maker.advance(START + timedelta(days=27))
+    assert delta['repriced'] == [{'id': 'A321_later', 'price': round(1000.0 * long_factor, 2),
+                                  'lease_rate': pytest.approx(10.0 * long_factor)}]
+    assert market(marketplace)['A321_both'] == stored['A321_both']
+
+
+def test_new_listings_are_dated_from_the_market_clock(marketplace):
+    maker = MarketMaker(marketplace, daily_listings=20, seed=3)
+    maker.advance(START)
+    delta = maker.advance(START + timedelta(days=2))
+
+    added = delta['added']
+    assert added and len({aircraft.id for aircraft in added}) == len(added)
+    assert set(market(marketplace)) == {aircraft.id for aircraft in added}
+    for aircraft in added:
+        days_left = (aircraft.available_until - (START + timedelta(days=2))).days
+        assert LISTING_DAYS[0] <= days_left <= LISTING_DAYS[1]
+    assert maker.stats()['listed'] == len(added)
+
+
+def test_drawn_ids_already_listed_are_skipped(marketplace):
+    stock(marketplace, ('A321_100', 40, 777.0), ('A321_102', 40, 777.0))
+    maker = MarketMaker(marketplace, daily_listings=5, seed=2)
+    maker.advance(START)
+    # As if a regeneration reused these serials after the maker read the highest one
+    maker._next_serial = 100
+
+    delta = maker.advance(START + timedelta(days=1))
+    added = [aircraft.id for aircraft in delta['added']]
+    assert 'A321_100' not in added and 'A321_102' not in added
+    stored = market(marketplace)
+    assert stored['A321_100'] == stored['A321_102'] == (777.0, 777.0 * 0.01)
+    assert set(stored) == {'A321_100', 'A321_102', *added}
+    assert maker._next_serial is None  # Re-read from the database before the next draw
+
+    delta = maker.advance(START + timedelta(days=3))
+    assert not set(aircraft.id for aircraft in delta['added']) & set(stored)
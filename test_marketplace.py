@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Marketplace listing pages: keyset cursors, filters and ETags
+
+get_market_aircraft and /api/marketplace are run against a temporary
+database of hand-made listings whose prices and ages tie, so every page
+boundary has to break ties on id. Run with pytest.
+"""
+
+import sys
+import os
+import importlib
+import json
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.aircraft_marketplace import AircraftMarketplace, FinancingType, MARKET_SORT_COLUMNS
+
+NOW = datetime.now()
+ALL_FINANCING = json.dumps([f.value for f in FinancingType])
+CASH_ONLY = json.dumps([FinancingType.CASH.value])
+
+# (id, price, age, location, financing) - ids deliberately out of price/age order
+LISTINGS = [
+    ('A321_107', 100.0, 5.0, 'JFK', ALL_FINANCING),
+    ('A321_102', 100.0, 5.0, 'LHR', CASH_ONLY),
+    ('A321_109', 100.0, 1.0, 'LHR', ALL_FINANCING),
+    ('A321_101', 250.0, 1.0, 'JFK', ALL_FINANCING),
+    ('A321_105', 250.0, 1.0, 'LHR', ALL_FINANCING),
+    ('A321_103', 400.0, 12.0, 'LHR', ALL_FINANCING),
+    ('A321_108', 400.0, 12.0, 'JFK', CASH_ONLY),
+    ('A321_100', 400.0, 3.0, 'LHR', ALL_FINANCING),
+    ('A321_104', 400.0, 3.0, 'LHR', CASH_ONLY),
+    ('A321_106', 900.0, 3.0, 'JFK', ALL_FINANCING),
+]
+EXPIRED = ('A321_999', 50.0, 2.0, 'JFK', ALL_FINANCING)
+
+
+def listing_row(aircraft_id, price, age, location, financing, days=30):
+    """A market_aircraft row in MARKET_AIRCRAFT_COLUMNS order"""
+    return (aircraft_id, 'A321', 'narrow_body', 'good', age, int(age * 3000), int(age * 1500),
+            price, price * 0.01, 'leasing_company', location, (NOW + timedelta(days=days)).isoformat(),
+            500, financing)
+
+
+def stock_market(marketplace):
+    marketplace.replace_market([
+        [listing_row(*listing) for listing in LISTINGS] + [listing_row(*EXPIRED, days=-1)]
+    ])
+
+
+def expected_ids(sort, descending, listings=LISTINGS):
+    value = {'price': 1, 'age': 2}[sort]
+    ordered = sorted(listings, key=lambda listing: (listing[value], listing[0]), reverse=descending)
+    return [listing[0] for listing in ordered]
+
+
+@pytest.fixture
+def marketplace(tmp_path):
+    marketplace = AircraftMarketplace(str(tmp_path / "market.db"))
+    stock_market(marketplace)
+    return marketplace
+
+
+def walk_pages(marketplace, size, filters=None, **kwargs):
+    """Every page until an empty one, resuming after each page's last (value, id)"""
+    column = MARKET_SORT_COLUMNS[kwargs.get('sort', 'price')]
+    pages, after = [], None
+    while True:
+        page = marketplace.get_market_aircraft(filters, limit=size, after=after, **kwargs)
+        pages.append([aircraft.id for aircraft in page])
+        if not page:
+            return pages
+        after = (getattr(page[-1], column), page[-1].id)
+
+
+@pytest.mark.parametrize("sort", ["price", "age"])
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("size", [1, 2, 3, 4, 5])
+def test_keyset_pages_cover_ties_once_in_order(marketplace, sort, descending, size):
+    pages = walk_pages(marketplace, size, sort=sort, descending=descending)
+    assert pages[-1] == []
+    assert all(len(page) <= size for page in pages)
+    assert [aircraft_id for page in pages for aircraft_id in page] == expected_ids(sort, descending)
+
+
+def test_page_after_the_last_listing_is_empty(marketplace):
+    last = marketplace.get_market_aircraft(sort='age', descending=True)[-1]
+    assert marketplace.get_market_aircraft(limit=5, sort='age', descending=True,
+                                           after=(last.age_years, last.id)) == []
+
+
+def test_filters_combine_with_paging(marketplace):
+    filters = {'location': 'LHR', 'min_price': 100, 'max_price': 400, 'max_age': 5,
+               'financing': FinancingType.LEASE}
+    matching = [listing for listing in LISTINGS
+                if listing[3] == 'LHR' and 100 <= listing[1] <= 400 and listing[2] <= 5
+                and listing[4] == ALL_FINANCING]
+    pages = walk_pages(marketplace, 2, filters, sort='price')
+    assert [aircraft_id for page in pages for aircraft_id in page] == expected_ids('price', False, matching)
+
+
+def test_expiry_follows_the_given_clock(marketplace):
+    assert EXPIRED[0] not in [aircraft.id for aircraft in marketplace.get_market_aircraft()]
+    assert EXPIRED[0] in [aircraft.id for aircraft in
+                          marketplace.get_market_aircraft(now=NOW - timedelta(days=2))]
+    assert marketplace.get_market_aircraft(now=NOW + timedelta(days=31)) == []
+
+
+@pytest.fixture(scope="module")
+def app_market(tmp_path_factory):
+    """flask_app imported against a temporary database; yields (module, marketplace)"""
+    from core.config_manager import ConfigManager
+
+    directory = tmp_path_factory.mktemp("app")
+    (directory / "config.ini").write_text("[DATABASES]\nuserdata = market.db\n")
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        ConfigManager._instance = None  # Read this config.ini, not one loaded by an earlier import
+        marketplace = AircraftMarketplace(str(directory / "market.db"))  # An existing database skips first-time setup
+        flask_app = importlib.import_module('flask_app')
+        flask_app.aircraft_marketplace = marketplace
+    finally:
+        os.chdir(cwd)
+    yield flask_app, marketplace
+    ConfigManager._instance = None
+
+
+@pytest.fixture
+def client(app_market):
+    flask_app, marketplace = app_market
+    stock_market(marketplace)
+    return flask_app.app.test_client()
+
+
+@pytest.mark.parametrize("sort", ["price", "age"])
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_api_cursor_walks_every_listing(client, sort, order):
+    ids, cursor = [], None
+    for _ in range(len(LISTINGS)):
+        query = {'sort': sort, 'order': order, 'limit': 3}
+        if cursor:
+            query['cursor'] = cursor
+        data = client.get('/api/marketplace', query_string=query).get_json()
+        ids += [listing['id'] for listing in data['aircraft']]
+        cursor = data['next_cursor']
+        if cursor is None:
+            break
+    assert ids == expected_ids(sort, order == 'desc')
+
+
+def test_api_last_full_page_has_no_cursor_and_resuming_after_it_is_empty(client, app_market):
+    flask_app, _ = app_market
+    first = client.get('/api/marketplace?limit=5').get_json()
+    second = client.get('/api/marketplace', query_string={'limit': 5, 'cursor': first['next_cursor']}).get_json()
+    assert len(second['aircraft']) == 5 and second['next_cursor'] is None
+
+    last = second['aircraft'][-1]
+    cursor = flask_app.encode_market_cursor('price', 'asc', last['price'], last['id'])
+    response = client.get('/api/marketplace', query_string={'limit': 5, 'cursor': cursor})
+    assert response.status_code == 200
+    assert response.get_json()['aircraft'] == [] and response.get_json()['next_cursor'] is None
+
+
+def test_api_cursor_from_another_sort_is_rejected(client):
+    cursor = client.get('/api/marketplace?limit=2&sort=age').get_json()['next_cursor']
+    response = client.get('/api/marketplace', query_string={'limit': 2, 'sort': 'price', 'cursor': cursor})
+    assert response.status_code == 400
+
+
+def test_api_unchanged_page_is_not_modified(client, app_market):
+    _, marketplace = app_market
+    response = client.get('/api/marketplace?limit=4')
+    etag = response.headers['ETag']
+    assert response.status_code == 200 and etag
+
+    cached = client.get('/api/marketplace?limit=4', headers={'If-None-Match': etag})
+    assert cached.status_code == 304 and cached.data == b''
+
+    with sqlite3.connect(marketplace.db_path) as conn:
+        conn.execute("UPDATE market_aircraft SET asking_price = 99 WHERE id = 'A321_109'")
+    changed = client.get('/api/marketplace?limit=4', headers={'If-None-Match': etag})
+    assert changed.status_code == 200 and changed.headers['ETag'] != etag